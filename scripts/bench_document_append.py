@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""Measure the cost of appending an utterance as documents grow.
+
+Run from the repository root:
+
+    python scripts/bench_document_append.py --appends 50
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from great_dictator.adapters.outbound.sqlite_document_repository import (
+    SqliteDocumentRepository,
+)
+from great_dictator.domain.document import Document
+
+SIZES = (10_000, 100_000, 1_000_000)
+UTTERANCE = " Another dictated sentence, about as long as most are."
+
+
+def run(repository: SqliteDocumentRepository, size: int, appends: int) -> float:
+    """Milliseconds per append to a document of ``size`` characters."""
+    words = "the quick brown fox jumps over the lazy dog "
+    saved = repository.save(
+        Document(
+            user="bench",
+            name=f"doc {size}",
+            content=(words * (size // len(words) + 1))[:size],
+            created=datetime.now(),
+        )
+    )
+    started = time.perf_counter()
+    for _ in range(appends):
+        repository.append(saved.id, UTTERANCE)  # type: ignore[arg-type]
+    return (time.perf_counter() - started) * 1000 / appends
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--appends", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for compression in (None, "zlib"):
+            repository = SqliteDocumentRepository(
+                str(Path(tmp) / f"{compression}.db"), compression=compression
+            )
+            for size in SIZES:
+                ms = run(repository, size, args.appends)
+                print(f"{compression or 'none':>5} {size:>9,} chars: {ms:7.2f} ms/append")
+            repository.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""Compare document repository throughput with and without connection pooling.
+
+The baseline opens a new connection per call in rollback-journal mode, as
+the repository used to. Run from the repository root:
+
+    python scripts/bench_document_repository.py --ops 2000 --threads 4
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import closing
+from dataclasses import replace
+from datetime import datetime
+from pathlib import Path
+
+from great_dictator.adapters.outbound.sqlite_document_repository import (
+    SqliteDocumentRepository,
+)
+from great_dictator.domain.document import Document
+
+
+class UnpooledDocumentRepository(SqliteDocumentRepository):
+    """A fresh connection per call, default journal and pragmas."""
+
+    def _init_db(self) -> None:
+        super()._init_db()
+        gc.collect()  # Close the schema connection so the journal mode can change
+        with closing(sqlite3.connect(self._db_path)) as conn:
+            conn.execute("PRAGMA journal_mode=DELETE")
+
+    def _get_connection(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._db_path)
+
+
+def run(repository: SqliteDocumentRepository, ops: int, threads: int) -> float:
+    """Mixed save/load/list workload; returns operations per second."""
+
+    def worker(index: int) -> None:
+        for i in range(ops // threads):
+            saved = repository.save(
+                Document(
+                    user="bench",
+                    name=f"doc {index}-{i}",
+                    content="dictated text " * 50,
+                    created=datetime.now(),
+                )
+            )
+            repository.save(replace(saved, content="edited"))
+            repository.load(saved.id)  # type: ignore[arg-type]
+            if i % 10 == 0:
+                repository.list_for_user("bench")
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    # Each iteration is two saves and a load, plus a listing every tenth
+    return (ops // threads) * threads * 3.1 / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ops", type=int, default=2000, help="iterations in total")
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, factory in (
+            ("per-call connections", UnpooledDocumentRepository),
+            ("pooled + WAL", SqliteDocumentRepository),
+        ):
+            repository = factory(str(Path(tmp) / f"{factory.__name__}.db"))
+            rate = run(repository, args.ops, args.threads)
+            print(f"{label:>22}: {rate:10.0f} ops/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,124 @@
+import asyncio
+import json
+import os
+import wave
+from collections import deque
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 from datetime import datetime
 from io import BytesIO
 from pathlib import Path
-from typing import Callable, Optional
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+from urllib.parse import urlencode
 
 try:
     from typing import Annotated
 except ImportError:
     from typing_extensions import Annotated
 
-from fastapi import FastAPI, File, Form, Header, HTTPException, UploadFile, WebSocket
-from fastapi.responses import FileResponse, HTMLResponse
+import numpy as np
+from fastapi import (
+    FastAPI,
+    File,
+    Form,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+    WebSocket,
+)
+from fastapi.responses import (
+    FileResponse,
+    HTMLResponse,
+    PlainTextResponse,
+    StreamingResponse,
+)
 from pydantic import BaseModel
-
-from great_dictator.adapters.inbound.templates import render_document_list, render_editor
-from great_dictator.domain.document import Document, DocumentRepositoryPort
-from great_dictator.domain.transcription import TranscriptionService
+from starlette.requests import ClientDisconnect
+
+from great_dictator.adapters.inbound.opus_decoder import (
+    StreamDecodeError,
+    create_stream_decoder,
+)
+from great_dictator.adapters.inbound.pcm_segmenter import (
+    SAMPLE_RATE,
+    PcmSegment,
+    PcmSegmenter,
+    parse_wav_header,
+)
+from great_dictator.adapters.inbound.stream_metrics import StreamMetrics
+from great_dictator.adapters.inbound.stream_session import StreamSession
+from great_dictator.adapters.inbound.templates import (
+    highlight,
+    render_document_list,
+    render_editor,
+    render_search_results,
+)
+from great_dictator.adapters.inbound.upload_limit import UploadSizeLimitMiddleware
+from great_dictator.domain.audio import AudioStorePort
+from great_dictator.domain.document import (
+    MATCH_END,
+    MATCH_START,
+    AsyncDocumentRepositoryPort,
+    Document,
+    DocumentCursor,
+    DocumentRepositoryPort,
+    DocumentSummary,
+    TextPatch,
+    VersionConflict,
+    OffloadedDocumentRepository,
+)
+from great_dictator.domain.retranscription import JobQueuePort, RetranscriptionJob
+from great_dictator.domain.transcription import (
+    AudioInput,
+    TranscriptionResult,
+    TranscriptionSegment,
+    TranscriptionService,
+    TranscriptionTimeout,
+    TranscriptionUnavailable,
+)
+
+T = TypeVar("T")
 
 STATIC_DIR = Path(__file__).parent.parent.parent / "static"
 
-# Audio constants for PCM to WAV conversion
-SAMPLE_RATE = 16000
-CHANNELS = 1
-SAMPLE_WIDTH = 2  # 16-bit
+# How often a waiting /transcribe request checks whether its client went away
+DISCONNECT_POLL_INTERVAL_S = 0.25
 
+# Request bodies above this are refused with 413
+DEFAULT_MAX_UPLOAD_MB = 200
 
-def _pcm_to_wav(pcm_data: bytes) -> bytes:
-    """Convert raw PCM audio to WAV format."""
-    import struct
-    import wave
+# Document listings are paged; clients follow the cursor for more
+DEFAULT_DOCUMENT_PAGE_SIZE = 50
+MAX_DOCUMENT_PAGE_SIZE = 500
 
-    output = BytesIO()
-    with wave.open(output, "wb") as wav_file:
-        wav_file.setnchannels(CHANNELS)
-        wav_file.setsampwidth(SAMPLE_WIDTH)
-        wav_file.setframerate(SAMPLE_RATE)
-        wav_file.writeframes(pcm_data)
-    return output.getvalue()
+# Search results returned at most
+MAX_SEARCH_RESULTS = 100
+
+# Utterances of one /transcribe/stream upload transcribing or queued at once
+RAW_UPLOAD_MAX_PENDING_SEGMENTS = 4
+
+# Content types accepted by /transcribe/stream (besides audio/L16)
+RAW_AUDIO_FORMATS = {
+    "audio/webm": "webm",
+    "audio/ogg": "ogg",
+    "audio/wav": "wav",
+    "audio/wave": "wav",
+    "audio/x-wav": "wav",
+}
 
 
 class DocumentCreateRequest(BaseModel):
@@ -50,6 +131,24 @@ class DocumentUpdateRequest(BaseModel):
     user: str
     name: str
     content: str
+    # The version this edit was based on; without it the latest is overwritten
+    version: Optional[int] = None
+
+
+class DocumentAppendRequest(BaseModel):
+    text: str
+
+
+class DocumentPatchRequest(BaseModel):
+    base_version: int
+    start: int
+    end: int
+    text: str
+
+
+class DocumentVersionResponse(BaseModel):
+    id: int
+    version: int
 
 
 class DocumentResponse(BaseModel):
@@ -58,6 +157,7 @@ class DocumentResponse(BaseModel):
     name: str
     content: str
     created: datetime
+    version: int = 0
 
 
 class DocumentSummaryResponse(BaseModel):
@@ -66,146 +166,415 @@ class DocumentSummaryResponse(BaseModel):
     created: datetime
 
 
+class SearchHitResponse(BaseModel):
+    id: int
+    name: str
+    created: datetime
+    snippet: str
+    snippet_html: str
+
+
+class AudioChunkResponse(BaseModel):
+    sequence: int
+    start: float  # Seconds into the document's audio
+    end: float
+    text_start: int  # Span of the content transcribed from the chunk
+    text_end: int
+
+
+class RetranscriptionJobResponse(BaseModel):
+    id: int
+    document_id: int
+    status: str  # queued, running, done or failed
+    chunks_done: int
+    chunks_total: int
+    error: Optional[str] = None
+
+
+class TranscribeResponse(BaseModel):
+    text: str
+    language: str
+    duration: float  # Seconds of audio
+    queue_wait: float  # Seconds waiting for a transcription worker
+    inference: float  # Seconds transcribing
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _wav_bytes(samples: np.ndarray) -> bytes:
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2")
+    wav_audio = BytesIO()
+    with wave.open(wav_audio, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(SAMPLE_RATE)
+        wav_file.writeframes(pcm.tobytes())
+    return wav_audio.getvalue()
+
+
+def _job_response(job: RetranscriptionJob) -> RetranscriptionJobResponse:
+    return RetranscriptionJobResponse(
+        id=job.id,
+        document_id=job.document_id,
+        status=job.status,
+        chunks_done=job.chunks_done,
+        chunks_total=job.chunks_total,
+        error=job.error,
+    )
+
+
+def _segmenter_from_env() -> PcmSegmenter:
+    import webrtcvad
+
+    # VAD setup - configurable via environment variables
+    vad_aggressiveness = int(os.environ.get("VAD_AGGRESSIVENESS", "2"))
+    silence_threshold_ms = int(os.environ.get("VAD_SILENCE_THRESHOLD_MS", "700"))
+    min_speech_duration_ms = int(os.environ.get("VAD_MIN_SPEECH_MS", "300"))
+
+    # Memory bounds: longest segment before a forced cut and silence kept
+    # ahead of the first speech
+    max_segment_ms = int(os.environ.get("STREAM_MAX_SEGMENT_MS", "30000"))
+    pre_roll_ms = int(os.environ.get("STREAM_PRE_ROLL_MS", "300"))
+
+    return PcmSegmenter(
+        webrtcvad.Vad(vad_aggressiveness),
+        silence_threshold_ms=silence_threshold_ms,
+        min_speech_ms=min_speech_duration_ms,
+        max_segment_ms=max_segment_ms,
+        pre_roll_ms=pre_roll_ms,
+    )
+
+
+def _raw_audio_format(content_type: str) -> str:
+    """Stream decoder format for a raw upload's Content-Type."""
+    media_type, *params = (part.strip() for part in content_type.split(";"))
+    media_type = media_type.lower()
+    if media_type == "audio/l16":
+        options = dict(param.lower().split("=", 1) for param in params if "=" in param)
+        if options.get("rate", "16000") != "16000" or options.get("channels", "1") != "1":
+            raise StreamDecodeError("audio/L16 uploads must be 16 kHz mono")
+        return "l16"
+    if media_type not in RAW_AUDIO_FORMATS:
+        raise StreamDecodeError(f"Unsupported audio type: {content_type or 'none'}")
+    return RAW_AUDIO_FORMATS[media_type]
+
+
 def create_app(
     transcription_service: TranscriptionService,
-    document_repository: Optional[DocumentRepositoryPort] = None,
+    document_repository: Optional[
+        Union[DocumentRepositoryPort, AsyncDocumentRepositoryPort]
+    ] = None,
     on_shutdown: Optional[Callable[[], None]] = None,
+    audio_store: Optional[AudioStorePort] = None,
+    job_queue: Optional[JobQueuePort] = None,
+    draft_service: Optional[TranscriptionService] = None,
 ) -> FastAPI:
+    # Blocking repositories run on worker threads, never on the event loop
+    documents: Optional[AsyncDocumentRepositoryPort] = (
+        OffloadedDocumentRepository(document_repository)
+        if isinstance(document_repository, DocumentRepositoryPort)
+        else document_repository
+    )
+
     @asynccontextmanager
     async def lifespan(app: FastAPI) -> AsyncIterator[None]:
-        # Warmup: force model into memory before accepting requests
-        try:
-            transcription_service.transcribe(BytesIO(b""))
-        except Exception:
-            pass  # Empty audio fails, but model is now loaded
+        # Warmup: force models into memory before accepting requests
+        for service in (transcription_service, draft_service):
+            try:
+                if service is not None:
+                    service.transcribe(BytesIO(b""))
+            except Exception:
+                pass  # Empty audio fails, but model is now loaded
         yield
+        transcription_service.close()
+        if draft_service is not None:
+            draft_service.close()
+        if documents is not None:
+            documents.close()
+        if audio_store is not None:
+            audio_store.close()
+        if job_queue is not None:
+            job_queue.close()
         if on_shutdown is not None:
             on_shutdown()
 
     app = FastAPI(lifespan=lifespan)
+    max_upload_mb = float(os.environ.get("MAX_UPLOAD_MB", DEFAULT_MAX_UPLOAD_MB))
+    app.add_middleware(
+        UploadSizeLimitMiddleware, max_bytes=int(max_upload_mb * 1024 * 1024)
+    )
+    stream_metrics = StreamMetrics()
+
+    async def transcribe_for_request(
+        request: Request, transcription: Awaitable[T]
+    ) -> Optional[T]:
+        """Await a transcription off the event loop.
+
+        Returns None if the client disconnects first, in which case the job
+        is cancelled. A full queue becomes 503 and a timed-out job 504.
+        """
+        job = asyncio.ensure_future(transcription)
+        try:
+            while True:
+                done, _ = await asyncio.wait({job}, timeout=DISCONNECT_POLL_INTERVAL_S)
+                if done:
+                    return job.result()
+                if await request.is_disconnected():
+                    return None
+        except TranscriptionUnavailable as e:
+            raise HTTPException(
+                status_code=503, detail=str(e), headers={"Retry-After": "1"}
+            )
+        except TranscriptionTimeout as e:
+            raise HTTPException(status_code=504, detail=str(e))
+        finally:
+            job.cancel()
 
     @app.get("/", response_class=HTMLResponse)
     async def index() -> FileResponse:
         return FileResponse(STATIC_DIR / "index.html")
 
-    @app.post("/transcribe", response_class=HTMLResponse)
+    def transcription_events(
+        segments: AsyncIterator[TranscriptionSegment],
+        append: Callable[[str], Awaitable[Optional[int]]],
+    ) -> StreamingResponse:
+        """Server-sent events: one per decoded segment, then the full result."""
+
+        async def events() -> AsyncIterator[str]:
+            texts: List[str] = []
+            try:
+                async for segment in segments:
+                    texts.append(segment.text)
+                    yield _sse("segment", {
+                        "text": segment.text,
+                        "start": segment.start,
+                        "end": segment.end,
+                    })
+                text = " ".join(texts)
+                version = await append(text)
+            except Exception as e:
+                yield _sse("error", {"message": str(e)})
+                return
+            yield _sse("done", {"text": text, "version": version})
+
+        return StreamingResponse(
+            events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    @app.post("/transcribe", response_class=HTMLResponse, response_model=None)
     async def transcribe(
+        request: Request,
         audio: UploadFile = File(...),
-        existingContent: Annotated[str, Form()] = "",
-        documentName: Annotated[str, Form()] = "Untitled document",
         documentId: Annotated[str, Form()] = "",
-        hx_request: Annotated[Optional[str], Header(alias="HX-Request")] = None,
-    ) -> str:
-        audio_bytes = await audio.read()
-        result = transcription_service.transcribe(BytesIO(audio_bytes))
-
-        # If htmx request, return editor fragment with combined content
-        if hx_request:
-            combined_content = existingContent + result.text
-            doc_id = int(documentId) if documentId else None
-            return render_editor(
-                document_id=doc_id,
-                document_name=documentName,
-                content=combined_content,
-                status="Transcribed",
+        accept: Annotated[str, Header()] = "",
+    ) -> Union[HTMLResponse, StreamingResponse]:
+        """Transcribe a recording; with ``documentId``, add the text to it.
+
+        Only the new text goes back (and the document's new version), never
+        the whole document, so a long document costs nothing per utterance.
+        """
+        document_id = int(documentId) if documentId else None
+
+        async def append(text: str) -> Optional[int]:
+            if document_id is None or documents is None or not text:
+                return None
+            version = await documents.append(document_id, text)
+            if version is None:
+                raise HTTPException(status_code=404, detail="Document not found")
+            return version
+
+        if "text/event-stream" in accept:
+            # Progressive variant: push each segment as soon as it is decoded
+            try:
+                segments = transcription_service.transcribe_stream(audio.file)
+            except TranscriptionUnavailable as e:
+                raise HTTPException(
+                    status_code=503, detail=str(e), headers={"Retry-After": "1"}
+                )
+            return transcription_events(segments, append)
+
+        # The upload is already spooled (to disk once large): hand the file over
+        result = await transcribe_for_request(
+            request, transcription_service.transcribe_async(audio.file)
+        )
+        if result is None:
+            return HTMLResponse("")  # Client went away; nobody is listening
+        version = await append(result.text)
+        headers = {"X-Document-Version": str(version)} if version is not None else None
+        return HTMLResponse(result.text, headers=headers)
+
+    @app.post("/api/transcribe", response_model=TranscribeResponse)
+    async def api_transcribe(request: Request) -> TranscribeResponse:
+        """Stateless transcription for other services.
+
+        The body is raw audio/wav or 16 kHz mono audio/L16, read as-is
+        without multipart parsing. 16 kHz mono 16-bit WAV and L16 are
+        converted straight to samples; other WAVs go through the decoder.
+        """
+        try:
+            audio_format = _raw_audio_format(request.headers.get("content-type", ""))
+        except StreamDecodeError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if audio_format not in ("wav", "l16"):
+            raise HTTPException(
+                status_code=400, detail="Content-Type must be audio/wav or audio/L16"
             )
+        body = await request.body()
+        audio: AudioInput
+        if audio_format == "l16":
+            pcm = np.frombuffer(body, dtype=">i2", count=len(body) // 2)
+            audio = np.multiply(pcm, 1 / 32768, dtype=np.float32)
+            duration = len(pcm) / SAMPLE_RATE
+        else:
+            try:
+                wav = parse_wav_header(body)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=f"Invalid audio: {e}")
+            duration = wav.duration_s
+            if wav.is_native:
+                pcm = np.frombuffer(
+                    body, dtype="<i2", count=wav.data_size // 2, offset=wav.data_offset
+                )
+                audio = np.multiply(pcm, 1 / 32768, dtype=np.float32)
+            else:
+                audio = BytesIO(body)
+        if duration == 0:
+            raise HTTPException(status_code=400, detail="Audio is empty")
+
+        timed = await transcribe_for_request(
+            request, transcription_service.transcribe_timed_async(audio)
+        )
+        if timed is None:
+            # Client went away; the response goes nowhere
+            raise HTTPException(status_code=499, detail="Client closed request")
+        result, timings = timed
+        return TranscribeResponse(
+            text=result.text.strip(),
+            language=result.language,
+            duration=round(duration, 3),
+            queue_wait=round(timings.queue_wait_s, 3),
+            inference=round(timings.inference_s, 3),
+        )
+
+    @app.post("/transcribe/stream", response_class=PlainTextResponse)
+    async def transcribe_stream(request: Request) -> str:
+        """Transcribe a raw audio body while it is still uploading.
+
+        The body (WebM/Ogg Opus, WAV, or 16 kHz mono audio/L16) is decoded
+        and cut at pauses as it arrives; each utterance is transcribed as
+        soon as it is cut, so only the last one is left once the upload
+        completes. Returns the plain text.
+        """
+        try:
+            decoder = create_stream_decoder(
+                _raw_audio_format(request.headers.get("content-type", ""))
+            )
+        except StreamDecodeError as e:
+            raise HTTPException(status_code=415, detail=str(e))
+        segmenter = _segmenter_from_env()
+        pending: Deque["asyncio.Future[TranscriptionResult]"] = deque()
+        texts: List[str] = []
+        submitted = 0
+
+        def submit(segments: List[PcmSegment]) -> None:
+            nonlocal submitted
+            for segment in segments:
+                pending.append(asyncio.ensure_future(
+                    transcription_service.transcribe_pcm_async(segment.samples())
+                ))
+                submitted += 1
+
+        async def collect_oldest() -> None:
+            texts.append((await pending.popleft()).text.strip())
 
-        # Otherwise return just the text (backward compatible)
-        return result.text
+        try:
+            async for chunk in request.stream():
+                pcm = chunk
+                if decoder is not None:
+                    pcm = await asyncio.to_thread(decoder.feed, chunk)
+                submit(segmenter.feed(pcm))
+                # Bound work in flight; the upload waits while the model catches up
+                while len(pending) > RAW_UPLOAD_MAX_PENDING_SEGMENTS:
+                    await collect_oldest()
+            if decoder is not None:
+                submit(segmenter.feed(await asyncio.to_thread(decoder.close)))
+                decoder = None
+            # Keep a short trailing utterance, and transcribe something even
+            # if the VAD never heard speech, as /transcribe would
+            last = segmenter.flush(force=submitted == 0)
+            submit([last] if last is not None else [])
+            while pending:
+                await collect_oldest()
+        except ClientDisconnect:
+            return ""  # Client went away; nobody is listening for the text
+        except StreamDecodeError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except TranscriptionUnavailable as e:
+            raise HTTPException(
+                status_code=503, detail=str(e), headers={"Retry-After": "1"}
+            )
+        except TranscriptionTimeout as e:
+            raise HTTPException(status_code=504, detail=str(e))
+        finally:
+            for job in pending:
+                job.cancel()
+            if decoder is not None:
+                try:
+                    decoder.close()
+                except Exception:
+                    pass
+        return " ".join(text for text in texts if text)
 
     @app.websocket("/api/stream")
     async def stream_transcribe(websocket: WebSocket) -> None:
-        import webrtcvad
-
         await websocket.accept()
         await websocket.send_json({"type": "ready"})
-
-        # VAD setup - configurable via environment variables
-        import os
-        vad_aggressiveness = int(os.environ.get("VAD_AGGRESSIVENESS", "2"))
-        silence_threshold_ms = int(os.environ.get("VAD_SILENCE_THRESHOLD_MS", "700"))
-        min_speech_duration_ms = int(os.environ.get("VAD_MIN_SPEECH_MS", "300"))
-
-        vad = webrtcvad.Vad(vad_aggressiveness)
-        frame_duration_ms = 30  # webrtcvad requires 10, 20, or 30ms frames
-        frame_size = SAMPLE_RATE * frame_duration_ms // 1000 * SAMPLE_WIDTH  # bytes per frame
-
-        audio_buffer = bytearray()  # ALL audio
-        vad_buffer = bytearray()  # Buffer for incomplete VAD frames
-        speech_detected = False
-        speech_duration_ms = 0
-        silence_duration_ms = 0
-
-        async def transcribe_and_send() -> None:
-            nonlocal audio_buffer, speech_detected, speech_duration_ms, silence_duration_ms
-            # Only transcribe if we had enough speech
-            if audio_buffer and speech_duration_ms >= min_speech_duration_ms:
-                wav_audio = _pcm_to_wav(bytes(audio_buffer))
-                result = transcription_service.transcribe(BytesIO(wav_audio))
-                if result.text.strip():  # Only send non-empty transcriptions
-                    await websocket.send_json({
-                        "type": "final",
-                        "text": result.text,
-                    })
-            audio_buffer.clear()
-            speech_detected = False
-            speech_duration_ms = 0
-            silence_duration_ms = 0
-
+        session = StreamSession(
+            websocket.send_json,
+            _segmenter_from_env(),
+            transcription_service,
+            draft_service=draft_service,
+            documents=documents,
+            audio_store=audio_store,
+            metrics=stream_metrics,
+            max_connection_bytes=int(
+                float(os.environ.get("STREAM_MAX_CONNECTION_MB", "16")) * 1024 * 1024
+            ),
+            partial_interval_ms=int(os.environ.get("STREAM_PARTIAL_INTERVAL_MS", "0")),
+            partial_max_ms=int(os.environ.get("STREAM_PARTIAL_MAX_MS", "10000")),
+        )
+        session.open()
         try:
             while True:
                 message = await websocket.receive()
-
                 if message["type"] == "websocket.disconnect":
                     break
-
+                close_code: Optional[int] = None
                 if "bytes" in message:
-                    chunk = message["bytes"]
-                    audio_buffer.extend(chunk)  # Buffer ALL audio
-                    vad_buffer.extend(chunk)
-
-                    # Process complete VAD frames
-                    while len(vad_buffer) >= frame_size:
-                        frame = bytes(vad_buffer[:frame_size])
-                        vad_buffer = vad_buffer[frame_size:]
-
-                        is_speech = vad.is_speech(frame, SAMPLE_RATE)
-
-                        if is_speech:
-                            speech_detected = True
-                            speech_duration_ms += frame_duration_ms
-                            silence_duration_ms = 0
-                        elif speech_detected:
-                            silence_duration_ms += frame_duration_ms
-                            if silence_duration_ms >= silence_threshold_ms:
-                                await transcribe_and_send()
-
+                    close_code = await session.receive_audio(message["bytes"])
                 elif "text" in message:
-                    import json
-                    data = json.loads(message["text"])
-
-                    # Manual end_of_speech signal (backward compatible)
-                    if data.get("type") == "end_of_speech" and audio_buffer:
-                        # Force transcription regardless of min_speech_duration
-                        wav_audio = _pcm_to_wav(bytes(audio_buffer))
-                        result = transcription_service.transcribe(BytesIO(wav_audio))
-                        if result.text.strip():
-                            await websocket.send_json({
-                                "type": "final",
-                                "text": result.text,
-                            })
-                        audio_buffer.clear()
-                        speech_detected = False
-                        speech_duration_ms = 0
-                        silence_duration_ms = 0
-
+                    close_code = await session.receive_control(json.loads(message["text"]))
+                if close_code is not None:
+                    await websocket.close(code=close_code)
+                    break
         except Exception as e:
             try:
                 await websocket.send_json({"type": "error", "message": str(e)})
             except Exception:
                 pass
+        finally:
+            session.close()
 
-    if document_repository is not None:
+    @app.get("/api/stream/metrics")
+    async def stream_metrics_snapshot() -> Dict[str, Any]:
+        """Segmentation and buffer memory totals across stream connections."""
+        return stream_metrics.snapshot()
+
+    if documents is not None:
         @app.post("/documents", status_code=201, response_model=DocumentResponse)
         async def create_document(request: DocumentCreateRequest) -> DocumentResponse:
             doc = Document(
@@ -214,32 +583,109 @@ def create_app(
                 content=request.content,
                 created=datetime.now(),
             )
-            saved = document_repository.save(doc)
+            saved = await documents.save(doc)
             return DocumentResponse(
                 id=saved.id,  # type: ignore[arg-type]
                 user=saved.user,
                 name=saved.name,
                 content=saved.content,
                 created=saved.created,
+                version=saved.version,
             )
 
+        async def list_page(
+            user: str, limit: int, cursor: Optional[str]
+        ) -> Tuple[List[DocumentSummary], Optional[str]]:
+            """One page of the user's documents, newest first, and the next cursor."""
+            try:
+                after = DocumentCursor.decode(cursor) if cursor else None
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            # One extra row tells whether there is a next page
+            summaries = await documents.list_for_user(user, limit + 1, after)
+            if len(summaries) <= limit:
+                return summaries, None
+            page = summaries[:limit]
+            return page, DocumentCursor.after(page[-1]).encode()
+
+        def document_list_url(
+            user: str, limit: int, cursor: Optional[str]
+        ) -> Optional[str]:
+            if cursor is None:
+                return None
+            query = urlencode({"user": user, "limit": limit, "cursor": cursor})
+            return f"/documents/list-html?{query}"
+
         @app.get("/documents", response_model=list[DocumentSummaryResponse])
-        async def list_documents(user: str) -> list[DocumentSummaryResponse]:
-            summaries = document_repository.list_for_user(user)
+        async def list_documents(
+            user: str,
+            response: Response,
+            limit: Annotated[
+                int, Query(ge=1, le=MAX_DOCUMENT_PAGE_SIZE)
+            ] = DEFAULT_DOCUMENT_PAGE_SIZE,
+            cursor: Optional[str] = None,
+        ) -> list[DocumentSummaryResponse]:
+            """A page of documents; X-Next-Cursor is set when there are more."""
+            summaries, next_cursor = await list_page(user, limit, cursor)
+            if next_cursor is not None:
+                response.headers["X-Next-Cursor"] = next_cursor
             return [
                 DocumentSummaryResponse(id=s.id, name=s.name, created=s.created)
                 for s in summaries
             ]
 
         @app.get("/documents/list-html", response_class=HTMLResponse)
-        async def documents_list_html(user: str) -> str:
-            summaries = document_repository.list_for_user(user)
-            documents = [(s.id, s.name, s.created) for s in summaries]
-            return render_document_list(documents)
+        async def documents_list_html(
+            user: str,
+            limit: Annotated[
+                int, Query(ge=1, le=MAX_DOCUMENT_PAGE_SIZE)
+            ] = DEFAULT_DOCUMENT_PAGE_SIZE,
+            cursor: Optional[str] = None,
+        ) -> str:
+            summaries, next_cursor = await list_page(user, limit, cursor)
+            return render_document_list(
+                [(s.id, s.name, s.created) for s in summaries],
+                next_page_url=document_list_url(user, limit, next_cursor),
+                show_empty=cursor is None,
+            )
+
+        @app.get("/documents/search", response_model=list[SearchHitResponse])
+        async def search_documents(
+            user: str,
+            q: str,
+            limit: Annotated[int, Query(ge=1, le=MAX_SEARCH_RESULTS)] = 20,
+        ) -> list[SearchHitResponse]:
+            """The user's documents containing every word of ``q``, best first."""
+            hits = await documents.search(user, q, limit)
+            return [
+                SearchHitResponse(
+                    id=hit.id,
+                    name=hit.name,
+                    created=hit.created,
+                    snippet=hit.snippet.replace(MATCH_START, "").replace(MATCH_END, ""),
+                    snippet_html=str(highlight(hit.snippet)),
+                )
+                for hit in hits
+            ]
+
+        @app.get("/documents/search-html", response_class=HTMLResponse)
+        async def search_documents_html(user: str, q: str = "") -> str:
+            if not q.strip():
+                # A cleared search box shows the ordinary list again
+                summaries, next_cursor = await list_page(
+                    user, DEFAULT_DOCUMENT_PAGE_SIZE, None
+                )
+                return render_document_list(
+                    [(s.id, s.name, s.created) for s in summaries],
+                    next_page_url=document_list_url(
+                        user, DEFAULT_DOCUMENT_PAGE_SIZE, next_cursor
+                    ),
+                )
+            return render_search_results(await documents.search(user, q))
 
         @app.get("/documents/{document_id}", response_model=DocumentResponse)
         async def get_document(document_id: int) -> DocumentResponse:
-            doc = document_repository.load(document_id)
+            doc = await documents.load(document_id)
             if doc is None:
                 raise HTTPException(status_code=404, detail="Document not found")
             return DocumentResponse(
@@ -248,13 +694,14 @@ def create_app(
                 name=doc.name,
                 content=doc.content,
                 created=doc.created,
+                version=doc.version,
             )
 
         @app.put("/documents/{document_id}", response_model=DocumentResponse)
         async def update_document(
             document_id: int, request: DocumentUpdateRequest
         ) -> DocumentResponse:
-            existing = document_repository.load(document_id)
+            existing = await documents.load_metadata(document_id)
             if existing is None:
                 raise HTTPException(status_code=404, detail="Document not found")
             doc = Document(
@@ -263,21 +710,164 @@ def create_app(
                 name=request.name,
                 content=request.content,
                 created=existing.created,
+                version=existing.version if request.version is None else request.version,
             )
-            saved = document_repository.save(doc)
+            try:
+                saved = await documents.save(doc)
+            except VersionConflict as e:
+                raise HTTPException(status_code=409, detail=str(e))
             return DocumentResponse(
                 id=saved.id,  # type: ignore[arg-type]
                 user=saved.user,
                 name=saved.name,
                 content=saved.content,
                 created=saved.created,
+                version=saved.version,
             )
 
+        @app.get(
+            "/documents/{document_id}/versions/{version}", response_model=DocumentResponse
+        )
+        async def get_document_version(document_id: int, version: int) -> DocumentResponse:
+            """The document as it was at an earlier version."""
+            doc = await documents.load_version(document_id, version)
+            if doc is None:
+                raise HTTPException(status_code=404, detail="Version not found")
+            return DocumentResponse(
+                id=doc.id,  # type: ignore[arg-type]
+                user=doc.user,
+                name=doc.name,
+                content=doc.content,
+                created=doc.created,
+                version=doc.version,
+            )
+
+        @app.post(
+            "/documents/{document_id}/append", response_model=DocumentVersionResponse
+        )
+        async def append_to_document(
+            document_id: int, request: DocumentAppendRequest
+        ) -> DocumentVersionResponse:
+            """Add text to the end of a document without resending the rest."""
+            version = await documents.append(document_id, request.text)
+            if version is None:
+                raise HTTPException(status_code=404, detail="Document not found")
+            return DocumentVersionResponse(id=document_id, version=version)
+
+        @app.patch("/documents/{document_id}", response_model=DocumentVersionResponse)
+        async def patch_document(
+            document_id: int, request: DocumentPatchRequest
+        ) -> DocumentVersionResponse:
+            """Replace content[start:end] if the document is still at base_version."""
+            patch = TextPatch(start=request.start, end=request.end, text=request.text)
+            try:
+                version = await documents.apply_patch(
+                    document_id, request.base_version, patch
+                )
+            except VersionConflict as e:
+                raise HTTPException(status_code=409, detail=str(e))
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            if version is None:
+                raise HTTPException(status_code=404, detail="Document not found")
+            return DocumentVersionResponse(id=document_id, version=version)
+
         @app.delete("/documents/{document_id}", status_code=204)
         async def delete_document(document_id: int) -> None:
-            deleted = document_repository.delete(document_id)
+            deleted = await documents.delete(document_id)
             if not deleted:
                 raise HTTPException(status_code=404, detail="Document not found")
+            if audio_store is not None:
+                await asyncio.to_thread(audio_store.delete, document_id)
+
+        if audio_store is not None:
+            async def document_audio(
+                document_id: int, start: float, end: Optional[float]
+            ) -> np.ndarray:
+                samples = await asyncio.to_thread(
+                    audio_store.read, document_id, start, end
+                )
+                if len(samples) == 0:
+                    raise HTTPException(status_code=404, detail="No audio in range")
+                return samples
+
+            @app.get(
+                "/documents/{document_id}/audio/chunks",
+                response_model=list[AudioChunkResponse],
+            )
+            async def document_audio_chunks(document_id: int) -> list[AudioChunkResponse]:
+                """The document's stored audio and the text each part produced."""
+                chunks = await asyncio.to_thread(audio_store.chunks, document_id)
+                return [
+                    AudioChunkResponse(
+                        sequence=chunk.sequence,
+                        start=chunk.start,
+                        end=chunk.end,
+                        text_start=chunk.text_start,
+                        text_end=chunk.text_end,
+                    )
+                    for chunk in chunks
+                ]
+
+            @app.get("/documents/{document_id}/audio")
+            async def play_document_audio(
+                document_id: int,
+                start: Annotated[float, Query(ge=0)] = 0.0,
+                end: Annotated[Optional[float], Query(gt=0)] = None,
+            ) -> Response:
+                """The document's audio between start and end seconds, as WAV."""
+                samples = await document_audio(document_id, start, end)
+                return Response(_wav_bytes(samples), media_type="audio/wav")
+
+            @app.post(
+                "/documents/{document_id}/audio/transcribe",
+                response_model=TranscribeResponse,
+            )
+            async def retranscribe_document_audio(
+                request: Request,
+                document_id: int,
+                start: Annotated[float, Query(ge=0)] = 0.0,
+                end: Annotated[Optional[float], Query(gt=0)] = None,
+            ) -> TranscribeResponse:
+                """Transcribe a range of the stored audio again; the document is unchanged."""
+                samples = await document_audio(document_id, start, end)
+                timed = await transcribe_for_request(
+                    request, transcription_service.transcribe_timed_async(samples)
+                )
+                if timed is None:
+                    raise HTTPException(status_code=499, detail="Client closed request")
+                result, timings = timed
+                return TranscribeResponse(
+                    text=result.text.strip(),
+                    language=result.language,
+                    duration=round(len(samples) / SAMPLE_RATE, 3),
+                    queue_wait=round(timings.queue_wait_s, 3),
+                    inference=round(timings.inference_s, 3),
+                )
+
+        if audio_store is not None and job_queue is not None:
+            @app.post(
+                "/documents/{document_id}/retranscribe",
+                status_code=202,
+                response_model=RetranscriptionJobResponse,
+            )
+            async def retranscribe_document(
+                document_id: int,
+            ) -> RetranscriptionJobResponse:
+                """Queue the document's audio for the background worker."""
+                if not await asyncio.to_thread(audio_store.chunks, document_id):
+                    raise HTTPException(status_code=404, detail="Document has no audio")
+                job = await asyncio.to_thread(job_queue.enqueue, document_id)
+                return _job_response(job)
+
+            @app.get(
+                "/retranscriptions/{job_id}", response_model=RetranscriptionJobResponse
+            )
+            async def retranscription_progress(job_id: int) -> RetranscriptionJobResponse:
+                job = await asyncio.to_thread(job_queue.get, job_id)
+                if job is None:
+                    raise HTTPException(status_code=404, detail="Job not found")
+                return _job_response(job)
 
         # htmx endpoints - return HTML fragments
         @app.post("/editor/new", response_class=HTMLResponse)
@@ -294,11 +884,12 @@ def create_app(
             documentName: Annotated[str, Form()] = "Untitled document",
             content: Annotated[str, Form()] = "",
             user: Annotated[str, Form()] = "romilly",
+            documentVersion: Annotated[str, Form()] = "",
         ) -> str:
             # If documentId is set, update existing document
             if documentId:
                 doc_id = int(documentId)
-                existing = document_repository.load(doc_id)
+                existing = await documents.load_metadata(doc_id)
                 if existing:
                     doc = Document(
                         id=doc_id,
@@ -306,10 +897,23 @@ def create_app(
                         name=documentName,
                         content=content,
                         created=existing.created,
+                        version=(
+                            int(documentVersion) if documentVersion else existing.version
+                        ),
                     )
-                    saved = document_repository.save(doc)
+                    try:
+                        saved = await documents.save(doc)
+                    except VersionConflict as e:
+                        # Keep this editor's text; saving again overwrites
+                        return render_editor(
+                            doc_id, documentName, content, user,
+                            version=e.current_version,
+                            status="Changed elsewhere since it was opened. "
+                            "Save again to overwrite.",
+                        )
                     return render_editor(
                         saved.id, saved.name, saved.content, saved.user,
+                        version=saved.version,
                         status=f'Saved "{saved.name}"',
                     )
 
@@ -320,19 +924,21 @@ def create_app(
                 content=content,
                 created=datetime.now(),
             )
-            saved = document_repository.save(doc)
+            saved = await documents.save(doc)
             return render_editor(
                 saved.id, saved.name, saved.content, saved.user,
+                version=saved.version,
                 status=f'Saved "{saved.name}"',
             )
 
         @app.get("/editor/load/{document_id}", response_class=HTMLResponse)
         async def editor_load(document_id: int) -> str:
-            doc = document_repository.load(document_id)
+            doc = await documents.load(document_id)
             if doc is None:
                 raise HTTPException(status_code=404, detail="Document not found")
             return render_editor(
                 doc.id, doc.name, doc.content, doc.user,
+                version=doc.version,
                 status=f'Opened "{doc.name}"',
             )
 
@@ -0,0 +1,197 @@
+"""Incremental decoding of streamed audio into 16 kHz mono PCM.
+
+Clients on slow links send Opus instead of raw PCM, either as a WebM or
+Ogg container (what MediaRecorder produces) or as bare Opus packets, one
+per WebSocket message (what WebCodecs' AudioEncoder produces). Uploads
+may also be WAV or big-endian L16. Each decoder turns the bytes it is fed
+into 16-bit little-endian PCM for the segmenter as soon as they can be
+decoded, without waiting for the end of the stream.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Optional, Protocol
+
+import av
+import numpy as np
+
+from great_dictator.adapters.inbound.pcm_segmenter import SAMPLE_RATE
+
+OPUS_SAMPLE_RATE = 48000
+
+# Formats accepted in the stream's start message, besides raw "pcm"
+CONTAINER_FORMATS = {"webm", "ogg", "wav"}
+PACKET_FORMATS = {"opus"}
+
+
+class StreamDecoder(Protocol):
+    def feed(self, data: bytes) -> bytes:
+        """Decode a chunk; returns the PCM it completed (possibly empty)."""
+        ...
+
+    def close(self) -> bytes:
+        """End the stream; returns any PCM still held back."""
+        ...
+
+
+class StreamDecodeError(ValueError):
+    """Raised for an unsupported stream format or undecodable stream data."""
+
+
+def _resampler() -> av.AudioResampler:
+    return av.AudioResampler(format="s16", layout="mono", rate=SAMPLE_RATE)
+
+
+def _to_pcm(resampler: av.AudioResampler, frame: Optional[av.AudioFrame]) -> bytes:
+    return b"".join(
+        resampled.to_ndarray().tobytes() for resampled in resampler.resample(frame)
+    )
+
+
+class OpusPacketDecoder:
+    """Decodes bare Opus packets, one packet per ``feed`` call."""
+
+    def __init__(self, sample_rate: int = OPUS_SAMPLE_RATE, channels: int = 1):
+        self._codec = av.CodecContext.create("opus", "r")
+        self._codec.sample_rate = sample_rate
+        self._codec.layout = "mono" if channels == 1 else "stereo"
+        self._resampler = _resampler()
+
+    def feed(self, data: bytes) -> bytes:
+        try:
+            frames = self._codec.decode(av.Packet(data))
+        except av.FFmpegError as e:
+            raise StreamDecodeError(f"Cannot decode Opus packet: {e}") from e
+        return b"".join(_to_pcm(self._resampler, frame) for frame in frames)
+
+    def close(self) -> bytes:
+        return _to_pcm(self._resampler, None)
+
+
+class L16Decoder:
+    """Converts big-endian 16-bit PCM (audio/L16) to little-endian."""
+
+    def __init__(self) -> None:
+        self._odd_byte = b""
+
+    def feed(self, data: bytes) -> bytes:
+        data = self._odd_byte + data
+        even = len(data) - len(data) % 2
+        self._odd_byte = data[even:]
+        return np.frombuffer(data, dtype=">i2", count=even // 2).astype("<i2").tobytes()
+
+    def close(self) -> bytes:
+        return b""
+
+
+class _BlockingReader:
+    """File-like source for the demuxer that waits for data to be fed.
+
+    ``idle`` is set whenever the demuxer has consumed everything fed so far
+    and is waiting for more, i.e. it has decoded all it can.
+    """
+
+    def __init__(self) -> None:
+        self.condition = threading.Condition()
+        self.idle = False
+        self._data = bytearray()
+        self._eof = False
+
+    def read(self, size: int) -> bytes:
+        with self.condition:
+            while not self._data and not self._eof:
+                self.idle = True
+                self.condition.notify_all()
+                self.condition.wait()
+            chunk = bytes(self._data[:size])
+            del self._data[:size]
+            return chunk
+
+    def append(self, data: bytes) -> None:
+        with self.condition:
+            self._data += data
+            self.idle = False
+            self.condition.notify_all()
+
+    def end(self) -> None:
+        with self.condition:
+            self._eof = True
+            self.condition.notify_all()
+
+
+class ContainerStreamDecoder:
+    """Demuxes and decodes a WebM, Ogg or WAV stream as it arrives.
+
+    libav reads containers through blocking calls, so demuxing runs on a
+    background thread that blocks on a reader fed by ``feed``. ``feed``
+    waits until that thread has decoded everything it was given, so it
+    should be called off the event loop.
+    """
+
+    def __init__(self, container_format: str):
+        self._format = container_format
+        self._reader = _BlockingReader()
+        self._pcm = bytearray()
+        self._finished = False
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(
+            target=self._run, name=f"{container_format}-decoder", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        try:
+            # Small probe: stream parameters are in the header, and a larger
+            # probe would block until seconds of audio had arrived
+            with av.open(
+                self._reader,
+                format=self._format,
+                options={"probesize": "32", "analyzeduration": "0"},
+            ) as container:
+                resampler = _resampler()
+                for packet in container.demux(audio=0):
+                    for frame in packet.decode():
+                        self._emit(_to_pcm(resampler, frame))
+                self._emit(_to_pcm(resampler, None))
+        except Exception as e:
+            self._error = e
+        finally:
+            with self._reader.condition:
+                self._finished = True
+                self._reader.condition.notify_all()
+
+    def _emit(self, pcm: bytes) -> None:
+        with self._reader.condition:
+            self._pcm += pcm
+
+    def _take(self) -> bytes:
+        if self._error is not None:
+            raise StreamDecodeError(f"Cannot decode {self._format} stream: {self._error}")
+        pcm = bytes(self._pcm)
+        self._pcm.clear()
+        return pcm
+
+    def feed(self, data: bytes) -> bytes:
+        self._reader.append(data)
+        with self._reader.condition:
+            self._reader.condition.wait_for(lambda: self._reader.idle or self._finished)
+            return self._take()
+
+    def close(self) -> bytes:
+        self._reader.end()
+        self._thread.join()
+        with self._reader.condition:
+            return self._take()
+
+
+def create_stream_decoder(stream_format: str) -> Optional[StreamDecoder]:
+    """Decoder for a negotiated stream format; None for raw PCM."""
+    if stream_format == "pcm":
+        return None
+    if stream_format in CONTAINER_FORMATS:
+        return ContainerStreamDecoder(stream_format)
+    if stream_format in PACKET_FORMATS:
+        return OpusPacketDecoder()
+    if stream_format == "l16":
+        return L16Decoder()
+    raise StreamDecodeError(f"Unsupported stream format: {stream_format}")
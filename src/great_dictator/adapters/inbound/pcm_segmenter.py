@@ -0,0 +1,392 @@
+"""Buffering and VAD segmentation of streamed 16 kHz mono 16-bit PCM.
+
+Incoming chunks are split into VAD frames with memoryviews (no per-frame
+copies) and appended into a preallocated buffer that reserves room for a
+WAV header. A finished segment hands that buffer over as-is: the header is
+written in place and the samples can be viewed without copying.
+
+Memory per stream is bounded: silence before the first speech frame is
+trimmed to a short pre-roll, and a segment that reaches the maximum length
+is split at the quietest frame near its end.
+"""
+from __future__ import annotations
+
+import struct
+from dataclasses import dataclass, replace
+from typing import Iterator, List, Optional, Protocol, Tuple
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+CHANNELS = 1
+SAMPLE_WIDTH = 2  # 16-bit
+BYTES_PER_MS = SAMPLE_RATE * SAMPLE_WIDTH // 1000
+
+WAV_HEADER_SIZE = 44
+# One second of audio; buffers double from here as speech continues
+_INITIAL_CAPACITY = SAMPLE_RATE * SAMPLE_WIDTH
+
+
+def _write_wav_header(buffer: bytearray, data_size: int) -> None:
+    byte_rate = SAMPLE_RATE * CHANNELS * SAMPLE_WIDTH
+    struct.pack_into(
+        "<4sI4s4sIHHIIHH4sI",
+        buffer,
+        0,
+        b"RIFF",
+        36 + data_size,
+        b"WAVE",
+        b"fmt ",
+        16,  # fmt chunk size
+        1,  # PCM
+        CHANNELS,
+        SAMPLE_RATE,
+        byte_rate,
+        CHANNELS * SAMPLE_WIDTH,
+        SAMPLE_WIDTH * 8,
+        b"data",
+        data_size,
+    )
+
+
+@dataclass(frozen=True)
+class WavInfo:
+    sample_rate: int
+    channels: int
+    sample_width: int
+    data_offset: int
+    data_size: int
+
+    @property
+    def duration_s(self) -> float:
+        return self.data_size / (self.sample_rate * self.channels * self.sample_width)
+
+    @property
+    def is_native(self) -> bool:
+        """True for 16 kHz mono 16-bit PCM, which needs no decoding."""
+        return (self.sample_rate, self.channels, self.sample_width) == (
+            SAMPLE_RATE, CHANNELS, SAMPLE_WIDTH
+        )
+
+
+def parse_wav_header(data: bytes) -> WavInfo:
+    """Locate the PCM samples in a WAV file without copying them.
+
+    Raises ValueError if ``data`` is not an uncompressed PCM WAV file.
+    """
+    if len(data) < 12 or data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise ValueError("Not a WAV file")
+    position = 12
+    fmt: Optional[Tuple[int, int, int, int]] = None
+    while position + 8 <= len(data):
+        chunk_id, chunk_size = struct.unpack_from("<4sI", data, position)
+        body = position + 8
+        if chunk_id == b"fmt " and chunk_size >= 16:
+            audio_format, channels, sample_rate, _, _, bits = struct.unpack_from(
+                "<HHIIHH", data, body
+            )
+            fmt = (audio_format, channels, sample_rate, bits)
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("WAV data chunk precedes its format chunk")
+            audio_format, channels, sample_rate, bits = fmt
+            # 0xFFFE is WAVE_FORMAT_EXTENSIBLE, used for plain PCM by some writers
+            if audio_format not in (1, 0xFFFE) or bits % 8 or not channels or not sample_rate:
+                raise ValueError("Only uncompressed PCM WAV is supported")
+            # Streaming writers leave the size at 0 or 0xFFFFFFFF: use what is there
+            size = min(chunk_size, len(data) - body) or len(data) - body
+            return WavInfo(sample_rate, channels, bits // 8, body, size)
+        position = body + chunk_size + (chunk_size & 1)  # Chunks are word-aligned
+    raise ValueError("WAV file has no data chunk")
+
+
+class PcmSegment:
+    """A finished stretch of PCM audio, viewable as WAV or as samples."""
+
+    def __init__(self, buffer: bytearray, size: int):
+        self._buffer = buffer
+        self._size = size
+        _write_wav_header(buffer, size)
+
+    @property
+    def duration_ms(self) -> int:
+        return self._size // BYTES_PER_MS
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the segment, header included."""
+        return len(self._buffer)
+
+    def pcm(self) -> memoryview:
+        return memoryview(self._buffer)[WAV_HEADER_SIZE:WAV_HEADER_SIZE + self._size]
+
+    def wav(self) -> memoryview:
+        """The segment as a complete WAV file, header included."""
+        return memoryview(self._buffer)[:WAV_HEADER_SIZE + self._size]
+
+    def samples(self) -> np.ndarray:
+        """Samples as float32 in [-1, 1], the format Whisper consumes."""
+        pcm = np.frombuffer(
+            self._buffer, dtype="<i2", count=self._size // SAMPLE_WIDTH, offset=WAV_HEADER_SIZE
+        )
+        return np.multiply(pcm, 1 / 32768, dtype=np.float32)
+
+
+class PcmBuffer:
+    """Append-only PCM buffer with amortised growth and zero-copy hand-off."""
+
+    def __init__(self, capacity: int = _INITIAL_CAPACITY):
+        self._data = bytearray(WAV_HEADER_SIZE + capacity)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        """Bytes allocated, which may exceed the audio held."""
+        return len(self._data)
+
+    def extend(self, pcm: memoryview) -> None:
+        end = WAV_HEADER_SIZE + self._size + len(pcm)
+        if end > len(self._data):
+            grown = bytearray(max(end, 2 * len(self._data)))
+            grown[:WAV_HEADER_SIZE + self._size] = memoryview(self._data)[
+                :WAV_HEADER_SIZE + self._size
+            ]
+            self._data = grown
+        self._data[WAV_HEADER_SIZE + self._size:end] = pcm
+        self._size += len(pcm)
+
+    def detach(self) -> PcmSegment:
+        """Hand the buffered audio over as a segment and start afresh."""
+        del self._data[WAV_HEADER_SIZE + self._size:]  # Give back unused capacity
+        segment = PcmSegment(self._data, self._size)
+        self._data = bytearray(WAV_HEADER_SIZE + _INITIAL_CAPACITY)
+        self._size = 0
+        return segment
+
+    def split(self, at: int) -> PcmSegment:
+        """Hand over the first ``at`` bytes as a segment and keep the rest."""
+        rest = self._data[WAV_HEADER_SIZE + at:WAV_HEADER_SIZE + self._size]
+        del self._data[WAV_HEADER_SIZE + at:]
+        segment = PcmSegment(self._data, at)
+        self._data = bytearray(WAV_HEADER_SIZE + max(_INITIAL_CAPACITY, len(rest)))
+        self._data[WAV_HEADER_SIZE:WAV_HEADER_SIZE + len(rest)] = rest
+        self._size = len(rest)
+        return segment
+
+    def drop_front(self, count: int) -> None:
+        """Discard the oldest ``count`` bytes."""
+        start = WAV_HEADER_SIZE + count
+        self._data[WAV_HEADER_SIZE:WAV_HEADER_SIZE + self._size - count] = self._data[
+            start:WAV_HEADER_SIZE + self._size
+        ]
+        self._size -= count
+
+    def frame_energies(self, count: int, frame_size: int) -> np.ndarray:
+        """Mean square amplitude of each frame in the last ``count`` bytes."""
+        pcm = np.frombuffer(
+            self._data,
+            dtype="<i2",
+            count=count // SAMPLE_WIDTH,
+            offset=WAV_HEADER_SIZE + self._size - count,
+        )
+        frames = pcm.astype(np.float32).reshape(-1, frame_size // SAMPLE_WIDTH)
+        return np.square(frames).mean(axis=1)
+
+    def snapshot(self) -> PcmSegment:
+        """A copy of the audio so far, for decoding while buffering continues."""
+        copy = bytearray(WAV_HEADER_SIZE + self._size)
+        copy[WAV_HEADER_SIZE:] = memoryview(self._data)[
+            WAV_HEADER_SIZE:WAV_HEADER_SIZE + self._size
+        ]
+        return PcmSegment(copy, self._size)
+
+    def clear(self) -> None:
+        self._size = 0
+
+
+class FrameSplitter:
+    """Splits a stream of arbitrarily sized chunks into fixed-size frames.
+
+    Whole frames inside a chunk are yielded as memoryviews into that chunk;
+    only the fragment straddling two chunks is copied (into a buffer smaller
+    than one frame), so per-chunk work is O(chunk).
+    """
+
+    def __init__(self, frame_size: int):
+        self._frame_size = frame_size
+        self._partial = bytearray()
+
+    def frames(self, chunk: memoryview) -> Iterator[memoryview]:
+        position = 0
+        if self._partial:
+            needed = self._frame_size - len(self._partial)
+            self._partial += chunk[:needed]
+            position = needed
+            if len(self._partial) < self._frame_size:
+                return
+            yield memoryview(bytes(self._partial))
+            self._partial.clear()
+        while position + self._frame_size <= len(chunk):
+            yield chunk[position:position + self._frame_size]
+            position += self._frame_size
+        self._partial += chunk[position:]
+
+
+class VoiceActivityDetector(Protocol):
+    def is_speech(self, buf: bytes, sample_rate: int) -> bool:
+        ...
+
+
+@dataclass
+class _SpeechState:
+    speech_detected: bool = False
+    speech_ms: int = 0
+    silence_ms: int = 0
+
+
+@dataclass(frozen=True)
+class SegmenterStats:
+    segments: int = 0
+    dropped_segments: int = 0
+    forced_splits: int = 0
+    trimmed_ms: int = 0
+    peak_buffer_bytes: int = 0
+
+    def merge(self, other: SegmenterStats) -> SegmenterStats:
+        """Totals of both, keeping the larger peak."""
+        return SegmenterStats(
+            segments=self.segments + other.segments,
+            dropped_segments=self.dropped_segments + other.dropped_segments,
+            forced_splits=self.forced_splits + other.forced_splits,
+            trimmed_ms=self.trimmed_ms + other.trimmed_ms,
+            peak_buffer_bytes=max(self.peak_buffer_bytes, other.peak_buffer_bytes),
+        )
+
+
+class PcmSegmenter:
+    """Cuts streamed PCM into utterances at pauses detected by a VAD.
+
+    A segment ends after ``silence_threshold_ms`` of non-speech following
+    speech; segments with less than ``min_speech_ms`` of speech are
+    dropped as noise. Before the first speech frame only the last
+    ``pre_roll_ms`` of audio is kept. A segment reaching ``max_segment_ms``
+    (0 means unlimited) is cut at the quietest frame of its last
+    ``split_window_ms``, and the audio after the cut starts the next one.
+    """
+
+    def __init__(
+        self,
+        vad: VoiceActivityDetector,
+        silence_threshold_ms: int = 700,
+        min_speech_ms: int = 300,
+        frame_ms: int = 30,  # webrtcvad requires 10, 20, or 30ms frames
+        max_segment_ms: int = 30000,
+        split_window_ms: int = 2000,
+        pre_roll_ms: int = 300,
+    ):
+        self._vad = vad
+        self._silence_threshold_ms = silence_threshold_ms
+        self._min_speech_ms = min_speech_ms
+        self._frame_ms = frame_ms
+        self._frame_size = frame_ms * BYTES_PER_MS
+        # Whole frames only, so the buffer always ends on a frame boundary
+        self._max_segment_size = max_segment_ms // frame_ms * self._frame_size
+        self._split_window_size = max(split_window_ms // frame_ms, 1) * self._frame_size
+        self._pre_roll_size = pre_roll_ms // frame_ms * self._frame_size
+        self._frames = FrameSplitter(self._frame_size)
+        self._buffer = PcmBuffer()
+        self._state = _SpeechState()
+        self._stats = SegmenterStats()
+
+    @property
+    def speech_ms(self) -> int:
+        """Speech heard so far in the current segment."""
+        return self._state.speech_ms
+
+    @property
+    def buffered_ms(self) -> int:
+        return len(self._buffer) // BYTES_PER_MS
+
+    @property
+    def has_audio(self) -> bool:
+        return len(self._buffer) > 0
+
+    @property
+    def buffer_bytes(self) -> int:
+        """Memory held by the buffer of the segment in progress."""
+        return self._buffer.capacity
+
+    def stats(self) -> SegmenterStats:
+        return self._stats
+
+    def feed(self, chunk: bytes) -> List[PcmSegment]:
+        """Buffer a chunk and return any segments it completed."""
+        finished: List[PcmSegment] = []
+        for frame in self._frames.frames(memoryview(chunk)):
+            self._buffer.extend(frame)
+            state = self._state
+            if self._vad.is_speech(frame, SAMPLE_RATE):  # type: ignore[arg-type]
+                if not state.speech_detected:
+                    self._trim(self._pre_roll_size + self._frame_size)
+                state.speech_detected = True
+                state.speech_ms += self._frame_ms
+                state.silence_ms = 0
+            elif state.speech_detected:
+                state.silence_ms += self._frame_ms
+                if state.silence_ms >= self._silence_threshold_ms:
+                    segment = self.flush()
+                    if segment is not None:
+                        finished.append(segment)
+            elif len(self._buffer) >= 2 * self._pre_roll_size + self._frame_size:
+                # Trim in batches so each byte of leading silence is moved O(1) times
+                self._trim(self._pre_roll_size)
+            if self._max_segment_size and len(self._buffer) >= self._max_segment_size:
+                finished.append(self._split())
+        if self._buffer.capacity > self._stats.peak_buffer_bytes:
+            self._stats = replace(self._stats, peak_buffer_bytes=self._buffer.capacity)
+        return finished
+
+    def _trim(self, keep: int) -> None:
+        excess = len(self._buffer) - keep
+        if excess > 0:
+            self._buffer.drop_front(excess)
+            self._stats = replace(
+                self._stats, trimmed_ms=self._stats.trimmed_ms + excess // BYTES_PER_MS
+            )
+
+    def _split(self) -> PcmSegment:
+        size = len(self._buffer)
+        window = min(self._split_window_size, size)
+        quietest = int(np.argmin(self._buffer.frame_energies(window, self._frame_size)))
+        at = max(size - window + quietest * self._frame_size, self._frame_size)
+        segment = self._buffer.split(at)
+        rest_ms = len(self._buffer) // BYTES_PER_MS
+        state = self._state
+        state.speech_ms = min(state.speech_ms, rest_ms)
+        state.silence_ms = min(state.silence_ms, rest_ms)
+        self._stats = replace(
+            self._stats,
+            segments=self._stats.segments + 1,
+            forced_splits=self._stats.forced_splits + 1,
+        )
+        return segment
+
+    def snapshot(self) -> PcmSegment:
+        return self._buffer.snapshot()
+
+    def flush(self, force: bool = False) -> Optional[PcmSegment]:
+        """End the current segment; returns it unless it was too short to keep."""
+        keep = self.has_audio and (force or self._state.speech_ms >= self._min_speech_ms)
+        segment = self._buffer.detach() if keep else None
+        self._buffer.clear()
+        if keep:
+            self._stats = replace(self._stats, segments=self._stats.segments + 1)
+        elif self._state.speech_detected:
+            self._stats = replace(
+                self._stats, dropped_segments=self._stats.dropped_segments + 1
+            )
+        self._state = _SpeechState()
+        return segment
@@ -0,0 +1,48 @@
+"""Memory and segmentation metrics across /api/stream connections."""
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import Any, Dict
+
+from great_dictator.adapters.inbound.pcm_segmenter import PcmSegmenter, SegmenterStats
+
+
+class StreamMetrics:
+    """Aggregates segmenter stats of open and closed stream connections.
+
+    Used from the event loop only, so no locking is needed.
+    """
+
+    def __init__(self) -> None:
+        self._closed = SegmenterStats()
+        self._open: Dict[int, PcmSegmenter] = {}
+        self._connections = 0
+        self._overflows = 0
+        self._peak_connection_bytes = 0
+
+    def opened(self, segmenter: PcmSegmenter) -> None:
+        self._open[id(segmenter)] = segmenter
+        self._connections += 1
+
+    def closed(self, segmenter: PcmSegmenter) -> None:
+        if self._open.pop(id(segmenter), None) is not None:
+            self._closed = self._closed.merge(segmenter.stats())
+
+    def observe(self, connection_bytes: int) -> None:
+        """Record a connection's current memory use (buffer plus queued audio)."""
+        self._peak_connection_bytes = max(self._peak_connection_bytes, connection_bytes)
+
+    def overflowed(self) -> None:
+        self._overflows += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        stats = self._closed
+        for segmenter in self._open.values():
+            stats = stats.merge(segmenter.stats())
+        return {
+            "active_connections": len(self._open),
+            "connections": self._connections,
+            "overflows": self._overflows,
+            "peak_connection_bytes": self._peak_connection_bytes,
+            **asdict(stats),
+        }
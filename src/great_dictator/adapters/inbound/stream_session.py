@@ -0,0 +1,378 @@
+"""State and handlers of one /api/stream WebSocket connection."""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+import numpy as np
+
+from great_dictator.adapters.inbound.opus_decoder import (
+    StreamDecodeError,
+    StreamDecoder,
+    create_stream_decoder,
+)
+from great_dictator.adapters.inbound.pcm_segmenter import PcmSegment, PcmSegmenter
+from great_dictator.adapters.inbound.stream_metrics import StreamMetrics
+from great_dictator.domain.audio import AudioStorePort
+from great_dictator.domain.document import (
+    AsyncDocumentRepositoryPort,
+    TextPatch,
+    VersionConflict,
+)
+from great_dictator.domain.transcript import LocalAgreement, locate_draft
+from great_dictator.domain.transcription import TranscriptionService
+
+# WebSocket close codes: unsupported stream format, unknown document,
+# exceeded memory cap
+WS_CLOSE_UNSUPPORTED_DATA = 1003
+WS_CLOSE_POLICY_VIOLATION = 1008
+WS_CLOSE_TRY_AGAIN_LATER = 1013
+
+
+class StreamSession:
+    """One streaming connection: its audio, transcription jobs and document.
+
+    The route hands over what the client sends, binary messages to
+    ``receive_audio`` and JSON ones to ``receive_control``, and closes the
+    socket with the code either returns. Messages for the client go out
+    through ``send``. Segments are transcribed in order by a sender task
+    started by ``open``, so the receive loop keeps reading (and notices a
+    disconnect) while the model is busy.
+
+    Interim transcripts re-decode the growing segment every
+    ``partial_interval_ms`` of speech (0 disables), never more than one at a
+    time, and not at all once the segment exceeds ``partial_max_ms``.
+
+    With a ``draft_service``, finals come from its fast model and are marked
+    "draft"; each is then decoded again by the main model on a task of its
+    own, and a "revised" message with the same segment number replaces it.
+    Partials use the fast model too.
+
+    With a document bound by the start message, finals are appended to it
+    here, so the client never sends the document back. With an audio store,
+    each final's audio is kept against the text it added.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[Dict[str, Any]], Awaitable[None]],
+        segmenter: PcmSegmenter,
+        transcription_service: TranscriptionService,
+        draft_service: Optional[TranscriptionService] = None,
+        documents: Optional[AsyncDocumentRepositoryPort] = None,
+        audio_store: Optional[AudioStorePort] = None,
+        metrics: Optional[StreamMetrics] = None,
+        max_connection_bytes: int = 16 * 1024 * 1024,
+        partial_interval_ms: int = 0,
+        partial_max_ms: int = 10000,
+    ):
+        self._send = send
+        self._segmenter = segmenter
+        self._transcription_service = transcription_service
+        self._draft_service = draft_service
+        self._live_service = draft_service or transcription_service
+        self._documents = documents
+        self._audio_store = audio_store
+        self._metrics = metrics or StreamMetrics()
+        # Memory cap, covering buffered plus queued audio
+        self._max_connection_bytes = max_connection_bytes
+        self._partial_interval_ms = partial_interval_ms
+        self._partial_max_ms = partial_max_ms
+
+        self._speech_at_last_partial_ms = 0
+        self._partial_pending = False
+        self._queued_bytes = 0
+        self._segment_number = 0
+        self._agreement = LocalAgreement()
+        self._last_final_text = ""
+        self._revisions: Set[asyncio.Future[None]] = set()
+
+        self._bound_document: Optional[int] = None
+        self._bound_length = 0
+        self._needs_separator = False
+
+        # Audio is raw PCM unless the first message negotiates a compressed
+        # format: {"type": "start", "format": "webm" | "ogg" | "opus" | "pcm"}.
+        # It may also bind a document: {"type": "start", "document_id": 12}
+        self._decoder: Optional[StreamDecoder] = None
+        self._audio_started = False
+
+        # Each job is (kind, segment number, audio)
+        self._jobs: asyncio.Queue[Tuple[str, int, PcmSegment]] = asyncio.Queue()
+        self._sender: Optional[asyncio.Future[None]] = None
+
+    def open(self) -> None:
+        """Start transcribing; call once the client has been told it is ready."""
+        self._metrics.opened(self._segmenter)
+        self._sender = asyncio.ensure_future(self._send_transcriptions())
+
+    async def receive_audio(self, data: bytes) -> Optional[int]:
+        """Take a binary message; returns a close code if the stream must end."""
+        self._audio_started = True
+        pcm = data
+        if self._decoder is not None:
+            # Container demuxing blocks, so decode off the event loop
+            pcm = await asyncio.to_thread(self._decoder.feed, pcm)
+        finished = self._segmenter.feed(pcm)
+        for segment in finished:
+            self._finish_segment(segment)
+        self._metrics.observe(self._connection_bytes())
+        if self._connection_bytes() > self._max_connection_bytes:
+            # Transcription cannot keep up with this client
+            self._metrics.overflowed()
+            await self._send({"type": "error", "message": "Stream buffer limit exceeded"})
+            return WS_CLOSE_TRY_AGAIN_LATER
+        if (
+            self._partial_interval_ms
+            and not finished
+            and self._segmenter.speech_ms - self._speech_at_last_partial_ms
+            >= self._partial_interval_ms
+        ):
+            self._request_partial()
+        return None
+
+    async def receive_control(self, data: Dict[str, Any]) -> Optional[int]:
+        """Take a JSON message; returns a close code if the stream must end."""
+        if (
+            data.get("type") == "start"
+            and not self._audio_started
+            and self._decoder is None
+        ):
+            try:
+                self._decoder = create_stream_decoder(data.get("format", "pcm"))
+            except StreamDecodeError as e:
+                await self._send({"type": "error", "message": str(e)})
+                return WS_CLOSE_UNSUPPORTED_DATA
+            if "document_id" in data and not await self._bind_document(
+                data["document_id"]
+            ):
+                await self._send({"type": "error", "message": "Document not found"})
+                return WS_CLOSE_POLICY_VIOLATION
+
+        # Manual end_of_speech signal (backward compatible)
+        if data.get("type") == "end_of_speech" and self._segmenter.has_audio:
+            # Force transcription regardless of min_speech_duration
+            self._finish_segment(self._segmenter.flush(force=True))
+        return None
+
+    async def finished(self) -> None:
+        """Wait until every queued segment, and any revision, has been sent."""
+        await self._jobs.join()
+        await asyncio.gather(*self._revisions)
+
+    def close(self) -> None:
+        """The client has gone: drop queued segments and cancel the job in flight."""
+        if self._sender is not None:
+            self._sender.cancel()
+        if self._bound_document is None:
+            # Revisions of a bound document still improve it; others would
+            # only go to a closed socket
+            for revision in self._revisions:
+                revision.cancel()
+        self._metrics.closed(self._segmenter)
+        if self._decoder is not None:
+            try:
+                self._decoder.close()
+            except Exception:
+                pass  # Nobody is left to receive the tail of the audio
+
+    async def _send_transcriptions(self) -> None:
+        try:
+            while True:
+                kind, number, segment = await self._jobs.get()
+                try:
+                    if kind == "partial":
+                        await self._send_partial(number, segment)
+                    else:
+                        await self._send_final(number, segment)
+                finally:
+                    self._queued_bytes -= segment.nbytes
+                    self._jobs.task_done()
+        except Exception:
+            pass  # Socket closed mid-send; the receive loop sees the disconnect
+
+    async def _send_partial(self, number: int, segment: PcmSegment) -> None:
+        try:
+            # Condition on the text before this utterance, never on an
+            # earlier guess at the same audio
+            result = await self._live_service.transcribe_pcm_async(
+                segment.samples(), self._last_final_text or None
+            )
+        except Exception:
+            return  # Interim results are best effort; the final still comes
+        finally:
+            self._partial_pending = False
+        if number != self._segment_number:
+            return  # The segment was finalised while this was decoding
+        partial = self._agreement.update(result.text)
+        if partial.text:
+            await self._send({
+                "type": "partial",
+                "text": partial.text,
+                "committed": partial.committed,
+            })
+
+    async def _send_final(self, number: int, segment: PcmSegment) -> None:
+        samples = segment.samples()
+        try:
+            result = await self._live_service.transcribe_pcm_async(samples)
+        except Exception as e:
+            await self._send({"type": "error", "message": str(e)})
+            return
+        if not result.text.strip():
+            return  # Only send non-empty transcriptions
+        self._last_final_text = result.text
+        message: Dict[str, Any] = {"type": "final", "text": result.text}
+        text_start: Optional[int] = None
+        chunk: Optional[int] = None
+        if self._bound_document is not None:
+            try:
+                message["version"], text_start, chunk = await self._append_final(
+                    self._bound_document, result.text, samples
+                )
+            except Exception as e:
+                await self._send(
+                    {"type": "error", "message": f"Transcript not saved: {e}"}
+                )
+        if self._draft_service is not None:
+            message.update(segment=number, draft=True)
+            revision = asyncio.ensure_future(
+                self._send_revision(
+                    number, samples, result.text.strip(), text_start, chunk
+                )
+            )
+            self._revisions.add(revision)
+            revision.add_done_callback(self._revisions.discard)
+        await self._send(message)
+
+    async def _send_revision(
+        self,
+        number: int,
+        samples: np.ndarray,
+        draft: str,
+        text_start: Optional[int],
+        chunk: Optional[int],
+    ) -> None:
+        try:
+            result = await self._transcription_service.transcribe_pcm_async(samples)
+        except Exception:
+            return  # The draft stands
+        message: Dict[str, Any] = {
+            "type": "revised", "segment": number, "text": result.text
+        }
+        try:
+            if self._bound_document is not None and text_start is not None:
+                try:
+                    message["version"] = await self._revise_document(
+                        self._bound_document,
+                        draft,
+                        result.text.strip(),
+                        text_start,
+                        chunk,
+                    )
+                except Exception as e:
+                    await self._send(
+                        {"type": "error", "message": f"Revision not saved: {e}"}
+                    )
+            await self._send(message)
+        except Exception:
+            pass  # The client has gone; the document is revised all the same
+
+    async def _revise_document(
+        self,
+        document_id: int,
+        draft: str,
+        text: str,
+        text_start: int,
+        chunk: Optional[int],
+    ) -> Optional[int]:
+        """Replace the draft with ``text``, unless it was edited by hand.
+
+        The stored audio chunk follows, so playback and re-transcription
+        see the revised text where it now is.
+        """
+        assert self._documents is not None
+        while True:
+            doc = await self._documents.load(document_id)
+            if doc is None:
+                return None
+            start = locate_draft(doc.content, draft, text_start)
+            if start < 0 or text == draft:
+                return doc.version
+            patch = TextPatch(start=start, end=start + len(draft), text=text)
+            try:
+                version = await self._documents.apply_patch(
+                    document_id, doc.version, patch
+                )
+            except VersionConflict:
+                continue  # Another final landed meanwhile; find the draft again
+            self._bound_length += len(text) - len(draft)
+            if self._audio_store is not None and chunk is not None:
+                await asyncio.to_thread(
+                    self._audio_store.update_text, document_id, chunk, text, start
+                )
+            return version
+
+    async def _append_final(
+        self, document_id: int, text: str, samples: np.ndarray
+    ) -> Tuple[Optional[int], int, Optional[int]]:
+        """Append a final.
+
+        Returns the new version, where the text went, and the sequence of
+        its stored audio chunk (None when the audio was not kept).
+        """
+        assert self._documents is not None
+        text = text.strip()
+        appended = " " + text if self._needs_separator else text
+        version = await self._documents.append(document_id, appended)
+        self._needs_separator = True
+        text_start = self._bound_length + len(appended) - len(text)
+        self._bound_length += len(appended)
+        chunk: Optional[int] = None
+        if self._audio_store is not None and version is not None:
+            try:
+                stored = await asyncio.to_thread(
+                    self._audio_store.append, document_id, samples, text, text_start
+                )
+                chunk = stored.sequence
+            except Exception as e:
+                # The text is saved; only playback of this part is lost
+                await self._send({"type": "error", "message": f"Audio not saved: {e}"})
+        return version, text_start, chunk
+
+    async def _bind_document(self, document_id: Any) -> bool:
+        doc = (
+            await self._documents.load(document_id)
+            if self._documents is not None and isinstance(document_id, int)
+            else None
+        )
+        if doc is None:
+            return False
+        self._bound_document = document_id
+        self._bound_length = len(doc.content)
+        self._needs_separator = bool(doc.content) and not doc.content[-1].isspace()
+        return True
+
+    def _connection_bytes(self) -> int:
+        return self._segmenter.buffer_bytes + self._queued_bytes
+
+    def _enqueue(self, kind: str, segment: PcmSegment) -> None:
+        self._queued_bytes += segment.nbytes
+        self._jobs.put_nowait((kind, self._segment_number, segment))
+
+    def _request_partial(self) -> None:
+        if self._partial_pending or self._segmenter.buffered_ms > self._partial_max_ms:
+            return
+        snapshot = self._segmenter.snapshot()
+        if self._connection_bytes() + snapshot.nbytes > self._max_connection_bytes:
+            return  # Interim results are the first thing to go under pressure
+        self._partial_pending = True
+        self._speech_at_last_partial_ms = self._segmenter.speech_ms
+        self._enqueue("partial", snapshot)
+
+    def _finish_segment(self, segment: Optional[PcmSegment]) -> None:
+        if segment is not None:
+            self._enqueue("final", segment)
+        self._speech_at_last_partial_ms = 0
+        self._segment_number += 1
+        self._agreement.reset()
@@ -6,6 +6,9 @@ from pathlib import Path
 from typing import List, Optional, Tuple
 
 from jinja2 import Environment, FileSystemLoader, select_autoescape
+from markupsafe import Markup, escape
+
+from great_dictator.domain.document import MATCH_END, MATCH_START, SearchHit
 
 # Set up Jinja2 environment with auto-escaping for security
 TEMPLATES_DIR = Path(__file__).parent / "templates"
@@ -15,14 +18,31 @@ _env = Environment(
 )
 
 
+def highlight(snippet: str) -> Markup:
+    """Escape a search snippet and mark up its matched terms."""
+    return Markup(
+        str(escape(snippet))
+        .replace(MATCH_START, "<mark>")
+        .replace(MATCH_END, "</mark>")
+    )
+
+
+_env.filters["highlight"] = highlight
+
+
 def render_editor(
     document_id: Optional[int] = None,
     document_name: str = "Untitled document",
     content: str = "",
     user: str = "romilly",
     status: str = "",
+    version: Optional[int] = None,
 ) -> str:
-    """Render the editor HTML fragment."""
+    """Render the editor HTML fragment.
+
+    ``version`` is the stored version the content was based on, sent back
+    on save so that edits made elsewhere in the meantime are detected.
+    """
     template = _env.get_template("editor.html")
     return template.render(
         document_id=document_id if document_id else "",
@@ -30,10 +50,27 @@ def render_editor(
         content=content,
         user=user,
         status=status,
+        version="" if version is None else version,
     )
 
 
-def render_document_list(documents: List[Tuple[int, str, datetime]]) -> str:
-    """Render the document list HTML fragment."""
+def render_document_list(
+    documents: List[Tuple[int, str, datetime]],
+    next_page_url: Optional[str] = None,
+    show_empty: bool = True,
+) -> str:
+    """Render a page of the document list HTML fragment.
+
+    With ``next_page_url``, the page ends in an item that loads the next
+    page in its place when it scrolls into view.
+    """
     template = _env.get_template("document_list.html")
-    return template.render(documents=documents)
+    return template.render(
+        documents=documents, next_page_url=next_page_url, show_empty=show_empty
+    )
+
+
+def render_search_results(hits: List[SearchHit]) -> str:
+    """Render search hits as items of the document list HTML fragment."""
+    template = _env.get_template("search_results.html")
+    return template.render(hits=hits)
@@ -0,0 +1,153 @@
+"""Cross-request dynamic batching in front of a TranscriberPort."""
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import BinaryIO
+
+import numpy as np
+
+from great_dictator.domain.transcription import (
+    AudioInput,
+    TranscriberPort,
+    TranscriptionResult,
+    TranscriptionSegment,
+)
+
+
+@dataclass(frozen=True)
+class BatchStats:
+    batches: int
+    clips: int
+    largest_batch: int
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.clips / self.batches if self.batches else 0.0
+
+
+class _Job:
+    def __init__(self, audio: AudioInput):
+        self.audio = audio
+        self.future: Future[TranscriptionResult] = Future()
+
+
+class BatchingTranscriber(TranscriberPort):
+    """Collects concurrent transcribe calls into batches for the wrapped transcriber.
+
+    The first pending clip opens a batch; the batch is dispatched once it
+    holds ``max_batch_size`` clips or ``max_wait_ms`` has passed, whichever
+    comes first, and each caller gets its own result back. Callers must
+    arrive concurrently (e.g. from TranscriptionService worker threads) for
+    batches to form; a lone caller pays at most ``max_wait_ms`` extra.
+    """
+
+    def __init__(
+        self,
+        transcriber: TranscriberPort,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10,
+        batch_workers: int = 1,
+    ):
+        self._transcriber = transcriber
+        self._max_batch_size = max_batch_size
+        self._max_wait_s = max_wait_ms / 1000
+        self._queue: queue.Queue[_Job | None] = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._clips = 0
+        self._largest_batch = 0
+        self._threads = [
+            threading.Thread(target=self._run, name="transcription-batcher", daemon=True)
+            for _ in range(batch_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def transcribe(self, audio: BinaryIO) -> TranscriptionResult:
+        return self._submit(audio)
+
+    def transcribe_pcm(
+        self, samples: np.ndarray, prompt: str | None = None
+    ) -> TranscriptionResult:
+        if prompt:
+            return self._transcriber.transcribe_pcm(samples, prompt)
+        return self._submit(samples)
+
+    def _submit(self, audio: AudioInput) -> TranscriptionResult:
+        job = _Job(audio)
+        self._queue.put(job)
+        return job.future.result()
+
+    def transcribe_with_prompt(self, audio: BinaryIO, prompt: str) -> TranscriptionResult:
+        # The batched pipeline takes one prompt per batch, so prompted clips go alone
+        return self._transcriber.transcribe_with_prompt(audio, prompt)
+
+    def transcribe_segments(
+        self, audio: AudioInput, prompt: str | None = None
+    ) -> Iterator[TranscriptionSegment]:
+        # Streamed results come from a lazy decode, which batching would defeat
+        return self._transcriber.transcribe_segments(audio, prompt)
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                self._queue.put(None)  # Wake the next scheduler thread too
+                return
+            batch = [first]
+            deadline = time.monotonic() + self._max_wait_s
+            while len(batch) < self._max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    job = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if job is None:
+                    self._queue.put(None)  # Finish this batch, then stop
+                    break
+                batch.append(job)
+            self._dispatch(batch)
+
+    def _dispatch(self, batch: list[_Job]) -> None:
+        with self._stats_lock:
+            self._batches += 1
+            self._clips += len(batch)
+            self._largest_batch = max(self._largest_batch, len(batch))
+        try:
+            results = self._transcriber.transcribe_batch([job.audio for job in batch])
+        except Exception:
+            # One bad clip must not fail its batch-mates: retry them one by one
+            for job in batch:
+                try:
+                    if isinstance(job.audio, np.ndarray):
+                        result = self._transcriber.transcribe_pcm(job.audio)
+                    else:
+                        job.audio.seek(0)
+                        result = self._transcriber.transcribe(job.audio)
+                    job.future.set_result(result)
+                except Exception as e:
+                    job.future.set_exception(e)
+            return
+        for job, result in zip(batch, results):
+            job.future.set_result(result)
+
+    def stats(self) -> BatchStats:
+        with self._stats_lock:
+            return BatchStats(
+                batches=self._batches,
+                clips=self._clips,
+                largest_batch=self._largest_batch,
+            )
+
+    def close(self) -> None:
+        """Finish queued batches and stop the scheduler threads."""
+        self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
@@ -0,0 +1,337 @@
+"""Content-addressed cache of transcription results."""
+from __future__ import annotations
+
+import hashlib
+import io
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import BinaryIO, Callable
+
+import numpy as np
+
+from great_dictator.domain.transcription import (
+    AudioInput,
+    TranscriberPort,
+    TranscriptionResult,
+    TranscriptionSegment,
+)
+
+# Bytes per read when hashing an audio file
+_HASH_CHUNK_SIZE = 1 << 20
+# Rough per-entry bookkeeping cost (key, dict slot, result object)
+_ENTRY_OVERHEAD = 200
+# Share of the disk tier's limit left after an eviction
+_DISK_LOW_WATER = 0.9
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    disk_hits: int
+    misses: int
+    coalesced: int
+    entries: int
+    bytes: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.disk_hits + self.misses + self.coalesced
+        return (self.hits + self.disk_hits + self.coalesced) / lookups if lookups else 0.0
+
+
+def _result_size(key: str, result: TranscriptionResult) -> int:
+    return len(key) + len(result.text.encode()) + len(result.language) + _ENTRY_OVERHEAD
+
+
+class _DiskTier:
+    """SQLite store of results that outlives the process.
+
+    Each thread keeps its own connection. Entries record their size and when
+    they were last read; once the stored total passes ``max_bytes`` the least
+    recently used go, down to ``_DISK_LOW_WATER`` of the limit, so eviction
+    runs now and then rather than on every write.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self._path = path
+        self._max_bytes = max_bytes
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        with self._get_connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(transcriptions)")}
+            if columns and "accessed" not in columns:
+                # Written by a version without sizes or access times; it is only a cache
+                conn.execute("DROP TABLE transcriptions")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS transcriptions (
+                    key TEXT PRIMARY KEY,
+                    text TEXT NOT NULL,
+                    language TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    accessed REAL NOT NULL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_transcriptions_accessed"
+                " ON transcriptions(accessed)"
+            )
+            (self._bytes,) = conn.execute(
+                "SELECT coalesce(sum(size), 0) FROM transcriptions"
+            ).fetchone()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """This thread's connection; as a context manager it commits or rolls back."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Only ever used by the thread that opened it; close() may run elsewhere
+            conn = sqlite3.connect(self._path, check_same_thread=False)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def get(self, key: str) -> TranscriptionResult | None:
+        with self._get_connection() as conn:
+            row = conn.execute(
+                "UPDATE transcriptions SET accessed = ? WHERE key = ?"
+                " RETURNING text, language",
+                (time.time(), key),
+            ).fetchone()
+        return TranscriptionResult(text=row[0], language=row[1]) if row else None
+
+    def put(self, key: str, result: TranscriptionResult) -> None:
+        size = _result_size(key, result)
+        with self._get_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            previous = conn.execute(
+                "SELECT size FROM transcriptions WHERE key = ?", (key,)
+            ).fetchone()
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO transcriptions (key, text, language, size, accessed)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (key, result.text, result.language, size, time.time()),
+            )
+            with self._lock:
+                self._bytes += size - (previous[0] if previous else 0)
+                full = self._bytes > self._max_bytes
+                excess = self._bytes - int(self._max_bytes * _DISK_LOW_WATER)
+            if full:
+                self._evict(conn, excess)
+
+    def _evict(self, conn: sqlite3.Connection, excess: int) -> None:
+        """Delete least recently read entries until ``excess`` bytes are gone."""
+        doomed: list[tuple[str]] = []
+        freed = 0
+        for key, size in conn.execute(
+            "SELECT key, size FROM transcriptions ORDER BY accessed"
+        ):
+            if freed >= excess:
+                break
+            doomed.append((key,))
+            freed += size
+        conn.executemany("DELETE FROM transcriptions WHERE key = ?", doomed)
+        with self._lock:
+            self._bytes -= freed
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+
+class CachingTranscriber(TranscriberPort):
+    """Returns stored results for audio that has been transcribed before.
+
+    Results are keyed by a SHA-256 of the audio bytes (or samples), the
+    prompt, and ``namespace``, which should name everything else that
+    affects the output (model, compute type, VAD settings) so that a
+    configuration change never serves stale text. Recent results live in
+    an in-memory LRU bounded to ``max_bytes``; with ``disk_path`` they
+    also go to a SQLite file that survives restarts, itself an LRU bounded
+    to ``disk_max_bytes``. Identical requests
+    that arrive while the first is still running wait for its result
+    instead of transcribing again.
+    """
+
+    def __init__(
+        self,
+        transcriber: TranscriberPort,
+        namespace: str = "",
+        max_bytes: int = 16 * 1024 * 1024,
+        disk_path: str | None = None,
+        disk_max_bytes: int = 256 * 1024 * 1024,
+    ):
+        self._transcriber = transcriber
+        self._namespace = namespace.encode()
+        self._max_bytes = max_bytes
+        self._disk = _DiskTier(disk_path, disk_max_bytes) if disk_path else None
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, TranscriptionResult] = OrderedDict()
+        self._bytes = 0
+        self._in_flight: dict[str, Future[TranscriptionResult]] = {}
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._coalesced = 0
+
+    def transcribe(self, audio: BinaryIO) -> TranscriptionResult:
+        return self._cached(
+            self._file_key(audio, None), lambda: self._transcriber.transcribe(audio)
+        )
+
+    def transcribe_with_prompt(self, audio: BinaryIO, prompt: str) -> TranscriptionResult:
+        return self._cached(
+            self._file_key(audio, prompt),
+            lambda: self._transcriber.transcribe_with_prompt(audio, prompt),
+        )
+
+    def transcribe_pcm(
+        self, samples: np.ndarray, prompt: str | None = None
+    ) -> TranscriptionResult:
+        return self._cached(
+            self._samples_key(samples, prompt),
+            lambda: self._transcriber.transcribe_pcm(samples, prompt),
+        )
+
+    def transcribe_batch(self, audios: list[AudioInput]) -> list[TranscriptionResult]:
+        keys = [self._key_for(audio, None) for audio in audios]
+        results = [self._lookup(key) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            # Only the misses reach the model, still as one batch
+            fresh = self._transcriber.transcribe_batch([audios[i] for i in missing])
+            for i, result in zip(missing, fresh):
+                self._store(keys[i], result)
+                results[i] = result
+        return results  # type: ignore[return-value]
+
+    def transcribe_segments(
+        self, audio: AudioInput, prompt: str | None = None
+    ) -> Iterator[TranscriptionSegment]:
+        key = self._key_for(audio, prompt)
+        cached = self._lookup(key)
+        if cached is not None:
+            if cached.text.strip():
+                yield TranscriptionSegment(text=cached.text.strip(), start=0.0, end=0.0)
+            return
+        # Streamed results are passed through; nothing is stored without the language
+        yield from self._transcriber.transcribe_segments(audio, prompt)
+
+    def _cached(
+        self, key: str, transcribe: Callable[[], TranscriptionResult]
+    ) -> TranscriptionResult:
+        result = self._lookup(key)
+        if result is not None:
+            return result
+        with self._lock:
+            leader = self._in_flight.get(key)
+            if leader is None:
+                future: Future[TranscriptionResult] = Future()
+                self._in_flight[key] = future
+                self._misses += 1
+            else:
+                self._coalesced += 1
+        if leader is not None:
+            return leader.result()
+        try:
+            result = transcribe()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+        self._store(key, result)
+        future.set_result(result)
+        return result
+
+    def _lookup(self, key: str) -> TranscriptionResult | None:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return result
+        if self._disk is not None:
+            result = self._disk.get(key)
+            if result is not None:
+                with self._lock:
+                    self._disk_hits += 1
+                self._remember(key, result)
+                return result
+        return None
+
+    def _store(self, key: str, result: TranscriptionResult) -> None:
+        self._remember(key, result)
+        if self._disk is not None:
+            self._disk.put(key, result)
+
+    def _remember(self, key: str, result: TranscriptionResult) -> None:
+        size = _result_size(key, result)
+        if size > self._max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= _result_size(key, previous)
+            self._entries[key] = result
+            self._bytes += size
+            while self._bytes > self._max_bytes:
+                old_key, old = self._entries.popitem(last=False)
+                self._bytes -= _result_size(old_key, old)
+
+    def _key_for(self, audio: AudioInput, prompt: str | None) -> str:
+        if isinstance(audio, np.ndarray):
+            return self._samples_key(audio, prompt)
+        return self._file_key(audio, prompt)
+
+    def _hasher(self, kind: bytes, prompt: str | None) -> hashlib._Hash:
+        digest = hashlib.sha256(self._namespace)
+        digest.update(b"\0" + kind + b"\0" + (prompt or "").encode() + b"\0")
+        return digest
+
+    def _file_key(self, audio: BinaryIO, prompt: str | None) -> str:
+        # The whole file is hashed, so the model must read it from the start too
+        digest = self._hasher(b"file", prompt)
+        if isinstance(audio, io.BytesIO):
+            with audio.getbuffer() as data:
+                digest.update(data)
+        else:
+            audio.seek(0)
+            while chunk := audio.read(_HASH_CHUNK_SIZE):
+                digest.update(chunk)
+        audio.seek(0)
+        return digest.hexdigest()
+
+    def _samples_key(self, samples: np.ndarray, prompt: str | None) -> str:
+        digest = self._hasher(b"pcm", prompt)
+        digest.update(memoryview(np.ascontiguousarray(samples, dtype=np.float32)).cast("B"))
+        return digest.hexdigest()
+
+    def close(self) -> None:
+        if self._disk is not None:
+            self._disk.close()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                disk_hits=self._disk_hits,
+                misses=self._misses,
+                coalesced=self._coalesced,
+                entries=len(self._entries),
+                bytes=self._bytes,
+            )
@@ -0,0 +1,186 @@
+"""Parallel transcription of long recordings in VAD-delimited chunks."""
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import BinaryIO
+
+import av
+import numpy as np
+from faster_whisper import decode_audio
+from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+from great_dictator.domain.transcript import Stitcher, stitch
+from great_dictator.domain.transcription import (
+    PCM_SAMPLE_RATE,
+    AudioInput,
+    TranscriberPort,
+    TranscriptionResult,
+    TranscriptionSegment,
+)
+
+
+def plan_chunks(
+    speech: list[dict[str, int]], max_chunk: int, overlap: int
+) -> list[tuple[int, int]]:
+    """Pack speech spans (sample offsets) into chunks of at most ``max_chunk``.
+
+    Consecutive spans are merged while they fit, so chunks end in silence
+    wherever the speech allows it. Where the VAD had to cut speech at its
+    length limit (a span starting where the previous one ended), the next
+    chunk starts up to ``overlap`` samples early, so a word cut there is
+    heard whole by one of the two chunks; the overlap counts towards
+    ``max_chunk``. Chunks that follow a silence start with their speech.
+    """
+    chunks: list[tuple[int, int]] = []
+    for span in speech:
+        start, end = span["start"], span["end"]
+        if chunks and end - chunks[-1][0] <= max_chunk:
+            chunks[-1] = (chunks[-1][0], end)
+        elif chunks and start <= chunks[-1][1]:
+            room = max(max_chunk - (end - start), 0)
+            chunks.append((max(start - min(overlap, room), 0), end))
+        else:
+            chunks.append((start, end))
+    return chunks
+
+
+def probe_duration(audio: BinaryIO) -> float | None:
+    """The recording's length in seconds, read from its container.
+
+    Nothing is decoded. None when the container does not record a length
+    (as with some streamed WebM) or cannot be read; the file position is
+    left where it was.
+    """
+    position = audio.tell()
+    try:
+        with av.open(audio, metadata_errors="ignore") as container:
+            stream = container.streams.audio[0]
+            if stream.duration is not None and stream.time_base is not None:
+                return float(stream.duration * stream.time_base)
+            if container.duration is not None:
+                return container.duration / av.time_base
+            return None
+    except (av.FFmpegError, IndexError):
+        return None
+    finally:
+        audio.seek(position)
+
+
+class LongFormTranscriber(TranscriberPort):
+    """Splits long recordings at silences and transcribes the pieces in parallel.
+
+    Audio shorter than ``min_duration_s`` goes to the wrapped transcriber
+    in one piece; files whose container gives a shorter length are passed
+    on without being decoded here. Longer audio is decoded once, Silero VAD finds the
+    speech, and the speech is packed into chunks of up to ``chunk_s``
+    seconds that are transcribed ``parallelism`` at a time, so a pool of
+    replicas (or a batcher) works on one recording at once. The chunk
+    transcripts are stitched back together in order, with words repeated
+    across the ``overlap_s`` seconds shared by chunks split mid-speech removed.
+    """
+
+    def __init__(
+        self,
+        transcriber: TranscriberPort,
+        min_duration_s: float = 180,
+        chunk_s: float = 30,
+        overlap_s: float = 1.0,
+        parallelism: int = 2,
+    ):
+        self._transcriber = transcriber
+        self._min_samples = int(min_duration_s * PCM_SAMPLE_RATE)
+        self._chunk_s = chunk_s
+        self._max_chunk = int(chunk_s * PCM_SAMPLE_RATE)
+        self._overlap = int(overlap_s * PCM_SAMPLE_RATE)
+        self._executor = ThreadPoolExecutor(
+            max_workers=parallelism, thread_name_prefix="long-form"
+        )
+
+    def transcribe(self, audio: BinaryIO) -> TranscriptionResult:
+        if self._is_short(audio):
+            return self._transcriber.transcribe(audio)
+        return self.transcribe_pcm(decode_audio(audio, sampling_rate=PCM_SAMPLE_RATE))
+
+    def transcribe_with_prompt(self, audio: BinaryIO, prompt: str) -> TranscriptionResult:
+        if self._is_short(audio):
+            return self._transcriber.transcribe_with_prompt(audio, prompt)
+        return self.transcribe_pcm(decode_audio(audio, sampling_rate=PCM_SAMPLE_RATE), prompt)
+
+    def _is_short(self, audio: BinaryIO) -> bool:
+        """Whether the container says the file is too short to split."""
+        duration = probe_duration(audio)
+        return duration is not None and duration * PCM_SAMPLE_RATE < self._min_samples
+
+    def transcribe_pcm(
+        self, samples: np.ndarray, prompt: str | None = None
+    ) -> TranscriptionResult:
+        if len(samples) < self._min_samples:
+            return self._transcriber.transcribe_pcm(samples, prompt)
+        chunks = self._plan(samples)
+        if not chunks:
+            return self._transcriber.transcribe_pcm(samples, prompt)
+        results = [future.result() for future in self._submit(samples, chunks, prompt)]
+        language = Counter(result.language for result in results).most_common(1)[0][0]
+        return TranscriptionResult(
+            text=stitch(result.text for result in results), language=language
+        )
+
+    def transcribe_segments(
+        self, audio: AudioInput, prompt: str | None = None
+    ) -> Iterator[TranscriptionSegment]:
+        """Yield each chunk's stitched text in order as soon as it is ready."""
+        if not isinstance(audio, np.ndarray) and self._is_short(audio):
+            yield from self._transcriber.transcribe_segments(audio, prompt)
+            return
+        samples = (
+            audio
+            if isinstance(audio, np.ndarray)
+            else decode_audio(audio, sampling_rate=PCM_SAMPLE_RATE)
+        )
+        chunks = self._plan(samples) if len(samples) >= self._min_samples else []
+        if not chunks:
+            yield from self._transcriber.transcribe_segments(samples, prompt)
+            return
+        futures = self._submit(samples, chunks, prompt)
+        try:
+            stitcher = Stitcher()
+            for (start, end), future in zip(chunks, futures):
+                text = stitcher.add(future.result().text)
+                if text:
+                    yield TranscriptionSegment(
+                        text=text,
+                        start=start / PCM_SAMPLE_RATE,
+                        end=end / PCM_SAMPLE_RATE,
+                    )
+        finally:
+            for future in futures:
+                future.cancel()  # The caller stopped listening
+
+    def _plan(self, samples: np.ndarray) -> list[tuple[int, int]]:
+        speech = get_speech_timestamps(
+            samples,
+            VadOptions(
+                # Leave room for the overlap added where speech is cut
+                max_speech_duration_s=(self._max_chunk - self._overlap) / PCM_SAMPLE_RATE,
+                min_silence_duration_ms=500,
+                speech_pad_ms=200,
+            ),
+        )
+        return plan_chunks(speech, self._max_chunk, self._overlap)
+
+    def _submit(
+        self, samples: np.ndarray, chunks: list[tuple[int, int]], prompt: str | None
+    ) -> list[Future[TranscriptionResult]]:
+        # Only the first chunk follows the prompt; later ones follow each other
+        # and are not known until the earlier ones finish
+        return [
+            self._executor.submit(
+                self._transcriber.transcribe_pcm, samples[start:end], prompt if i == 0 else None
+            )
+            for i, (start, end) in enumerate(chunks)
+        ]
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,269 @@
+"""Document audio in append-only pack files with a SQLite index.
+
+Each appended chunk is stored once per distinct content: its int16 PCM is
+hashed, and a chunk already in the store is referenced rather than written
+again. New chunks are delta-coded (consecutive speech samples are close,
+so the differences compress far better than the samples) and zlib-packed
+onto the end of the current pack file; a new pack starts once it reaches
+``max_pack_bytes``.
+
+The index maps each document's chunks, in order, to their blobs and to the
+span of transcript text they produced. Packs are read through mmap, so a
+range read decompresses only the chunks it overlaps.
+"""
+from __future__ import annotations
+
+import hashlib
+import mmap
+import sqlite3
+import threading
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+from great_dictator.domain.audio import AudioChunk, AudioStorePort, to_seconds
+from great_dictator.domain.transcription import PCM_SAMPLE_RATE
+
+DEFAULT_MAX_PACK_BYTES = 256 * 1024 * 1024
+
+# Chunk encodings; the codec is recorded per blob so others can be added
+_CODEC = "delta-zlib"
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS audio_blobs (
+        digest TEXT PRIMARY KEY,
+        pack INTEGER NOT NULL,
+        offset INTEGER NOT NULL,
+        length INTEGER NOT NULL,
+        samples INTEGER NOT NULL,
+        codec TEXT NOT NULL
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS audio_chunks (
+        document_id INTEGER NOT NULL,
+        sequence INTEGER NOT NULL,
+        digest TEXT NOT NULL REFERENCES audio_blobs (digest),
+        start_sample INTEGER NOT NULL,
+        samples INTEGER NOT NULL,
+        text_start INTEGER NOT NULL,
+        text_end INTEGER NOT NULL,
+        text TEXT NOT NULL DEFAULT '',
+        PRIMARY KEY (document_id, sequence)
+    ) WITHOUT ROWID
+    """,
+)
+
+
+def _encode(pcm: np.ndarray) -> bytes:
+    # int16 arithmetic wraps, and so does the cumulative sum that undoes it
+    deltas = np.diff(pcm, prepend=np.int16(0))
+    return zlib.compress(deltas.astype("<i2").tobytes())
+
+
+def _decode(codec: str, stored: bytes) -> np.ndarray:
+    if codec != _CODEC:
+        raise ValueError(f"Unknown audio codec: {codec}")
+    deltas = np.frombuffer(zlib.decompress(stored), dtype="<i2")
+    return np.cumsum(deltas, dtype=np.int16)
+
+
+class PackAudioStore(AudioStorePort):
+    def __init__(self, directory: str, max_pack_bytes: int = DEFAULT_MAX_PACK_BYTES):
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._max_pack_bytes = max_pack_bytes
+        # One connection; the lock serialises index access and pack writes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self._directory / "index.db"), check_same_thread=False
+        )
+        self._maps: dict[int, mmap.mmap] = {}
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            for statement in _SCHEMA:
+                self._conn.execute(statement)
+            columns = {
+                row[1] for row in self._conn.execute("PRAGMA table_info(audio_chunks)")
+            }
+            if "text" not in columns:
+                self._conn.execute(
+                    "ALTER TABLE audio_chunks ADD COLUMN text TEXT NOT NULL DEFAULT ''"
+                )
+            row = self._conn.execute("SELECT MAX(pack) FROM audio_blobs").fetchone()
+        self._pack = row[0] or 0
+
+    def _pack_path(self, pack: int) -> Path:
+        return self._directory / f"pack-{pack:06d}.bin"
+
+    def append(
+        self, document_id: int, samples: np.ndarray, text: str, text_start: int
+    ) -> AudioChunk:
+        text_end = text_start + len(text)
+        pcm = np.round(np.clip(samples, -1.0, 32767 / 32768) * 32768).astype(np.int16)
+        digest = hashlib.sha256(pcm.tobytes()).hexdigest()
+        with self._lock, self._conn:
+            if self._conn.execute(
+                "SELECT 1 FROM audio_blobs WHERE digest = ?", (digest,)
+            ).fetchone() is None:
+                self._write_blob(digest, pcm)
+            last = self._conn.execute(
+                """
+                SELECT sequence, start_sample + samples FROM audio_chunks
+                WHERE document_id = ? ORDER BY sequence DESC LIMIT 1
+                """,
+                (document_id,),
+            ).fetchone()
+            sequence, start = (last[0] + 1, last[1]) if last else (0, 0)
+            self._conn.execute(
+                """
+                INSERT INTO audio_chunks (document_id, sequence, digest,
+                    start_sample, samples, text_start, text_end, text)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    document_id, sequence, digest, start, len(pcm),
+                    text_start, text_end, text,
+                ),
+            )
+        return AudioChunk(
+            document_id=document_id,
+            sequence=sequence,
+            start=to_seconds(start),
+            end=to_seconds(start + len(pcm)),
+            text_start=text_start,
+            text_end=text_end,
+            text=text,
+        )
+
+    def _write_blob(self, digest: str, pcm: np.ndarray) -> None:
+        """Add the encoded chunk to the current pack. Caller holds the lock."""
+        encoded = _encode(pcm)
+        path = self._pack_path(self._pack)
+        if path.exists() and path.stat().st_size + len(encoded) > self._max_pack_bytes:
+            self._pack += 1
+            path = self._pack_path(self._pack)
+        # The bytes are on disk before the index points at them; a crash in
+        # between leaves only unreferenced bytes in the pack
+        with open(path, "ab") as pack:
+            offset = pack.tell()
+            pack.write(encoded)
+        self._conn.execute(
+            """
+            INSERT INTO audio_blobs (digest, pack, offset, length, samples, codec)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (digest, self._pack, offset, len(encoded), len(pcm), _CODEC),
+        )
+
+    def update_text(
+        self, document_id: int, sequence: int, text: str, text_start: int
+    ) -> None:
+        text_end = text_start + len(text)
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                """
+                SELECT text_end FROM audio_chunks
+                WHERE document_id = ? AND sequence = ?
+                """,
+                (document_id, sequence),
+            ).fetchone()
+            if row is None:
+                return
+            self._conn.execute(
+                """
+                UPDATE audio_chunks SET text = ?, text_start = ?, text_end = ?
+                WHERE document_id = ? AND sequence = ?
+                """,
+                (text, text_start, text_end, document_id, sequence),
+            )
+            shift = text_end - row[0]
+            self._conn.execute(
+                """
+                UPDATE audio_chunks
+                SET text_start = text_start + ?, text_end = text_end + ?
+                WHERE document_id = ? AND sequence > ?
+                """,
+                (shift, shift, document_id, sequence),
+            )
+
+    def chunks(self, document_id: int) -> list[AudioChunk]:
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT sequence, start_sample, samples, text_start, text_end, text
+                FROM audio_chunks WHERE document_id = ? ORDER BY sequence
+                """,
+                (document_id,),
+            ).fetchall()
+        return [
+            AudioChunk(
+                document_id=document_id,
+                sequence=sequence,
+                start=to_seconds(start),
+                end=to_seconds(start + samples),
+                text_start=text_start,
+                text_end=text_end,
+                text=text,
+            )
+            for sequence, start, samples, text_start, text_end, text in rows
+        ]
+
+    def read(
+        self, document_id: int, start: float = 0.0, end: float | None = None
+    ) -> np.ndarray:
+        first = max(0, round(start * PCM_SAMPLE_RATE))
+        last = None if end is None else round(end * PCM_SAMPLE_RATE)
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT c.start_sample, b.pack, b.offset, b.length, b.codec
+                FROM audio_chunks c JOIN audio_blobs b ON b.digest = c.digest
+                WHERE c.document_id = ? AND c.start_sample + c.samples > ?
+                    AND (? IS NULL OR c.start_sample < ?)
+                ORDER BY c.sequence
+                """,
+                (document_id, first, last, last),
+            ).fetchall()
+        if not rows:
+            return np.zeros(0, dtype=np.float32)
+        pieces = [
+            _decode(codec, self._view(pack, offset, length))
+            for _, pack, offset, length, codec in rows
+        ]
+        pcm = np.concatenate(pieces)
+        origin = rows[0][0]
+        pcm = pcm[first - origin:None if last is None else last - origin]
+        return np.multiply(pcm, 1 / 32768, dtype=np.float32)
+
+    def _view(self, pack: int, offset: int, length: int) -> bytes:
+        with self._lock:
+            mapped = self._maps.get(pack)
+            if mapped is None or len(mapped) < offset + length:
+                # Packs only grow, so a mapping that is too short is remapped
+                if mapped is not None:
+                    mapped.close()
+                with open(self._pack_path(pack), "rb") as file:
+                    mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                self._maps[pack] = mapped
+            return mapped[offset:offset + length]
+
+    def delete(self, document_id: int) -> None:
+        """Forget the document's chunks.
+
+        Blobs may be shared with other documents, so pack space is not
+        reclaimed here.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM audio_chunks WHERE document_id = ?", (document_id,)
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            for mapped in self._maps.values():
+                mapped.close()
+            self._maps.clear()
+            self._conn.close()
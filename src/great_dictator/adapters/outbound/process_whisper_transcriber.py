@@ -0,0 +1,273 @@
+"""Whisper transcription in a pool of worker processes.
+
+Each worker process loads its own WhisperModel, so transcriptions run in
+parallel without contending for the GIL, and a worker that crashes (or
+leaks memory) is replaced without taking the server down. Audio is handed
+to workers through shared memory rather than pickled through the pipe.
+"""
+from __future__ import annotations
+
+import io
+import multiprocessing
+from multiprocessing.connection import Connection, wait
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, BinaryIO
+
+import numpy as np
+
+from great_dictator.adapters.outbound.replica_pool import PoolStats, ReplicaPool
+from great_dictator.domain.transcription import TranscriberPort, TranscriptionResult
+
+# Seconds to wait for an idle worker to exit before killing it
+_STOP_TIMEOUT_S = 5.0
+# Bytes per read when copying an audio file into shared memory
+_COPY_CHUNK_SIZE = 1 << 20
+
+
+class _SharedMemoryReader(io.RawIOBase):
+    """Read-only, seekable file over a shared memory buffer (no copy)."""
+
+    def __init__(self, buffer: memoryview, size: int):
+        self._view = buffer[:size]
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, target: Any) -> int:
+        count = min(len(target), len(self._view) - self._position)
+        target[:count] = self._view[self._position:self._position + count]
+        self._position += count
+        return count
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: len(self._view)}
+        self._position = max(0, base[whence] + offset)
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+    def close(self) -> None:
+        self._view.release()
+        super().close()
+
+
+def _worker_main(
+    conn: Connection,
+    model_size: str,
+    device: str,
+    compute_type: str,
+    cpu_threads: int,
+) -> None:
+    """Worker process entry point: load a model, then serve jobs until told to stop."""
+    from faster_whisper import WhisperModel
+
+    from great_dictator.adapters.outbound.whisper_transcriber import _run_model
+
+    model = WhisperModel(
+        model_size, device=device, compute_type=compute_type, cpu_threads=cpu_threads
+    )
+    while True:
+        job = conn.recv()
+        if job is None:
+            break
+        name, size, kind, prompt = job
+        shm = SharedMemory(name=name)
+        try:
+            if kind == "pcm":
+                # Decoded samples: hand the model a view of shared memory directly
+                audio: Any = np.ndarray(
+                    shape=(size // 4,), dtype=np.float32, buffer=shm.buf
+                )
+            else:
+                audio = _SharedMemoryReader(shm.buf, size)
+            try:
+                conn.send(("ok", _run_model(model, audio, prompt)))
+            except Exception as e:
+                conn.send(("error", f"{type(e).__name__}: {e}"))
+            finally:
+                if kind != "pcm":
+                    audio.close()
+                del audio  # Release the view so the segment can be closed
+        finally:
+            shm.close()
+
+
+def _share(data: memoryview) -> SharedMemory:
+    shm = SharedMemory(create=True, size=max(len(data), 1))
+    shm.buf[:len(data)] = data
+    return shm
+
+
+def _read_into(source: BinaryIO, shm: SharedMemory, size: int) -> None:
+    with shm.buf[:size] as target:
+        position = 0
+        while position < size:
+            chunk = source.read(min(_COPY_CHUNK_SIZE, size - position))
+            if not chunk:
+                raise EOFError("Audio file ended early")
+            target[position:position + len(chunk)] = chunk
+            position += len(chunk)
+
+
+class _WorkerProcess:
+    def __init__(self, context: Any, args: tuple[Any, ...]):
+        self._context = context
+        self._args = args
+        self.jobs_done = 0
+        self._start()
+
+    def _start(self) -> None:
+        self._conn, child_conn = self._context.Pipe()
+        self._process = self._context.Process(
+            target=_worker_main, args=(child_conn, *self._args), daemon=True
+        )
+        self._process.start()
+        child_conn.close()
+        self.jobs_done = 0
+
+    def run(
+        self, name: str, size: int, kind: str, prompt: str | None, timeout: float | None
+    ) -> tuple[str, Any]:
+        """Send a job and wait for its reply; raises if the worker dies or hangs."""
+        try:
+            self._conn.send((name, size, kind, prompt))
+            ready = wait([self._conn, self._process.sentinel], timeout)
+        except OSError:  # Worker already dead: the pipe is broken
+            ready = [self._process.sentinel]
+        if self._conn in ready:
+            try:
+                return self._conn.recv()
+            except EOFError:
+                pass
+        if not ready:
+            self._process.kill()
+            self._process.join()
+            raise TimeoutError("Transcription worker timed out and was restarted")
+        self._process.join()
+        raise RuntimeError(
+            f"Transcription worker crashed (exit code {self._process.exitcode})"
+        )
+
+    def restart(self) -> None:
+        self.stop()
+        self._start()
+
+    def stop(self) -> None:
+        if self._process.is_alive():
+            try:
+                self._conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self._process.join(_STOP_TIMEOUT_S)
+            if self._process.is_alive():
+                self._process.kill()
+                self._process.join()
+        self._conn.close()
+
+
+class ProcessPoolWhisperTranscriber(TranscriberPort):
+    """Runs each transcription in one of ``processes`` worker processes.
+
+    A worker that crashes or exceeds ``job_timeout`` seconds is replaced
+    and the job fails with an error; other jobs are unaffected. Workers are
+    recycled after ``max_jobs_per_worker`` jobs (0 means never) to bound
+    memory growth in long-running servers.
+    """
+
+    def __init__(
+        self,
+        processes: int = 2,
+        model_size: str = "base",
+        device: str = "cpu",
+        compute_type: str = "int8",
+        cpu_threads: int = 0,
+        max_jobs_per_worker: int = 0,
+        job_timeout: float | None = None,
+    ):
+        if processes < 1:
+            raise ValueError("processes must be at least 1")
+        self._max_jobs_per_worker = max_jobs_per_worker
+        self._job_timeout = job_timeout
+        # spawn, not fork: CTranslate2 and the server's threads do not survive fork
+        context = multiprocessing.get_context("spawn")
+        args = (model_size, device, compute_type, cpu_threads)
+        self._workers = [_WorkerProcess(context, args) for _ in range(processes)]
+        self._pool: ReplicaPool[_WorkerProcess] | None = ReplicaPool(list(self._workers))
+
+    def transcribe(self, audio: BinaryIO) -> TranscriptionResult:
+        return self._transcribe_file(audio, None)
+
+    def transcribe_with_prompt(self, audio: BinaryIO, prompt: str) -> TranscriptionResult:
+        return self._transcribe_file(audio, prompt)
+
+    def _transcribe_file(self, audio: BinaryIO, prompt: str | None) -> TranscriptionResult:
+        self._check_open()
+        if isinstance(audio, io.BytesIO):
+            with audio.getbuffer() as data:
+                size = len(data)
+                shm = _share(data)
+        else:
+            # Spooled uploads and other files: read straight into shared memory
+            size = audio.seek(0, io.SEEK_END)
+            audio.seek(0)
+            shm = SharedMemory(create=True, size=max(size, 1))
+            try:
+                _read_into(audio, shm, size)
+            except BaseException:
+                shm.close()
+                shm.unlink()
+                raise
+        return self._transcribe(shm, size, "file", prompt)
+
+    def transcribe_pcm(
+        self, samples: np.ndarray, prompt: str | None = None
+    ) -> TranscriptionResult:
+        self._check_open()
+        data = memoryview(np.ascontiguousarray(samples, dtype=np.float32)).cast("B")
+        return self._transcribe(_share(data), len(data), "pcm", prompt)
+
+    def _check_open(self) -> None:
+        if self._pool is None:
+            raise RuntimeError("Transcriber has been closed")
+
+    def _transcribe(
+        self, shm: SharedMemory, size: int, kind: str, prompt: str | None
+    ) -> TranscriptionResult:
+        """Run a job on audio already in ``shm``, then free the segment."""
+        assert self._pool is not None
+        try:
+            with self._pool.checkout() as worker:
+                try:
+                    status, payload = worker.run(
+                        shm.name, size, kind, prompt, self._job_timeout
+                    )
+                except (RuntimeError, TimeoutError):
+                    worker.restart()
+                    raise
+                worker.jobs_done += 1
+                if self._max_jobs_per_worker and worker.jobs_done >= self._max_jobs_per_worker:
+                    worker.restart()
+        finally:
+            shm.close()
+            shm.unlink()
+        if status == "error":
+            raise RuntimeError(payload)
+        return payload
+
+    def stats(self) -> PoolStats:
+        """Worker utilization, queue depth and completed job count."""
+        if self._pool is None:
+            raise RuntimeError("Transcriber has been closed")
+        return self._pool.stats()
+
+    def close(self) -> None:
+        """Stop all worker processes."""
+        if self._pool is not None:
+            self._pool = None
+            for worker in self._workers:
+                worker.stop()
@@ -0,0 +1,94 @@
+"""A fair, instrumented pool of interchangeable model replicas."""
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Deque, Generic, Iterator, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    replicas: int
+    busy: int
+    waiting: int
+    completed: int
+    busy_seconds: float
+    uptime_seconds: float
+
+    @property
+    def utilization(self) -> float:
+        """Fraction of total replica time spent working since the pool started."""
+        capacity = self.replicas * self.uptime_seconds
+        return self.busy_seconds / capacity if capacity else 0.0
+
+
+class _Handoff(Generic[T]):
+    def __init__(self) -> None:
+        self.ready = threading.Event()
+        self.replica: T | None = None
+
+
+class ReplicaPool(Generic[T]):
+    """Hands out replicas to callers in strict arrival order.
+
+    A released replica goes straight to the longest-waiting caller rather
+    than back into a shared queue, so late arrivals cannot barge ahead.
+    """
+
+    def __init__(self, replicas: list[T]):
+        self._size = len(replicas)
+        self._idle: Deque[T] = deque(replicas)
+        self._waiters: Deque[_Handoff[T]] = deque()
+        self._lock = threading.Lock()
+        self._busy = 0
+        self._completed = 0
+        self._busy_seconds = 0.0
+        self._started = time.monotonic()
+
+    @contextmanager
+    def checkout(self) -> Iterator[T]:
+        replica = self._acquire()
+        start = time.monotonic()
+        try:
+            yield replica
+        finally:
+            self._release(replica, time.monotonic() - start)
+
+    def _acquire(self) -> T:
+        with self._lock:
+            if self._idle:
+                self._busy += 1
+                return self._idle.popleft()
+            handoff: _Handoff[T] = _Handoff()
+            self._waiters.append(handoff)
+        handoff.ready.wait()
+        return handoff.replica  # type: ignore[return-value]
+
+    def _release(self, replica: T, elapsed: float) -> None:
+        with self._lock:
+            self._completed += 1
+            self._busy_seconds += elapsed
+            if self._waiters:
+                # The replica stays busy; it just changes hands
+                handoff = self._waiters.popleft()
+                handoff.replica = replica
+                handoff.ready.set()
+            else:
+                self._busy -= 1
+                self._idle.append(replica)
+
+    def stats(self) -> PoolStats:
+        with self._lock:
+            return PoolStats(
+                replicas=self._size,
+                busy=self._busy,
+                waiting=len(self._waiters),
+                completed=self._completed,
+                busy_seconds=self._busy_seconds,
+                uptime_seconds=time.monotonic() - self._started,
+            )
@@ -1,23 +1,175 @@
 from __future__ import annotations
 
+import re
 import sqlite3
+import threading
+import zlib
 from dataclasses import replace
 from datetime import datetime
 
 from great_dictator.domain.document import (
+    MATCH_END,
+    MATCH_START,
     Document,
+    DocumentCursor,
+    DocumentMetadata,
     DocumentRepositoryPort,
     DocumentSummary,
+    SearchHit,
+    TextPatch,
+    VersionConflict,
 )
 
+try:
+    import zstandard
+except ImportError:  # Optional; zlib is always available
+    zstandard = None
+
+
+# Applied to every pooled connection. WAL lets readers run alongside the
+# writer; with WAL, synchronous=NORMAL is still crash-safe and skips an fsync
+# per commit. cache_size is in KiB when negative.
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-8192",
+    "PRAGMA mmap_size=67108864",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+)
+
+# Words of context either side of a search match
+_SNIPPET_WORDS = 12
+
+# Content is stored as plain TEXT (codec "text") or, when compression is
+# on, from DEFAULT_COMPRESS_MIN_BYTES of UTF-8 up as a compressed BLOB.
+# Every append to or patch of a compressed document decompresses and
+# recompresses all of it, so compression is opt-in.
+COMPRESSION_CODECS = ("zlib", "zstd")
+DEFAULT_COMPRESS_MIN_BYTES = 4096
+# Existing rows are compressed this many to a transaction
+_COMPRESS_BATCH_ROWS = 100
+
+
+def _decode_content(codec: str, stored: str | bytes) -> str:
+    if codec == "text":
+        return stored  # type: ignore[return-value]
+    if codec == "zlib":
+        return zlib.decompress(stored).decode()  # type: ignore[arg-type]
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Document is zstd-compressed; install zstandard to read it")
+        return zstandard.ZstdDecompressor().decompress(stored).decode()
+    raise ValueError(f"Unknown content codec: {codec}")
+
+
+# Full-text index over document names and contents. Content is indexed in
+# segments of about _SEGMENT_CHARS, cut at whitespace, so an append or a
+# patch re-indexes the one or two segments it touches rather than the whole
+# document. document_segments gives each index row its document and where
+# its text starts in the content; the name has a row of its own, at
+# _NAME_SEGMENT. The index keeps its own copy of the text, for snippets.
+_SEGMENT_CHARS = 2048
+_NAME_SEGMENT = -1
+_SEGMENT_SCHEMA = (
+    """
+    CREATE TABLE document_segments (
+        id INTEGER PRIMARY KEY,
+        document_id INTEGER NOT NULL,
+        start INTEGER NOT NULL
+    )
+    """,
+    "CREATE INDEX document_segments_start ON document_segments (document_id, start)",
+    """
+    CREATE VIRTUAL TABLE documents_fts USING fts5(
+        name, content, tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+)
+
+# Earlier indexes had a row per document, kept in step by triggers; the
+# first read documents.content directly, which compressed rows break, and
+# the next re-indexed the whole document on every append
+_DROP_DOCUMENT_FTS = (
+    "DROP TRIGGER IF EXISTS documents_fts_insert",
+    "DROP TRIGGER IF EXISTS documents_fts_delete",
+    "DROP TRIGGER IF EXISTS documents_fts_update",
+    "DROP TABLE IF EXISTS documents_fts",
+    "DROP VIEW IF EXISTS documents_text",
+)
+
+_WHITESPACE = re.compile(r"\s")
+
+
+def _split_segments(text: str, start: int) -> list[tuple[int, str]]:
+    """``text``, found at ``start`` in the content, cut into index segments.
+
+    Cuts fall on whitespace, so no word is split between segments.
+    """
+    segments = []
+    offset = 0
+    while len(text) - offset > _SEGMENT_CHARS:
+        cut = _WHITESPACE.search(text, offset + _SEGMENT_CHARS)
+        if cut is None:
+            break
+        segments.append((start + offset, text[offset : cut.start()]))
+        offset = cut.start()
+    segments.append((start + offset, text[offset:]))
+    return [(offset, segment) for offset, segment in segments if segment]
+
+
+def _match_terms(query: str) -> list[str]:
+    """FTS5 terms for each word of free text, the last as a prefix.
+
+    Each word is quoted, so punctuation and FTS5 operators typed by the
+    user are searched for literally rather than parsed.
+    """
+    words = ['"' + word.replace('"', '""') + '"' for word in query.split()]
+    if words:
+        words[-1] += "*"  # Match while the last word is still being typed
+    return words
+
+
+# Compiled statements kept per connection; the repository uses only a few
+_CACHED_STATEMENTS = 32
+
 
 class SqliteDocumentRepository(DocumentRepositoryPort):
-    def __init__(self, db_path: str) -> None:
+    """Documents in SQLite, one long-lived connection per calling thread.
+
+    Connections are opened on first use by each thread and kept, so each
+    call skips connection setup and reuses the statements sqlite3 has
+    already compiled on that connection. The database is in WAL mode so
+    that loads and listings are not blocked by a save in another thread.
+
+    With ``compression`` ("zlib" or "zstd"), content of
+    ``compress_min_bytes`` or more is stored compressed. Plain text
+    documents are appended to and patched in SQL without reading the
+    document back; compressed ones are rewritten in full.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        compression: str | None = None,
+        compress_min_bytes: int = DEFAULT_COMPRESS_MIN_BYTES,
+    ) -> None:
+        if compression is not None and compression not in COMPRESSION_CODECS:
+            raise ValueError(f"Unknown compression: {compression}")
+        if compression == "zstd" and zstandard is None:
+            raise ValueError("zstd compression needs the zstandard package")
+        self._compression = compression
+        self._compress_min_bytes = compress_min_bytes
         self._db_path = db_path
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
         self._init_db()
+        if compression is not None:
+            self._compress_existing()
 
     def _init_db(self) -> None:
-        with sqlite3.connect(self._db_path) as conn:
+        with self._get_connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS documents (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -28,70 +180,538 @@ class SqliteDocumentRepository(DocumentRepositoryPort):
                     UNIQUE(user, name)
                 )
             """)
+            # Covers the listing query: filter, order and columns in one index
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS documents_user_created
+                ON documents (user, created, id, name)
+            """)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(documents)")}
+            if "version" not in columns:
+                conn.execute(
+                    "ALTER TABLE documents ADD COLUMN version INTEGER NOT NULL DEFAULT 0"
+                )
+            if "codec" not in columns:
+                conn.execute(
+                    "ALTER TABLE documents ADD COLUMN codec TEXT NOT NULL DEFAULT 'text'"
+                )
+                for statement in _DROP_DOCUMENT_FTS:
+                    conn.execute(statement)
+            # Content history: each row undoes one version, so the current
+            # content is stored once and every revision costs only its edit
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS document_revisions (
+                    document_id INTEGER NOT NULL,
+                    version INTEGER NOT NULL,
+                    undo_start INTEGER NOT NULL,
+                    undo_end INTEGER NOT NULL,
+                    undo_text TEXT NOT NULL,
+                    changed TEXT NOT NULL,
+                    PRIMARY KEY (document_id, version)
+                ) WITHOUT ROWID
+            """)
+            has_segments = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'document_segments'"
+            ).fetchone()
+            if not has_segments:
+                for statement in _DROP_DOCUMENT_FTS + _SEGMENT_SCHEMA:
+                    conn.execute(statement)
+                # Index documents written before the segment index existed
+                rows = conn.execute(
+                    "SELECT id, name, codec, content FROM documents"
+                ).fetchall()
+                for document_id, name, codec, stored in rows:
+                    self._index_document(
+                        conn, document_id, name, _decode_content(codec, stored)
+                    )
             conn.commit()
 
+    def _compress_existing(self) -> None:
+        """Compress plain rows at or above the threshold.
+
+        Runs at every start with compression on, so rows written while it
+        was off, or under a higher threshold, are compressed too. Each
+        batch is its own transaction, so writers are not held up for long.
+        """
+        last_id = 0
+        while True:
+            with self._get_connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                rows = conn.execute(
+                    """
+                    SELECT id, content FROM documents
+                    WHERE id > ? AND codec = 'text'
+                        AND length(CAST(content AS BLOB)) >= ?
+                    ORDER BY id LIMIT ?
+                    """,
+                    (last_id, self._compress_min_bytes, _COMPRESS_BATCH_ROWS),
+                ).fetchall()
+                for document_id, content in rows:
+                    codec, stored = self._encode(content)
+                    conn.execute(
+                        "UPDATE documents SET codec=?, content=? WHERE id=?",
+                        (codec, stored, document_id),
+                    )
+            if len(rows) < _COMPRESS_BATCH_ROWS:
+                return
+            last_id = rows[-1][0]
+
+    def _encode(self, content: str) -> tuple[str, str | bytes]:
+        """The codec and stored form for ``content``."""
+        data = content.encode()
+        if self._compression is None or len(data) < self._compress_min_bytes:
+            return "text", content
+        if self._compression == "zstd":
+            return "zstd", zstandard.ZstdCompressor().compress(data)
+        return "zlib", zlib.compress(data)
+
+    def _connect(self) -> sqlite3.Connection:
+        # Only ever used by the thread that opened it; close() may run elsewhere
+        conn = sqlite3.connect(
+            self._db_path,
+            check_same_thread=False,
+            cached_statements=_CACHED_STATEMENTS,
+        )
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
     def _get_connection(self) -> sqlite3.Connection:
-        return sqlite3.connect(self._db_path)
+        """This thread's connection; as a context manager it commits or rolls back."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self) -> None:
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
 
     def save(self, document: Document) -> Document:
         with self._get_connection() as conn:
             if document.id is not None:
-                # Update existing
+                # Update existing, only if nobody else has changed it since
+                conn.execute("BEGIN IMMEDIATE")
+                current = conn.execute(
+                    "SELECT version, name, codec, content FROM documents WHERE id=?",
+                    (document.id,),
+                ).fetchone()
+                if current is None:
+                    return document
+                version, name, codec, stored = current
+                if version != document.version:
+                    raise VersionConflict(document.id, version)
+                old = _decode_content(codec, stored)
+                new_codec, new_stored = self._encode(document.content)
                 conn.execute(
                     """
-                    UPDATE documents SET user=?, name=?, content=?, created=?
+                    UPDATE documents SET user=?, name=?, content=?, codec=?, created=?,
+                        version=version + 1
                     WHERE id=?
                     """,
                     (
                         document.user,
                         document.name,
-                        document.content,
+                        new_stored,
+                        new_codec,
                         document.created.isoformat(),
                         document.id,
                     ),
                 )
+                self._record_revision(
+                    conn,
+                    document.id,
+                    document.version + 1,
+                    TextPatch.between(document.content, old),
+                )
+                if document.name != name:
+                    conn.execute(
+                        """
+                        UPDATE documents_fts SET name = ? WHERE rowid = (
+                            SELECT id FROM document_segments
+                            WHERE document_id = ? AND start = ?
+                        )
+                        """,
+                        (document.name, document.id, _NAME_SEGMENT),
+                    )
+                edit = TextPatch.between(old, document.content)
+                self._reindex(conn, document.id, edit, len(old))
                 conn.commit()
-                return document
+                return replace(document, version=document.version + 1)
             else:
                 # Insert new
+                codec, stored = self._encode(document.content)
                 cursor = conn.execute(
                     """
-                    INSERT INTO documents (user, name, content, created)
-                    VALUES (?, ?, ?, ?)
+                    INSERT INTO documents (user, name, content, codec, created)
+                    VALUES (?, ?, ?, ?, ?)
                     """,
                     (
                         document.user,
                         document.name,
-                        document.content,
+                        stored,
+                        codec,
                         document.created.isoformat(),
                     ),
                 )
+                self._index_document(
+                    conn, cursor.lastrowid, document.name, document.content
+                )
                 conn.commit()
-                return replace(document, id=cursor.lastrowid)
+                return replace(document, id=cursor.lastrowid, version=0)
 
     def load(self, document_id: int) -> Document | None:
         with self._get_connection() as conn:
-            cursor = conn.execute(
-                "SELECT id, user, name, content, created FROM documents WHERE id=?",
+            return self._load(conn, document_id)
+
+    def _load(self, conn: sqlite3.Connection, document_id: int) -> Document | None:
+        row = conn.execute(
+            """
+            SELECT id, user, name, codec, content, created, version
+            FROM documents WHERE id=?
+            """,
+            (document_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        return Document(
+            id=row[0],
+            user=row[1],
+            name=row[2],
+            content=_decode_content(row[3], row[4]),
+            created=datetime.fromisoformat(row[5]),
+            version=row[6],
+        )
+
+    def load_metadata(self, document_id: int) -> DocumentMetadata | None:
+        with self._get_connection() as conn:
+            row = conn.execute(
+                "SELECT id, user, name, created, version FROM documents WHERE id=?",
                 (document_id,),
-            )
-            row = cursor.fetchone()
-            if row is None:
+            ).fetchone()
+        if row is None:
+            return None
+        return DocumentMetadata(
+            id=row[0],
+            user=row[1],
+            name=row[2],
+            created=datetime.fromisoformat(row[3]),
+            version=row[4],
+        )
+
+    def append(self, document_id: int, text: str) -> int | None:
+        with self._get_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            current = conn.execute(
+                "SELECT codec, length(CAST(content AS BLOB)) FROM documents WHERE id = ?",
+                (document_id,),
+            ).fetchone()
+            if current is None:
                 return None
-            return Document(
-                id=row[0],
-                user=row[1],
-                name=row[2],
-                content=row[3],
-                created=datetime.fromisoformat(row[4]),
+            codec, size = current
+            if codec == "text" and not self._compresses(size + len(text.encode())):
+                # Only the new text is sent to SQLite, however long the document is
+                version, length = conn.execute(
+                    """
+                    UPDATE documents SET content = content || ?, version = version + 1
+                    WHERE id = ?
+                    RETURNING version, length(content)
+                    """,
+                    (text, document_id),
+                ).fetchone()
+            else:
+                content = self._read_content(conn, document_id) + text
+                version = self._rewrite_content(conn, document_id, content)
+                length = len(content)
+            # Undoing an append removes the appended text
+            self._record_revision(
+                conn, document_id, version, TextPatch(length - len(text), length, "")
             )
+            self._index_appended(conn, document_id, length - len(text), text)
+            return version
 
-    def list_for_user(self, user: str) -> list[DocumentSummary]:
+    def apply_patch(
+        self, document_id: int, base_version: int, patch: TextPatch
+    ) -> int | None:
         with self._get_connection() as conn:
-            cursor = conn.execute(
-                "SELECT id, name, created FROM documents WHERE user=?",
-                (user,),
+            conn.execute("BEGIN IMMEDIATE")
+            # substr() and length() count characters, like Python indices;
+            # for plain text only the replaced range is read back
+            current = conn.execute(
+                """
+                SELECT version, codec, length(CAST(content AS BLOB)),
+                       length(content), substr(content, :start + 1, :end - :start)
+                FROM documents WHERE id = :id
+                """,
+                {"id": document_id, "start": patch.start, "end": patch.end},
+            ).fetchone()
+            if current is None:
+                return None
+            version, codec, size, length, replaced = current
+            if version != base_version:
+                raise VersionConflict(document_id, version)
+            if codec == "text" and not self._compresses(
+                size + len(patch.text.encode())
+            ):
+                if not 0 <= patch.start <= patch.end <= length:
+                    raise ValueError(
+                        f"Patch {patch.start}:{patch.end} is outside the document "
+                        f"(length {length})"
+                    )
+                conn.execute(
+                    """
+                    UPDATE documents
+                    SET content = substr(content, 1, :start) || :text
+                        || substr(content, :end + 1),
+                        version = version + 1
+                    WHERE id = :id
+                    """,
+                    {
+                        "id": document_id,
+                        "start": patch.start,
+                        "end": patch.end,
+                        "text": patch.text,
+                    },
+                )
+            else:
+                old = self._read_content(conn, document_id)
+                replaced = old[patch.start : patch.end]
+                length = len(old)
+                self._rewrite_content(conn, document_id, patch.apply(old))
+            self._record_revision(
+                conn,
+                document_id,
+                version + 1,
+                TextPatch(patch.start, patch.start + len(patch.text), replaced),
             )
+            self._reindex(conn, document_id, patch, length)
+            return version + 1
+
+    def _compresses(self, size: int) -> bool:
+        return self._compression is not None and size >= self._compress_min_bytes
+
+    def _read_content(self, conn: sqlite3.Connection, document_id: int) -> str:
+        codec, stored = conn.execute(
+            "SELECT codec, content FROM documents WHERE id = ?", (document_id,)
+        ).fetchone()
+        return _decode_content(codec, stored)
+
+    def _rewrite_content(
+        self, conn: sqlite3.Connection, document_id: int, content: str
+    ) -> int:
+        """Store new content in full; returns the new version."""
+        codec, stored = self._encode(content)
+        return conn.execute(
+            """
+            UPDATE documents SET content = ?, codec = ?, version = version + 1
+            WHERE id = ?
+            RETURNING version
+            """,
+            (stored, codec, document_id),
+        ).fetchone()[0]
+
+    def _record_revision(
+        self, conn: sqlite3.Connection, document_id: int, version: int, undo: TextPatch
+    ) -> None:
+        """Store the patch that takes ``version`` back to the version before it."""
+        conn.execute(
+            """
+            INSERT INTO document_revisions
+                (document_id, version, undo_start, undo_end, undo_text, changed)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (
+                document_id,
+                version,
+                undo.start,
+                undo.end,
+                undo.text,
+                datetime.now().isoformat(),
+            ),
+        )
+
+    def _index_document(
+        self, conn: sqlite3.Connection, document_id: int, name: str, content: str
+    ) -> None:
+        """Index a new document's name and content."""
+        segment_id = conn.execute(
+            "INSERT INTO document_segments (document_id, start) VALUES (?, ?)",
+            (document_id, _NAME_SEGMENT),
+        ).lastrowid
+        conn.execute(
+            "INSERT INTO documents_fts (rowid, name, content) VALUES (?, ?, '')",
+            (segment_id, name),
+        )
+        self._index_text(conn, document_id, 0, content)
+
+    def _index_text(
+        self, conn: sqlite3.Connection, document_id: int, start: int, text: str
+    ) -> None:
+        """Index ``text``, found at ``start`` in the content."""
+        for offset, segment in _split_segments(text, start):
+            segment_id = conn.execute(
+                "INSERT INTO document_segments (document_id, start) VALUES (?, ?)",
+                (document_id, offset),
+            ).lastrowid
+            conn.execute(
+                "INSERT INTO documents_fts (rowid, name, content) VALUES (?, '', ?)",
+                (segment_id, segment),
+            )
+
+    def _drop_segments(
+        self, conn: sqlite3.Connection, document_id: int, first: int, last: int
+    ) -> None:
+        """Remove the content segments starting from ``first`` to ``last``."""
+        conn.execute(
+            """
+            DELETE FROM documents_fts WHERE rowid IN (
+                SELECT id FROM document_segments
+                WHERE document_id = ? AND start BETWEEN ? AND ?
+            )
+            """,
+            (document_id, first, last),
+        )
+        conn.execute(
+            """
+            DELETE FROM document_segments
+            WHERE document_id = ? AND start BETWEEN ? AND ?
+            """,
+            (document_id, first, last),
+        )
+
+    def _index_appended(
+        self, conn: sqlite3.Connection, document_id: int, start: int, text: str
+    ) -> None:
+        """Index ``text`` appended at ``start``.
+
+        It joins the last segment while that is short, or when the two
+        meet mid-word; either way only that segment is indexed again.
+        """
+        if not text:
+            return
+        last = conn.execute(
+            """
+            SELECT s.start, f.content
+            FROM document_segments s JOIN documents_fts f ON f.rowid = s.id
+            WHERE s.document_id = ? AND s.start >= 0
+            ORDER BY s.start DESC LIMIT 1
+            """,
+            (document_id,),
+        ).fetchone()
+        if last is not None:
+            last_start, segment = last
+            if len(segment) + len(text) <= _SEGMENT_CHARS or not (
+                segment[-1:].isspace() or text[:1].isspace()
+            ):
+                self._drop_segments(conn, document_id, last_start, last_start)
+                start, text = last_start, segment + text
+        self._index_text(conn, document_id, start, text)
+
+    def _reindex(
+        self, conn: sqlite3.Connection, document_id: int, patch: TextPatch, length: int
+    ) -> None:
+        """Index the segments ``patch`` touched again, once it is applied.
+
+        ``length`` is the content length before the patch. The segments
+        either side of the patched range are included when they meet it, so
+        words it joins across a segment boundary are cut afresh.
+        """
+        if patch.start == patch.end and not patch.text:
+            return
+        first = conn.execute(
+            """
+            SELECT coalesce(max(start), 0) FROM document_segments
+            WHERE document_id = ? AND start >= 0 AND start < ?
+            """,
+            (document_id, patch.start),
+        ).fetchone()[0]
+        after = conn.execute(
+            """
+            SELECT min(start) FROM document_segments
+            WHERE document_id = ? AND start > ?
+            """,
+            (document_id, patch.end),
+        ).fetchone()[0]
+        shift = len(patch.text) - (patch.end - patch.start)
+        end = (length if after is None else after) + shift
+        self._drop_segments(conn, document_id, first, patch.end)
+        if after is not None and shift:
+            conn.execute(
+                """
+                UPDATE document_segments SET start = start + ?
+                WHERE document_id = ? AND start >= ?
+                """,
+                (shift, document_id, after),
+            )
+        # substr() counts characters from 1; compressed content is read whole
+        codec, text = conn.execute(
+            """
+            SELECT codec,
+                   CASE codec WHEN 'text' THEN substr(content, ?, ?) ELSE content END
+            FROM documents WHERE id = ?
+            """,
+            (first + 1, end - first, document_id),
+        ).fetchone()
+        if codec != "text":
+            text = _decode_content(codec, text)[first:end]
+        self._index_text(conn, document_id, first, text)
+
+    def load_version(self, document_id: int, version: int) -> Document | None:
+        with self._get_connection() as conn:
+            # One read transaction, so the document and the history that
+            # undoes it come from the same snapshot even if a write lands
+            conn.execute("BEGIN")
+            document = self._load(conn, document_id)
+            if document is None or not 0 <= version <= document.version:
+                return None
+            undos = conn.execute(
+                """
+                SELECT undo_start, undo_end, undo_text FROM document_revisions
+                WHERE document_id = ? AND version > ?
+                ORDER BY version DESC
+                """,
+                (document_id, version),
+            ).fetchall()
+        if len(undos) != document.version - version:
+            return None  # History from before revisions were recorded
+        content = document.content
+        for start, end, text in undos:
+            content = TextPatch(start, end, text).apply(content)
+        return replace(document, content=content, version=version)
+
+    def list_for_user(
+        self, user: str, limit: int | None = None, after: DocumentCursor | None = None
+    ) -> list[DocumentSummary]:
+        # Keyset pagination: seek straight to the cursor in the covering
+        # index, so a page costs the same however deep into the list it is
+        with self._get_connection() as conn:
+            if after is None:
+                cursor = conn.execute(
+                    """
+                    SELECT id, name, created FROM documents WHERE user=?
+                    ORDER BY created DESC, id DESC LIMIT ?
+                    """,
+                    (user, -1 if limit is None else limit),
+                )
+            else:
+                cursor = conn.execute(
+                    """
+                    SELECT id, name, created FROM documents
+                    WHERE user=? AND (created, id) < (?, ?)
+                    ORDER BY created DESC, id DESC LIMIT ?
+                    """,
+                    (
+                        user,
+                        after.created.isoformat(),
+                        after.id,
+                        -1 if limit is None else limit,
+                    ),
+                )
             return [
                 DocumentSummary(
                     id=row[0],
@@ -101,8 +721,111 @@ class SqliteDocumentRepository(DocumentRepositoryPort):
                 for row in cursor.fetchall()
             ]
 
+    def search(self, user: str, query: str, limit: int = 20) -> list[SearchHit]:
+        terms = _match_terms(query)
+        if not terms:
+            return []
+        # A document matches when every term is in its name or one of its
+        # segments. It ranks by its best segment, which gives the snippet.
+        every_term = " INTERSECT ".join(
+            [
+                """
+                SELECT s.document_id FROM documents_fts
+                JOIN document_segments s ON s.id = documents_fts.rowid
+                WHERE documents_fts MATCH ?
+                """
+            ]
+            * len(terms)
+        )
+        any_term = " OR ".join(terms)
+        with self._get_connection() as conn:
+            ranked = conn.execute(
+                f"""
+                SELECT d.id, d.name, d.created
+                FROM documents_fts
+                JOIN document_segments s ON s.id = documents_fts.rowid
+                JOIN documents d ON d.id = s.document_id
+                WHERE documents_fts MATCH ? AND d.user = ?
+                    AND d.id IN ({every_term})
+                GROUP BY d.id
+                ORDER BY min(documents_fts.rank)
+                LIMIT ?
+                """,
+                (any_term, user, *terms, limit),
+            ).fetchall()
+            if not ranked:
+                return []
+            ids = [row[0] for row in ranked]
+            # min() takes the bare rowid from each document's best segment
+            best = [
+                row[0]
+                for row in conn.execute(
+                    f"""
+                    SELECT documents_fts.rowid, min(documents_fts.rank)
+                    FROM documents_fts
+                    JOIN document_segments s ON s.id = documents_fts.rowid
+                    WHERE documents_fts MATCH ? AND s.start >= 0
+                        AND s.document_id IN ({", ".join("?" * len(ids))})
+                    GROUP BY s.document_id
+                    """,
+                    (any_term, *ids),
+                )
+            ]
+            snippets: dict[int, str] = {}
+            if best:
+                snippets.update(
+                    conn.execute(
+                        f"""
+                        SELECT s.document_id, snippet(documents_fts, 1, ?, ?, '…', ?)
+                        FROM documents_fts
+                        JOIN document_segments s ON s.id = documents_fts.rowid
+                        WHERE documents_fts MATCH ?
+                            AND documents_fts.rowid IN ({", ".join("?" * len(best))})
+                        """,
+                        (MATCH_START, MATCH_END, _SNIPPET_WORDS, any_term, *best),
+                    )
+                )
+            # Documents found by their name alone open with their first words
+            for document_id in ids:
+                if document_id not in snippets:
+                    opening = conn.execute(
+                        """
+                        SELECT documents_fts.content FROM document_segments s
+                        JOIN documents_fts ON documents_fts.rowid = s.id
+                        WHERE s.document_id = ? AND s.start = 0
+                        """,
+                        (document_id,),
+                    ).fetchone()
+                    words = opening[0].split() if opening else []
+                    snippets[document_id] = " ".join(words[:_SNIPPET_WORDS]) + (
+                        "…" if len(words) > _SNIPPET_WORDS else ""
+                    )
+        return [
+            SearchHit(
+                id=row[0],
+                name=row[1],
+                created=datetime.fromisoformat(row[2]),
+                snippet=snippets[row[0]],
+            )
+            for row in ranked
+        ]
+
     def delete(self, document_id: int) -> bool:
         with self._get_connection() as conn:
+            conn.execute(
+                "DELETE FROM document_revisions WHERE document_id=?", (document_id,)
+            )
+            conn.execute(
+                """
+                DELETE FROM documents_fts WHERE rowid IN (
+                    SELECT id FROM document_segments WHERE document_id = ?
+                )
+                """,
+                (document_id,),
+            )
+            conn.execute(
+                "DELETE FROM document_segments WHERE document_id=?", (document_id,)
+            )
             cursor = conn.execute(
                 "DELETE FROM documents WHERE id=?",
                 (document_id,),
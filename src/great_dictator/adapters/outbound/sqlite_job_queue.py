@@ -0,0 +1,170 @@
+"""Re-transcription jobs in SQLite, beside the documents table.
+
+The web server enqueues and reports progress; a worker process claims
+jobs and records each chunk's transcript as it goes, so a restarted
+worker resumes where the last one stopped.
+"""
+from __future__ import annotations
+
+import sqlite3
+import threading
+from datetime import datetime
+
+from great_dictator.domain.retranscription import (
+    DONE,
+    FAILED,
+    QUEUED,
+    RUNNING,
+    JobQueuePort,
+    RetranscriptionJob,
+)
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS retranscription_jobs (
+        id INTEGER PRIMARY KEY,
+        document_id INTEGER NOT NULL,
+        status TEXT NOT NULL,
+        chunks_done INTEGER NOT NULL DEFAULT 0,
+        chunks_total INTEGER NOT NULL DEFAULT 0,
+        error TEXT,
+        created TEXT NOT NULL,
+        updated TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS retranscription_jobs_status
+    ON retranscription_jobs (status, id)
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS retranscription_results (
+        job_id INTEGER NOT NULL,
+        sequence INTEGER NOT NULL,
+        text TEXT NOT NULL,
+        PRIMARY KEY (job_id, sequence)
+    ) WITHOUT ROWID
+    """,
+)
+
+_JOB_COLUMNS = "id, document_id, status, chunks_done, chunks_total, error"
+
+
+def _job(row: tuple) -> RetranscriptionJob:
+    return RetranscriptionJob(*row)
+
+
+class SqliteJobQueue(JobQueuePort):
+    def __init__(self, db_path: str):
+        # One connection; the lock serialises its use across threads. The
+        # worker process has its own, and busy_timeout waits out its writes.
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            for statement in _SCHEMA:
+                self._conn.execute(statement)
+
+    def enqueue(self, document_id: int) -> RetranscriptionJob:
+        now = datetime.now().isoformat()
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            row = self._conn.execute(
+                f"""
+                SELECT {_JOB_COLUMNS} FROM retranscription_jobs
+                WHERE document_id = ? AND status IN (?, ?)
+                """,
+                (document_id, QUEUED, RUNNING),
+            ).fetchone()
+            if row is None:
+                row = self._conn.execute(
+                    f"""
+                    INSERT INTO retranscription_jobs
+                        (document_id, status, created, updated)
+                    VALUES (?, ?, ?, ?)
+                    RETURNING {_JOB_COLUMNS}
+                    """,
+                    (document_id, QUEUED, now, now),
+                ).fetchone()
+        return _job(row)
+
+    def get(self, job_id: int) -> RetranscriptionJob | None:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_JOB_COLUMNS} FROM retranscription_jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        return _job(row) if row else None
+
+    def claim(self) -> RetranscriptionJob | None:
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                f"""
+                UPDATE retranscription_jobs SET status = ?, updated = ?
+                WHERE id = (
+                    SELECT id FROM retranscription_jobs WHERE status = ?
+                    ORDER BY id LIMIT 1
+                )
+                RETURNING {_JOB_COLUMNS}
+                """,
+                (RUNNING, datetime.now().isoformat(), QUEUED),
+            ).fetchone()
+        return _job(row) if row else None
+
+    def record(self, job_id: int, sequence: int, text: str, chunks_total: int) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO retranscription_results (job_id, sequence, text)
+                VALUES (?, ?, ?)
+                """,
+                (job_id, sequence, text),
+            )
+            self._conn.execute(
+                """
+                UPDATE retranscription_jobs SET
+                    chunks_done = (
+                        SELECT COUNT(*) FROM retranscription_results WHERE job_id = ?
+                    ),
+                    chunks_total = ?, updated = ?
+                WHERE id = ?
+                """,
+                (job_id, chunks_total, datetime.now().isoformat(), job_id),
+            )
+
+    def results(self, job_id: int) -> dict[int, str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT sequence, text FROM retranscription_results WHERE job_id = ?",
+                (job_id,),
+            ).fetchall()
+        return dict(rows)
+
+    def finish(self, job_id: int, error: str | None = None) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                UPDATE retranscription_jobs SET status = ?, error = ?, updated = ?
+                WHERE id = ?
+                """,
+                (
+                    DONE if error is None else FAILED,
+                    error,
+                    datetime.now().isoformat(),
+                    job_id,
+                ),
+            )
+            self._conn.execute(
+                "DELETE FROM retranscription_results WHERE job_id = ?", (job_id,)
+            )
+
+    def requeue_running(self) -> int:
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "UPDATE retranscription_jobs SET status = ? WHERE status = ?",
+                (QUEUED, RUNNING),
+            ).rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -2,11 +2,129 @@ from __future__ import annotations
 
 import gc
 import threading
-from io import BytesIO
+from bisect import bisect_right
+from collections.abc import Iterable, Iterator
+from typing import BinaryIO
 
-from faster_whisper import WhisperModel
+import numpy as np
+from faster_whisper import BatchedInferencePipeline, WhisperModel, decode_audio
+from faster_whisper.audio import pad_or_trim
+from faster_whisper.transcribe import Segment, TranscriptionInfo
+from faster_whisper.vad import VadOptions, get_speech_timestamps
 
-from great_dictator.domain.transcription import TranscriberPort, TranscriptionResult
+from great_dictator.adapters.outbound.replica_pool import PoolStats, ReplicaPool
+from great_dictator.domain.transcription import (
+    AudioInput,
+    TranscriberPort,
+    TranscriptionResult,
+    TranscriptionSegment,
+)
+
+
+# Non-speech is filtered out with these settings on every path
+_VAD_PARAMETERS = dict(
+    min_silence_duration_ms=500,  # Minimum silence to split
+    speech_pad_ms=200,  # Padding around speech
+)
+
+
+def _decode(
+    model: WhisperModel, audio: AudioInput, prompt: str | None = None
+) -> tuple[Iterable[Segment], TranscriptionInfo]:
+    """Start decoding; the returned segments are produced lazily as iterated."""
+    return model.transcribe(
+        audio, initial_prompt=prompt, vad_filter=True, vad_parameters=_VAD_PARAMETERS
+    )
+
+
+def _speech(samples: np.ndarray) -> np.ndarray:
+    """The clip's speech laid end to end, as faster-whisper's VAD filter keeps it."""
+    stretches = get_speech_timestamps(samples, VadOptions(**_VAD_PARAMETERS))
+    if not stretches:
+        return samples[:0]
+    return np.concatenate([samples[s["start"]:s["end"]] for s in stretches])
+
+
+def _languages(model: WhisperModel, clips: list[np.ndarray]) -> list[str]:
+    """Each clip's language, detected in one batched encoder pass."""
+    if not model.model.is_multilingual:
+        return ["en"] * len(clips)
+    features = np.stack([pad_or_trim(model.feature_extractor(clip)) for clip in clips])
+    detected = model.model.detect_language(model.encode(features))
+    # Best first, as tokens like "<|fr|>"
+    return [probabilities[0][0][2:-2] for probabilities in detected]
+
+
+def _run_model(
+    model: WhisperModel, audio: AudioInput, prompt: str | None = None
+) -> TranscriptionResult:
+    segments, info = _decode(model, audio, prompt)
+    text = " ".join(segment.text.strip() for segment in segments)
+    return TranscriptionResult(text=text, language=info.language)
+
+
+def _run_model_segments(
+    model: WhisperModel, audio: AudioInput, prompt: str | None = None
+) -> Iterator[TranscriptionSegment]:
+    segments, _ = _decode(model, audio, prompt)
+    for segment in segments:
+        if segment.text.strip():
+            yield TranscriptionSegment(
+                text=segment.text.strip(), start=segment.start, end=segment.end
+            )
+
+
+def _run_model_batch(
+    model: WhisperModel, audios: list[AudioInput]
+) -> list[TranscriptionResult]:
+    """Transcribe many short clips in batched forward passes.
+
+    Each clip's speech is cut out with the same VAD settings as a single
+    transcription, and its language detected, all clips in one encoder
+    pass. Clips of one language are laid end to end and decoded together
+    by faster-whisper's batched pipeline, one clip per batch element; each
+    decoded segment is routed back to its clip by start time. Clips with
+    no speech, or more than one model window (30 s) of it, take the
+    ordinary sequential path.
+    """
+    sampling_rate = model.feature_extractor.sampling_rate
+    window = model.feature_extractor.chunk_length * sampling_rate
+    samples = [
+        audio if isinstance(audio, np.ndarray) else decode_audio(audio, sampling_rate=sampling_rate)
+        for audio in audios
+    ]
+    speech = [_speech(clip) for clip in samples]
+    results: list[TranscriptionResult | None] = [None] * len(samples)
+
+    batched = [i for i, clip in enumerate(speech) if 0 < len(clip) <= window]
+    for i, clip in enumerate(samples):
+        if i not in batched:
+            results[i] = _run_model(model, clip)
+    by_language: dict[str, list[int]] = {}
+    for i, language in zip(batched, _languages(model, [speech[i] for i in batched])):
+        by_language.setdefault(language, []).append(i)
+    for language, group in by_language.items():
+        clip_starts: list[float] = []
+        clip_timestamps = []
+        offset = 0
+        for i in group:
+            clip_starts.append(offset / sampling_rate)
+            offset += len(speech[i])
+            clip_timestamps.append({"start": clip_starts[-1], "end": offset / sampling_rate})
+        segments, _ = BatchedInferencePipeline(model).transcribe(
+            np.concatenate([speech[i] for i in group]),
+            language=language,
+            clip_timestamps=clip_timestamps,
+            batch_size=len(group),
+        )
+        texts: list[list[str]] = [[] for _ in group]
+        for segment in segments:
+            # Segment starts are rounded to milliseconds; allow for that
+            clip = max(bisect_right(clip_starts, segment.start + 1e-3) - 1, 0)
+            texts[clip].append(segment.text.strip())
+        for clip, i in enumerate(group):
+            results[i] = TranscriptionResult(text=" ".join(texts[clip]), language=language)
+    return results  # type: ignore[return-value]
 
 
 class WhisperTranscriber(TranscriberPort):
@@ -15,26 +133,51 @@ class WhisperTranscriber(TranscriberPort):
         model_size: str = "base",
         device: str = "cpu",
         compute_type: str = "int8",
+        cpu_threads: int = 0,
+        num_workers: int = 1,
     ):
         self._model: WhisperModel | None = WhisperModel(
-            model_size, device=device, compute_type=compute_type
+            model_size,
+            device=device,
+            compute_type=compute_type,
+            cpu_threads=cpu_threads,
+            num_workers=num_workers,
         )
         self._lock = threading.Lock()
 
-    def transcribe(self, audio: BytesIO) -> TranscriptionResult:
+    def transcribe(self, audio: BinaryIO) -> TranscriptionResult:
         if self._model is None:
             raise RuntimeError("Transcriber has been closed")
         with self._lock:
-            segments, info = self._model.transcribe(
-                audio,
-                vad_filter=True,  # Filter out non-speech segments
-                vad_parameters=dict(
-                    min_silence_duration_ms=500,  # Minimum silence to split
-                    speech_pad_ms=200,  # Padding around speech
-                ),
-            )
-            text = " ".join(segment.text.strip() for segment in segments)
-        return TranscriptionResult(text=text, language=info.language)
+            return _run_model(self._model, audio)
+
+    def transcribe_with_prompt(self, audio: BinaryIO, prompt: str) -> TranscriptionResult:
+        if self._model is None:
+            raise RuntimeError("Transcriber has been closed")
+        with self._lock:
+            return _run_model(self._model, audio, prompt)
+
+    def transcribe_pcm(
+        self, samples: np.ndarray, prompt: str | None = None
+    ) -> TranscriptionResult:
+        if self._model is None:
+            raise RuntimeError("Transcriber has been closed")
+        with self._lock:
+            return _run_model(self._model, samples, prompt)
+
+    def transcribe_segments(
+        self, audio: AudioInput, prompt: str | None = None
+    ) -> Iterator[TranscriptionSegment]:
+        if self._model is None:
+            raise RuntimeError("Transcriber has been closed")
+        with self._lock:  # Held until the caller finishes or closes the iterator
+            yield from _run_model_segments(self._model, audio, prompt)
+
+    def transcribe_batch(self, audios: list[AudioInput]) -> list[TranscriptionResult]:
+        if self._model is None:
+            raise RuntimeError("Transcriber has been closed")
+        with self._lock:
+            return _run_model_batch(self._model, audios)
 
     def close(self) -> None:
         """Release the Whisper model to free resources."""
@@ -42,3 +185,82 @@ class WhisperTranscriber(TranscriberPort):
             del self._model
             self._model = None
             gc.collect()
+
+
+class PooledWhisperTranscriber(TranscriberPort):
+    """Runs concurrent transcriptions on several independent model replicas.
+
+    Each replica is a separate WhisperModel, so N replicas transcribe N
+    requests at once. Give each replica ``cpu_threads`` of roughly
+    cores / replicas to avoid oversubscribing the CPU.
+    """
+
+    def __init__(
+        self,
+        replicas: int = 2,
+        model_size: str = "base",
+        device: str = "cpu",
+        compute_type: str = "int8",
+        cpu_threads: int = 0,
+        num_workers: int = 1,
+    ):
+        if replicas < 1:
+            raise ValueError("replicas must be at least 1")
+        self._pool: ReplicaPool[WhisperModel] | None = ReplicaPool(
+            [
+                WhisperModel(
+                    model_size,
+                    device=device,
+                    compute_type=compute_type,
+                    cpu_threads=cpu_threads,
+                    num_workers=num_workers,
+                )
+                for _ in range(replicas)
+            ]
+        )
+
+    def transcribe(self, audio: BinaryIO) -> TranscriptionResult:
+        if self._pool is None:
+            raise RuntimeError("Transcriber has been closed")
+        with self._pool.checkout() as model:
+            return _run_model(model, audio)
+
+    def transcribe_with_prompt(self, audio: BinaryIO, prompt: str) -> TranscriptionResult:
+        if self._pool is None:
+            raise RuntimeError("Transcriber has been closed")
+        with self._pool.checkout() as model:
+            return _run_model(model, audio, prompt)
+
+    def transcribe_pcm(
+        self, samples: np.ndarray, prompt: str | None = None
+    ) -> TranscriptionResult:
+        if self._pool is None:
+            raise RuntimeError("Transcriber has been closed")
+        with self._pool.checkout() as model:
+            return _run_model(model, samples, prompt)
+
+    def transcribe_segments(
+        self, audio: AudioInput, prompt: str | None = None
+    ) -> Iterator[TranscriptionSegment]:
+        if self._pool is None:
+            raise RuntimeError("Transcriber has been closed")
+        with self._pool.checkout() as model:
+            yield from _run_model_segments(model, audio, prompt)
+
+    def transcribe_batch(self, audios: list[AudioInput]) -> list[TranscriptionResult]:
+        if self._pool is None:
+            raise RuntimeError("Transcriber has been closed")
+        with self._pool.checkout() as model:
+            return _run_model_batch(model, audios)
+
+    def stats(self) -> PoolStats:
+        """Replica utilization, queue depth and completed job count."""
+        if self._pool is None:
+            raise RuntimeError("Transcriber has been closed")
+        return self._pool.stats()
+
+    def close(self) -> None:
+        """Release the model replicas to free resources."""
+        if self._pool is not None:
+            self._pool = None
+            gc.collect()
@@ -1,14 +1,27 @@
 import os
 from pathlib import Path
+from typing import Callable, List, Optional, Union
 
 from dotenv import load_dotenv
 
 from great_dictator.adapters.inbound.fastapi_app import create_app
+from great_dictator.adapters.outbound.batching_transcriber import BatchingTranscriber
+from great_dictator.adapters.outbound.caching_transcriber import CachingTranscriber
+from great_dictator.adapters.outbound.long_form_transcriber import LongFormTranscriber
+from great_dictator.adapters.outbound.pack_audio_store import PackAudioStore
+from great_dictator.adapters.outbound.process_whisper_transcriber import (
+    ProcessPoolWhisperTranscriber,
+)
 from great_dictator.adapters.outbound.sqlite_document_repository import (
     SqliteDocumentRepository,
 )
-from great_dictator.adapters.outbound.whisper_transcriber import WhisperTranscriber
-from great_dictator.domain.transcription import TranscriptionService
+from great_dictator.adapters.outbound.sqlite_job_queue import SqliteJobQueue
+from great_dictator.adapters.outbound.whisper_transcriber import (
+    _VAD_PARAMETERS,
+    PooledWhisperTranscriber,
+    WhisperTranscriber,
+)
+from great_dictator.domain.transcription import TranscriberPort, TranscriptionService
 
 load_dotenv()
 
@@ -16,11 +29,145 @@ db_path = os.getenv("DATABASE_PATH", "data/documents.db")
 db_dir = Path(db_path).parent
 db_dir.mkdir(parents=True, exist_ok=True)
 
-transcriber = WhisperTranscriber(
-    model_size="large-v3",
-    device="cpu",
-    compute_type="int8",
+backend = os.getenv("WHISPER_BACKEND", "thread")  # "thread" or "process"
+replicas = int(os.getenv("WHISPER_REPLICAS", "1"))
+cpu_threads = int(os.getenv("WHISPER_CPU_THREADS", "0"))
+num_workers = int(os.getenv("WHISPER_NUM_WORKERS", "1"))
+transcriber: Union[
+    WhisperTranscriber, PooledWhisperTranscriber, ProcessPoolWhisperTranscriber
+]
+if backend == "process":
+    transcriber = ProcessPoolWhisperTranscriber(
+        processes=replicas,
+        model_size="large-v3",
+        device="cpu",
+        compute_type="int8",
+        cpu_threads=cpu_threads,
+        max_jobs_per_worker=int(os.getenv("WHISPER_MAX_JOBS_PER_WORKER", "0")),
+        job_timeout=float(os.getenv("TRANSCRIPTION_TIMEOUT_S", "300")),
+    )
+elif replicas > 1:
+    transcriber = PooledWhisperTranscriber(
+        replicas=replicas,
+        model_size="large-v3",
+        device="cpu",
+        compute_type="int8",
+        cpu_threads=cpu_threads,
+        num_workers=num_workers,
+    )
+else:
+    transcriber = WhisperTranscriber(
+        model_size="large-v3",
+        device="cpu",
+        compute_type="int8",
+        cpu_threads=cpu_threads,
+        num_workers=num_workers,
+    )
+
+# Decorators wrap the model transcriber; on shutdown, close outermost first
+live_transcriber: TranscriberPort = transcriber
+closers: List[Callable[[], None]] = [transcriber.close]
+
+batch_size = int(os.getenv("BATCH_MAX_SIZE", "1"))
+if batch_size > 1:
+    batcher = BatchingTranscriber(
+        live_transcriber,
+        max_batch_size=batch_size,
+        max_wait_ms=float(os.getenv("BATCH_MAX_WAIT_MS", "10")),
+        batch_workers=replicas,
+    )
+    live_transcriber = batcher
+    closers.insert(0, batcher.close)
+
+# Long recordings are split at silences and their chunks run in parallel
+long_form_min_s = float(os.getenv("LONG_FORM_MIN_S", "180"))
+long_form_chunk_s = float(os.getenv("LONG_FORM_CHUNK_S", "30"))
+if long_form_min_s > 0:
+    long_former = LongFormTranscriber(
+        live_transcriber,
+        min_duration_s=long_form_min_s,
+        chunk_s=long_form_chunk_s,
+        parallelism=int(
+            os.getenv("LONG_FORM_PARALLELISM", str(replicas * batch_size))
+        ),
+    )
+    live_transcriber = long_former
+    closers.insert(0, long_former.close)
+
+# Repeated audio (client retries, re-submitted files) is answered from cache.
+# The namespace names every setting that changes the text, so changing one
+# never serves results produced under the old configuration.
+cache_mb = float(os.getenv("TRANSCRIPTION_CACHE_MB", "16"))
+if cache_mb > 0:
+    vad = ",".join(f"{name}={value}" for name, value in sorted(_VAD_PARAMETERS.items()))
+    cache = CachingTranscriber(
+        live_transcriber,
+        namespace=(
+            f"large-v3:int8:vad={vad}"
+            f":batch={batch_size}"
+            f":long_form={long_form_min_s}/{long_form_chunk_s}"
+        ),
+        max_bytes=int(cache_mb * 1024 * 1024),
+        disk_path=os.getenv("TRANSCRIPTION_CACHE_PATH") or None,
+        disk_max_bytes=int(
+            float(os.getenv("TRANSCRIPTION_CACHE_DISK_MB", "256")) * 1024 * 1024
+        ),
+    )
+    live_transcriber = cache
+    closers.insert(0, cache.close)
+
+
+def shutdown() -> None:
+    for close in closers:
+        close()
+
+
+service = TranscriptionService(
+    live_transcriber,
+    # Enough workers to keep every replica fed with full batches
+    max_workers=int(os.getenv("TRANSCRIPTION_WORKERS", str(replicas * batch_size))),
+    max_queue=int(os.getenv("TRANSCRIPTION_QUEUE_SIZE", "8")),
+    timeout=float(os.getenv("TRANSCRIPTION_TIMEOUT_S", "300")),
+)
+# Two-pass streaming: a small model answers live streams at once, and the
+# main model's revision follows (e.g. DRAFT_MODEL=base or distil-large-v3)
+draft_model = os.getenv("DRAFT_MODEL", "")
+draft_service: Optional[TranscriptionService] = None
+if draft_model:
+    draft_transcriber = WhisperTranscriber(
+        model_size=draft_model,
+        device="cpu",
+        compute_type="int8",
+        cpu_threads=int(os.getenv("DRAFT_CPU_THREADS", "0")),
+    )
+    closers.append(draft_transcriber.close)
+    draft_service = TranscriptionService(
+        draft_transcriber,
+        max_workers=int(os.getenv("DRAFT_WORKERS", "1")),
+        max_queue=int(os.getenv("TRANSCRIPTION_QUEUE_SIZE", "8")),
+        timeout=float(os.getenv("TRANSCRIPTION_TIMEOUT_S", "300")),
+    )
+
+# Large transcripts can be stored compressed ("zlib", "zstd" or "none"),
+# at the cost of rewriting them in full on every append
+document_compression = os.getenv("DOCUMENT_COMPRESSION", "none")
+document_repository = SqliteDocumentRepository(
+    db_path,
+    compression=None if document_compression == "none" else document_compression,
+    compress_min_bytes=int(os.getenv("DOCUMENT_COMPRESS_MIN_BYTES", "4096")),
+)
+closers.append(document_repository.close)
+
+# Dictated audio is kept for playback and re-transcription; empty disables
+audio_store_dir = os.getenv("AUDIO_STORE_DIR", str(db_dir / "audio"))
+audio_store = PackAudioStore(audio_store_dir) if audio_store_dir else None
+# Jobs for the re-transcription worker (great_dictator.retranscription_worker)
+job_queue = SqliteJobQueue(db_path)
+app = create_app(
+    service,
+    document_repository,
+    on_shutdown=shutdown,
+    audio_store=audio_store,
+    job_queue=job_queue,
+    draft_service=draft_service,
 )
-service = TranscriptionService(transcriber)
-document_repository = SqliteDocumentRepository(db_path)
-app = create_app(service, document_repository, on_shutdown=transcriber.close)
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+import numpy as np
+
+from great_dictator.domain.transcription import PCM_SAMPLE_RATE
+
+
+@dataclass(frozen=True)
+class AudioChunk:
+    """A stretch of a document's audio and the text transcribed from it.
+
+    ``start``/``end`` are seconds into the document's recorded audio;
+    ``text`` is what was transcribed, and ``text_start``/``text_end`` where
+    it was put in the document's content at the time.
+    """
+
+    document_id: int
+    sequence: int
+    start: float
+    end: float
+    text_start: int
+    text_end: int
+    text: str = ""
+
+
+class AudioStorePort(ABC):
+    """Keeps the audio that documents were dictated from."""
+
+    @abstractmethod
+    def append(
+        self, document_id: int, samples: np.ndarray, text: str, text_start: int
+    ) -> AudioChunk:
+        """Add float32 16 kHz mono ``samples`` to the end of the document's audio.
+
+        ``text`` is their transcript, found at ``text_start`` in the content.
+        """
+        pass
+
+    @abstractmethod
+    def update_text(
+        self, document_id: int, sequence: int, text: str, text_start: int
+    ) -> None:
+        """Record that chunk ``sequence`` now reads ``text`` at ``text_start``.
+
+        Called when the document's text for the chunk was revised; the spans
+        of later chunks move by the change in length.
+        """
+        pass
+
+    @abstractmethod
+    def chunks(self, document_id: int) -> list[AudioChunk]:
+        """The document's audio chunks in recording order."""
+        pass
+
+    @abstractmethod
+    def read(
+        self, document_id: int, start: float = 0.0, end: float | None = None
+    ) -> np.ndarray:
+        """float32 samples between ``start`` and ``end`` seconds (or the end)."""
+        pass
+
+    @abstractmethod
+    def delete(self, document_id: int) -> None:
+        pass
+
+    def duration(self, document_id: int) -> float:
+        chunks = self.chunks(document_id)
+        return chunks[-1].end if chunks else 0.0
+
+    def close(self) -> None:
+        pass
+
+
+def to_seconds(samples: int) -> float:
+    return samples / PCM_SAMPLE_RATE
@@ -1,8 +1,15 @@
 from __future__ import annotations
 
+import asyncio
+import base64
+import binascii
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
 
 
 @dataclass(frozen=True)
@@ -12,6 +19,56 @@ class Document:
     content: str
     created: datetime
     id: int | None = None
+    # Bumped by every change to the stored document
+    version: int = 0
+
+
+@dataclass(frozen=True)
+class TextPatch:
+    """Replace ``content[start:end]`` with ``text``.
+
+    Offsets count Unicode code points, as Python string indices do.
+    """
+
+    start: int
+    end: int
+    text: str
+
+    @classmethod
+    def between(cls, old: str, new: str) -> TextPatch:
+        """The single-range patch that turns ``old`` into ``new``.
+
+        Everything between the common prefix and the common suffix is
+        replaced, which is exact for the typical edit (one insertion,
+        deletion or replacement) and still correct for any other.
+        """
+        limit = min(len(old), len(new))
+        prefix = 0
+        while prefix < limit and old[prefix] == new[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < limit - prefix and old[-1 - suffix] == new[-1 - suffix]:
+            suffix += 1
+        return cls(start=prefix, end=len(old) - suffix, text=new[prefix : len(new) - suffix])
+
+    def apply(self, content: str) -> str:
+        if not 0 <= self.start <= self.end <= len(content):
+            raise ValueError(
+                f"Patch {self.start}:{self.end} is outside the document "
+                f"(length {len(content)})"
+            )
+        return content[: self.start] + self.text + content[self.end :]
+
+
+class VersionConflict(Exception):
+    """A change was made against a version that is no longer current."""
+
+    def __init__(self, document_id: int, current_version: int):
+        super().__init__(
+            f"Document {document_id} is at version {current_version}"
+        )
+        self.document_id = document_id
+        self.current_version = current_version
 
 
 @dataclass(frozen=True)
@@ -21,9 +78,69 @@ class DocumentSummary:
     created: datetime
 
 
+@dataclass(frozen=True)
+class DocumentMetadata:
+    """Everything about a stored document except its content."""
+
+    id: int
+    user: str
+    name: str
+    created: datetime
+    version: int
+
+
+# Delimit the matched terms in a SearchHit snippet
+MATCH_START = "\x02"
+MATCH_END = "\x03"
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    """A document matching a search, with an excerpt around the match.
+
+    Matched terms in ``snippet`` are wrapped in MATCH_START and MATCH_END.
+    """
+
+    id: int
+    name: str
+    created: datetime
+    snippet: str
+
+
+@dataclass(frozen=True)
+class DocumentCursor:
+    """Position in a newest-first document listing: just past this document."""
+
+    created: datetime
+    id: int
+
+    @classmethod
+    def after(cls, summary: DocumentSummary) -> DocumentCursor:
+        return cls(created=summary.created, id=summary.id)
+
+    def encode(self) -> str:
+        """Opaque, URL-safe token for clients to send back."""
+        raw = f"{self.id}|{self.created.isoformat()}".encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> DocumentCursor:
+        """Parse a token from ``encode``; raises ValueError if it is malformed."""
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+            document_id, created = raw.split("|", 1)
+            return cls(created=datetime.fromisoformat(created), id=int(document_id))
+        except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+            raise ValueError(f"Invalid cursor: {token!r}") from e
+
+
 class DocumentRepositoryPort(ABC):
     @abstractmethod
     def save(self, document: Document) -> Document:
+        """Insert a new document, or update one still at ``document.version``.
+
+        Raises VersionConflict if the stored document has changed since.
+        """
         pass
 
     @abstractmethod
@@ -31,9 +148,160 @@ class DocumentRepositoryPort(ABC):
         pass
 
     @abstractmethod
-    def list_for_user(self, user: str) -> list[DocumentSummary]:
+    def load_metadata(self, document_id: int) -> DocumentMetadata | None:
+        """Like ``load`` without reading the content, however large it is."""
+        pass
+
+    @abstractmethod
+    def list_for_user(
+        self, user: str, limit: int | None = None, after: DocumentCursor | None = None
+    ) -> list[DocumentSummary]:
+        """The user's documents, newest first, starting just past ``after``."""
+        pass
+
+    @abstractmethod
+    def search(self, user: str, query: str, limit: int = 20) -> list[SearchHit]:
+        """The user's documents matching every word of ``query``, best first."""
+        pass
+
+    @abstractmethod
+    def append(self, document_id: int, text: str) -> int | None:
+        """Add ``text`` to the end of the content; the new version, or None if missing."""
+        pass
+
+    @abstractmethod
+    def apply_patch(
+        self, document_id: int, base_version: int, patch: TextPatch
+    ) -> int | None:
+        """Apply ``patch`` if the document is still at ``base_version``.
+
+        Returns the new version, or None if the document does not exist.
+        Raises VersionConflict if the document has changed since
+        ``base_version`` and ValueError if the patch is out of range.
+        """
+        pass
+
+    @abstractmethod
+    def load_version(self, document_id: int, version: int) -> Document | None:
+        """The document's content as it was at ``version``, or None if unknown."""
         pass
 
     @abstractmethod
     def delete(self, document_id: int) -> bool:
         pass
+
+
+class AsyncDocumentRepositoryPort(ABC):
+    """Document storage for callers on an event loop; no method blocks it."""
+
+    @abstractmethod
+    async def save(self, document: Document) -> Document:
+        pass
+
+    @abstractmethod
+    async def load(self, document_id: int) -> Document | None:
+        pass
+
+    @abstractmethod
+    async def load_metadata(self, document_id: int) -> DocumentMetadata | None:
+        pass
+
+    @abstractmethod
+    async def list_for_user(
+        self, user: str, limit: int | None = None, after: DocumentCursor | None = None
+    ) -> list[DocumentSummary]:
+        pass
+
+    @abstractmethod
+    async def search(self, user: str, query: str, limit: int = 20) -> list[SearchHit]:
+        pass
+
+    @abstractmethod
+    async def append(self, document_id: int, text: str) -> int | None:
+        pass
+
+    @abstractmethod
+    async def apply_patch(
+        self, document_id: int, base_version: int, patch: TextPatch
+    ) -> int | None:
+        pass
+
+    @abstractmethod
+    async def load_version(self, document_id: int, version: int) -> Document | None:
+        pass
+
+    @abstractmethod
+    async def delete(self, document_id: int) -> bool:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class OffloadedDocumentRepository(AsyncDocumentRepositoryPort):
+    """Runs a blocking repository on worker threads.
+
+    Reads go to a pool of ``readers`` threads. Writes go to a single
+    writer thread, in the order they were made, so writers never contend
+    for the database lock and a slow commit holds up only other writes.
+    """
+
+    def __init__(self, repository: DocumentRepositoryPort, readers: int = 4):
+        self._repository = repository
+        self._readers = ThreadPoolExecutor(
+            max_workers=readers, thread_name_prefix="document-reader"
+        )
+        self._writer = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="document-writer"
+        )
+
+    async def save(self, document: Document) -> Document:
+        return await self._run(self._writer, self._repository.save, document)
+
+    async def load(self, document_id: int) -> Document | None:
+        return await self._run(self._readers, self._repository.load, document_id)
+
+    async def load_metadata(self, document_id: int) -> DocumentMetadata | None:
+        return await self._run(
+            self._readers, self._repository.load_metadata, document_id
+        )
+
+    async def list_for_user(
+        self, user: str, limit: int | None = None, after: DocumentCursor | None = None
+    ) -> list[DocumentSummary]:
+        return await self._run(
+            self._readers, self._repository.list_for_user, user, limit, after
+        )
+
+    async def search(self, user: str, query: str, limit: int = 20) -> list[SearchHit]:
+        return await self._run(
+            self._readers, self._repository.search, user, query, limit
+        )
+
+    async def append(self, document_id: int, text: str) -> int | None:
+        return await self._run(self._writer, self._repository.append, document_id, text)
+
+    async def apply_patch(
+        self, document_id: int, base_version: int, patch: TextPatch
+    ) -> int | None:
+        return await self._run(
+            self._writer, self._repository.apply_patch, document_id, base_version, patch
+        )
+
+    async def load_version(self, document_id: int, version: int) -> Document | None:
+        return await self._run(
+            self._readers, self._repository.load_version, document_id, version
+        )
+
+    async def delete(self, document_id: int) -> bool:
+        return await self._run(self._writer, self._repository.delete, document_id)
+
+    async def _run(
+        self, executor: ThreadPoolExecutor, method: Callable[..., T], *args: object
+    ) -> T:
+        return await asyncio.get_running_loop().run_in_executor(executor, method, *args)
+
+    def close(self) -> None:
+        # Let queued writes finish so nothing acknowledged is lost
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, replace
+
+from great_dictator.domain.audio import AudioChunk, AudioStorePort
+from great_dictator.domain.document import (
+    DocumentRepositoryPort,
+    TextPatch,
+    VersionConflict,
+)
+from great_dictator.domain.transcript import locate_draft
+from great_dictator.domain.transcription import TranscriberPort
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# Saving the merged text is retried this often when the document keeps
+# changing underneath it
+_MAX_SAVE_ATTEMPTS = 5
+
+
+@dataclass(frozen=True)
+class RetranscriptionJob:
+    """Re-transcription of a document's stored audio, chunk by chunk."""
+
+    id: int
+    document_id: int
+    status: str
+    chunks_done: int = 0
+    chunks_total: int = 0
+    error: str | None = None
+
+
+class JobQueuePort(ABC):
+    """Durable queue of re-transcription jobs, oldest first."""
+
+    @abstractmethod
+    def enqueue(self, document_id: int) -> RetranscriptionJob:
+        """Queue the document; an unfinished job for it is returned instead."""
+        pass
+
+    @abstractmethod
+    def get(self, job_id: int) -> RetranscriptionJob | None:
+        pass
+
+    @abstractmethod
+    def claim(self) -> RetranscriptionJob | None:
+        """Mark the oldest queued job running and return it."""
+        pass
+
+    @abstractmethod
+    def record(self, job_id: int, sequence: int, text: str, chunks_total: int) -> None:
+        """Keep a chunk's new transcript and count it as done."""
+        pass
+
+    @abstractmethod
+    def results(self, job_id: int) -> dict[int, str]:
+        """New transcripts recorded so far, by chunk sequence."""
+        pass
+
+    @abstractmethod
+    def finish(self, job_id: int, error: str | None = None) -> None:
+        """Mark the job done, or failed with ``error``, and drop its results."""
+        pass
+
+    @abstractmethod
+    def requeue_running(self) -> int:
+        """Return jobs left running by a stopped worker to the queue."""
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+def merge_transcripts(
+    content: str, chunks: Iterable[AudioChunk], texts: dict[int, str]
+) -> tuple[str, list[AudioChunk]]:
+    """Replace each chunk's draft text in ``content`` with its new transcript.
+
+    Drafts are found with ``locate_draft``; one edited by hand is left
+    alone. Chunks are merged last to first, so each replacement leaves the
+    earlier offsets intact. Returns the merged content and the replaced
+    chunks in order, carrying their new text and where it now is.
+    """
+    limit = len(content)
+    merged: list[tuple[AudioChunk, int, str]] = []
+    for chunk in sorted(chunks, key=lambda c: c.sequence, reverse=True):
+        text = texts.get(chunk.sequence, "").strip()
+        if not chunk.text or not text:
+            continue
+        start = locate_draft(content, chunk.text, chunk.text_start, limit)
+        if start < 0:
+            continue
+        content = content[:start] + text + content[start + len(chunk.text):]
+        merged.append((chunk, start, text))
+        limit = start
+    # Each replacement moved the ones after it by its change in length
+    placed = []
+    shift = 0
+    for chunk, start, text in reversed(merged):
+        placed.append(
+            replace(
+                chunk,
+                text=text,
+                text_start=start + shift,
+                text_end=start + shift + len(text),
+            )
+        )
+        shift += len(text) - len(chunk.text)
+    return content, placed
+
+
+class RetranscriptionWorker:
+    """Drains the job queue through a transcriber, in the background.
+
+    ``cpu_budget`` is the share of wall time spent transcribing: after
+    each chunk the worker sleeps long enough to stay within it.
+    ``should_wait``, polled between chunks, lets live traffic hold the
+    worker back altogether.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueuePort,
+        audio_store: AudioStorePort,
+        documents: DocumentRepositoryPort,
+        transcriber: TranscriberPort,
+        cpu_budget: float = 1.0,
+        poll_interval_s: float = 5.0,
+        should_wait: Callable[[], bool] = lambda: False,
+    ):
+        if not 0 < cpu_budget <= 1:
+            raise ValueError("cpu_budget must be in (0, 1]")
+        self._queue = queue
+        self._audio = audio_store
+        self._documents = documents
+        self._transcriber = transcriber
+        self._cpu_budget = cpu_budget
+        self._poll_interval_s = poll_interval_s
+        self._should_wait = should_wait
+        self._stop = threading.Event()
+
+    def run(self) -> None:
+        """Process jobs until ``stop()``; jobs interrupted last time go first."""
+        self._queue.requeue_running()
+        while not self._stop.is_set():
+            if not self.run_once():
+                self._stop.wait(self._poll_interval_s)
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run_once(self) -> bool:
+        """Process the oldest queued job, if any; False when there was none."""
+        job = self._queue.claim()
+        if job is None:
+            return False
+        try:
+            if self._transcribe(job):
+                self._apply(job)
+                self._queue.finish(job.id)
+        except Exception as e:
+            self._queue.finish(job.id, error=str(e))
+        return True
+
+    def _transcribe(self, job: RetranscriptionJob) -> bool:
+        """Transcribe the chunks not already done; False if stopped first."""
+        chunks = self._audio.chunks(job.document_id)
+        done = self._queue.results(job.id)
+        for chunk in chunks:
+            if chunk.sequence in done:
+                continue  # Transcribed before a restart
+            while self._should_wait() and not self._stop.is_set():
+                self._stop.wait(self._poll_interval_s)
+            if self._stop.is_set():
+                return False  # Left running; requeued when a worker starts
+            samples = self._audio.read(job.document_id, chunk.start, chunk.end)
+            started = time.perf_counter()
+            result = self._transcriber.transcribe_pcm(samples)
+            elapsed = time.perf_counter() - started
+            self._queue.record(job.id, chunk.sequence, result.text, len(chunks))
+            self._stop.wait(elapsed * (1 - self._cpu_budget) / self._cpu_budget)
+        return True
+
+    def _apply(self, job: RetranscriptionJob) -> None:
+        chunks = self._audio.chunks(job.document_id)
+        texts = self._queue.results(job.id)
+        attempts = 0
+        while True:
+            doc = self._documents.load(job.document_id)
+            if doc is None:
+                raise LookupError("Document was deleted")
+            merged, placed = merge_transcripts(doc.content, chunks, texts)
+            try:
+                if merged != doc.content:
+                    self._documents.apply_patch(
+                        job.document_id,
+                        doc.version,
+                        TextPatch.between(doc.content, merged),
+                    )
+            except VersionConflict:
+                # Edited meanwhile; merge into the new text
+                attempts += 1
+                if attempts == _MAX_SAVE_ATTEMPTS:
+                    raise
+                continue
+            # The chunks follow their new text, so playback and later jobs
+            # find it where it now is
+            for chunk in placed:
+                self._audio.update_text(
+                    chunk.document_id, chunk.sequence, chunk.text, chunk.text_start
+                )
+            return
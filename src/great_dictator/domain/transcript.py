@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable
+
+
+@dataclass(frozen=True)
+class PartialTranscript:
+    committed: str
+    tentative: str
+
+    @property
+    def text(self) -> str:
+        return " ".join(part for part in (self.committed, self.tentative) if part)
+
+
+class LocalAgreement:
+    """Stabilises interim transcripts of a growing audio buffer.
+
+    Each new hypothesis is compared with the previous one; the words they
+    agree on from the start (LocalAgreement-2) are committed and never
+    retracted, the rest is shown as tentative.
+    """
+
+    def __init__(self) -> None:
+        self._committed: list[str] = []
+        self._previous: list[str] = []
+
+    def update(self, hypothesis: str) -> PartialTranscript:
+        words = hypothesis.split()
+        agreed = 0
+        for new, old in zip(words, self._previous):
+            if new != old:
+                break
+            agreed += 1
+        if agreed > len(self._committed):
+            self._committed = words[:agreed]
+        self._previous = words
+        return PartialTranscript(
+            committed=" ".join(self._committed),
+            tentative=" ".join(words[len(self._committed):]),
+        )
+
+    def reset(self) -> None:
+        self._committed = []
+        self._previous = []
+
+
+def _normalise(word: str) -> str:
+    return "".join(ch for ch in word.lower() if ch.isalnum())
+
+
+class Stitcher:
+    """Joins transcripts of consecutive, possibly overlapping audio chunks.
+
+    Where a chunk starts by repeating the words that ended the previous
+    one (the audio overlapped), the repetition is dropped. Words are
+    compared ignoring case and punctuation; the longest overlap of up to
+    ``max_overlap_words`` wins.
+    """
+
+    def __init__(self, max_overlap_words: int = 12) -> None:
+        self._max_overlap_words = max_overlap_words
+        self._words: list[str] = []
+
+    def add(self, text: str) -> str:
+        """Append a chunk's transcript; returns the words it added."""
+        new = text.split()
+        limit = min(self._max_overlap_words, len(self._words), len(new))
+        tail = [_normalise(word) for word in self._words[len(self._words) - limit:]]
+        head = [_normalise(word) for word in new[:limit]]
+        overlap = next(
+            (k for k in range(limit, 0, -1) if tail[limit - k:] == head[:k]), 0
+        )
+        self._words.extend(new[overlap:])
+        return " ".join(new[overlap:])
+
+    @property
+    def text(self) -> str:
+        return " ".join(self._words)
+
+
+def stitch(texts: Iterable[str], max_overlap_words: int = 12) -> str:
+    """Join chunk transcripts in order, dropping overlaps (see ``Stitcher``)."""
+    stitcher = Stitcher(max_overlap_words)
+    for text in texts:
+        stitcher.add(text)
+    return stitcher.text
+
+
+def locate_draft(content: str, draft: str, start: int, limit: int | None = None) -> int:
+    """Where ``draft``, once put at ``start``, is in ``content`` now; -1 if gone.
+
+    It is expected where it was put. If edits have moved it, the nearest
+    copy ending before ``limit`` is taken; if it is nowhere, it was edited
+    by hand.
+    """
+    limit = len(content) if limit is None else limit
+    end = start + len(draft)
+    if end <= limit and content[start:end] == draft:
+        return start
+    return content.rfind(draft, 0, limit)
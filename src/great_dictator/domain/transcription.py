@@ -1,6 +1,23 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+import wave
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Generator, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from io import BytesIO
+from typing import Any, BinaryIO, Callable, Union
+
+import numpy as np
+
+# Whisper's native input: mono float32 samples in [-1, 1] at this rate
+PCM_SAMPLE_RATE = 16000
+
+# Either a seekable encoded audio file or decoded PCM samples
+AudioInput = Union[BinaryIO, np.ndarray]
 
 
 @dataclass(frozen=True)
@@ -9,15 +26,253 @@ class TranscriptionResult:
     language: str
 
 
+@dataclass(frozen=True)
+class TranscriptionSegment:
+    """A stretch of decoded text; times are seconds from the start of the audio."""
+
+    text: str
+    start: float
+    end: float
+
+
 class TranscriberPort(ABC):
     @abstractmethod
-    def transcribe(self, audio: BytesIO) -> TranscriptionResult:
+    def transcribe(self, audio: BinaryIO) -> TranscriptionResult:
         pass
 
+    def transcribe_batch(self, audios: list[AudioInput]) -> list[TranscriptionResult]:
+        """Transcribe several clips; adapters override this to batch inference."""
+        return [
+            self.transcribe_pcm(audio) if isinstance(audio, np.ndarray) else self.transcribe(audio)
+            for audio in audios
+        ]
+
+    def transcribe_with_prompt(self, audio: BinaryIO, prompt: str) -> TranscriptionResult:
+        """Transcribe with preceding text as context; adapters may ignore the prompt."""
+        return self.transcribe(audio)
+
+    def transcribe_segments(
+        self, audio: AudioInput, prompt: str | None = None
+    ) -> Iterator[TranscriptionSegment]:
+        """Yield segments as they are decoded.
+
+        The default yields the whole transcript as one segment once it is
+        done; adapters whose model decodes lazily override this.
+        """
+        if isinstance(audio, np.ndarray):
+            result = self.transcribe_pcm(audio, prompt)
+        elif prompt:
+            result = self.transcribe_with_prompt(audio, prompt)
+        else:
+            result = self.transcribe(audio)
+        if result.text.strip():
+            yield TranscriptionSegment(text=result.text.strip(), start=0.0, end=0.0)
+
+    def transcribe_pcm(
+        self, samples: np.ndarray, prompt: str | None = None
+    ) -> TranscriptionResult:
+        """Transcribe 16 kHz mono float32 samples.
+
+        The default encodes the samples as WAV for ``transcribe``; adapters
+        whose model takes samples directly override this to skip the
+        encode/decode round trip.
+        """
+        pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2")
+        wav_audio = BytesIO()
+        with wave.open(wav_audio, "wb") as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(PCM_SAMPLE_RATE)
+            wav_file.writeframes(pcm.tobytes())
+        wav_audio.seek(0)
+        if prompt:
+            return self.transcribe_with_prompt(wav_audio, prompt)
+        return self.transcribe(wav_audio)
+
+
+@dataclass(frozen=True)
+class TranscriptionTimings:
+    """Seconds a job waited for a worker, then spent transcribing."""
+
+    queue_wait_s: float
+    inference_s: float
+
+
+class TranscriptionUnavailable(RuntimeError):
+    """Raised when the transcription queue is full and a job is refused."""
+
+
+class TranscriptionTimeout(TimeoutError):
+    """Raised when a transcription job does not finish within its timeout."""
+
 
 class TranscriptionService:
-    def __init__(self, transcriber: TranscriberPort):
+    """Runs transcriptions on a bounded pool of worker threads.
+
+    The synchronous ``transcribe`` call is kept for warmup and scripts;
+    request handlers should await ``transcribe_async`` so the event loop
+    stays free while the model is busy. At most ``max_workers`` jobs run
+    at once and at most ``max_queue`` more wait for a worker; anything
+    beyond that is refused with ``TranscriptionUnavailable``.
+    """
+
+    def __init__(
+        self,
+        transcriber: TranscriberPort,
+        max_workers: int = 1,
+        max_queue: int = 8,
+        timeout: float | None = None,
+    ):
         self._transcriber = transcriber
+        self._max_jobs = max_workers + max_queue
+        self._timeout = timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="transcription"
+        )
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+
+    @property
+    def pending_jobs(self) -> int:
+        """Number of jobs currently running or waiting for a worker."""
+        return self._pending
 
-    def transcribe(self, audio: BytesIO) -> TranscriptionResult:
+    def transcribe(self, audio: BinaryIO) -> TranscriptionResult:
         return self._transcriber.transcribe(audio)
+
+    async def transcribe_async(
+        self, audio: BinaryIO, prompt: str | None = None
+    ) -> TranscriptionResult:
+        """Transcribe on a worker thread without blocking the event loop.
+
+        Cancelling the awaiting task (e.g. because the client went away)
+        drops the job if it has not started yet; a job that is already
+        running finishes in the background and its result is discarded.
+        """
+        if prompt:
+            return await self._run(self._transcriber.transcribe_with_prompt, audio, prompt)
+        return await self._run(self._transcriber.transcribe, audio)
+
+    async def transcribe_pcm_async(
+        self, samples: np.ndarray, prompt: str | None = None
+    ) -> TranscriptionResult:
+        """Like ``transcribe_async`` for 16 kHz mono float32 samples."""
+        return await self._run(self._transcriber.transcribe_pcm, samples, prompt)
+
+    async def transcribe_timed_async(
+        self, audio: AudioInput
+    ) -> tuple[TranscriptionResult, TranscriptionTimings]:
+        """Like ``transcribe_async`` (or the PCM variant), also reporting timings."""
+        method = (
+            self._transcriber.transcribe_pcm
+            if isinstance(audio, np.ndarray)
+            else self._transcriber.transcribe
+        )
+        queued_at = time.perf_counter()
+        started_at = finished_at = queued_at
+
+        def timed() -> TranscriptionResult:
+            nonlocal started_at, finished_at
+            started_at = time.perf_counter()
+            try:
+                return method(audio)
+            finally:
+                finished_at = time.perf_counter()
+
+        result = await self._run(timed)
+        return result, TranscriptionTimings(
+            queue_wait_s=started_at - queued_at, inference_s=finished_at - started_at
+        )
+
+    def transcribe_stream(
+        self, audio: AudioInput, prompt: str | None = None
+    ) -> AsyncIterator[TranscriptionSegment]:
+        """Transcribe on a worker thread, yielding segments as they are decoded.
+
+        The job is queued (or refused with ``TranscriptionUnavailable``)
+        when this is called, so callers can report a full queue before
+        they start a streaming response. The timeout covers the whole
+        transcription. Closing the iterator early stops decoding.
+        """
+        loop = asyncio.get_running_loop()
+        segments: asyncio.Queue[TranscriptionSegment | None] = asyncio.Queue()
+        stop = threading.Event()
+
+        def deliver(segment: TranscriptionSegment | None) -> None:
+            try:
+                loop.call_soon_threadsafe(segments.put_nowait, segment)
+            except RuntimeError:
+                stop.set()  # The event loop has gone away
+
+        def produce() -> None:
+            decoding = self._transcriber.transcribe_segments(audio, prompt)
+            try:
+                for segment in decoding:
+                    if stop.is_set():
+                        break
+                    deliver(segment)
+            finally:
+                if isinstance(decoding, Generator):
+                    decoding.close()  # Release the model the adapter holds
+
+        job = self._submit(produce)
+        job.add_done_callback(lambda _: deliver(None))
+        return self._stream(job, segments, stop)
+
+    async def _stream(
+        self,
+        job: Future[None],
+        segments: asyncio.Queue[TranscriptionSegment | None],
+        stop: threading.Event,
+    ) -> AsyncIterator[TranscriptionSegment]:
+        loop = asyncio.get_running_loop()
+        deadline = None if self._timeout is None else loop.time() + self._timeout
+        try:
+            while True:
+                remaining = None if deadline is None else max(deadline - loop.time(), 0)
+                try:
+                    segment = await asyncio.wait_for(segments.get(), remaining)
+                except asyncio.TimeoutError:
+                    raise TranscriptionTimeout(
+                        f"Transcription did not finish within {self._timeout}s"
+                    ) from None
+                if segment is None:
+                    job.result()  # Raise the transcriber's error, if any
+                    return
+                yield segment
+        finally:
+            stop.set()
+            job.cancel()
+
+    def _submit(self, method: Callable[..., Any], *args: Any) -> Future[Any]:
+        """Queue a job on the worker pool, or refuse it if the queue is full."""
+        with self._pending_lock:
+            if self._pending >= self._max_jobs:
+                raise TranscriptionUnavailable("Transcription queue is full")
+            self._pending += 1
+        try:
+            future = self._executor.submit(method, *args)
+        except BaseException:
+            self._job_finished()
+            raise
+        future.add_done_callback(lambda _: self._job_finished())
+        return future
+
+    async def _run(
+        self, method: Callable[..., TranscriptionResult], *args: Any
+    ) -> TranscriptionResult:
+        future: Future[TranscriptionResult] = self._submit(method, *args)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self._timeout)
+        except asyncio.TimeoutError:
+            raise TranscriptionTimeout(
+                f"Transcription did not finish within {self._timeout}s"
+            ) from None
+
+    def _job_finished(self) -> None:
+        with self._pending_lock:
+            self._pending -= 1
+
+    def close(self) -> None:
+        """Stop accepting jobs and release the worker threads."""
+        self._executor.shutdown(wait=False)
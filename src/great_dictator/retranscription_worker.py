@@ -0,0 +1,73 @@
+"""Background re-transcription worker, run beside the web server:
+
+    python -m great_dictator.retranscription_worker
+
+It drains the job queue in the documents database through its own model,
+at low OS priority and within a CPU budget, and holds back while the host
+is busy so live dictation keeps the CPU it needs.
+"""
+import os
+import signal
+from pathlib import Path
+from typing import Any
+
+from dotenv import load_dotenv
+
+from great_dictator.adapters.outbound.pack_audio_store import PackAudioStore
+from great_dictator.adapters.outbound.sqlite_document_repository import (
+    SqliteDocumentRepository,
+)
+from great_dictator.adapters.outbound.sqlite_job_queue import SqliteJobQueue
+from great_dictator.adapters.outbound.whisper_transcriber import WhisperTranscriber
+from great_dictator.domain.retranscription import RetranscriptionWorker
+
+
+def main() -> None:
+    load_dotenv()
+
+    db_path = os.getenv("DATABASE_PATH", "data/documents.db")
+    audio_store_dir = os.getenv("AUDIO_STORE_DIR", str(Path(db_path).parent / "audio"))
+
+    # Below live dictation in the scheduler, and never more than a share of
+    # the wall clock even when the host is idle
+    os.nice(int(os.getenv("RETRANSCRIBE_NICE", "10")))
+    cpu_budget = float(os.getenv("RETRANSCRIBE_CPU_BUDGET", "0.5"))
+    # Wait while the 1-minute load per core is above this (0 = never wait)
+    max_load = float(os.getenv("RETRANSCRIBE_MAX_LOAD", "0.75"))
+    cores = os.cpu_count() or 1
+
+    transcriber = WhisperTranscriber(
+        model_size=os.getenv("RETRANSCRIBE_MODEL", "large-v3"),
+        device="cpu",
+        compute_type="int8",
+        cpu_threads=int(os.getenv("RETRANSCRIBE_CPU_THREADS", "2")),
+    )
+    queue = SqliteJobQueue(db_path)
+    audio_store = PackAudioStore(audio_store_dir)
+    documents = SqliteDocumentRepository(db_path)
+    worker = RetranscriptionWorker(
+        queue,
+        audio_store,
+        documents,
+        transcriber,
+        cpu_budget=cpu_budget,
+        poll_interval_s=float(os.getenv("RETRANSCRIBE_POLL_S", "5")),
+        should_wait=lambda: bool(max_load) and os.getloadavg()[0] / cores > max_load,
+    )
+
+    def stop(signum: int, frame: Any) -> None:
+        worker.stop()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    try:
+        worker.run()
+    finally:
+        transcriber.close()
+        documents.close()
+        audio_store.close()
+        queue.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -30,6 +30,10 @@ class DocumentBuilder:
         self._user = user
         return self
 
+    def with_created(self, created: datetime) -> "DocumentBuilder":
+        self._created = created
+        return self
+
     def with_id(self, id: int) -> "DocumentBuilder":
         self._id = id
         return self
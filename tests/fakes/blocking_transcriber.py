@@ -0,0 +1,17 @@
+import threading
+from io import BytesIO
+
+from great_dictator.domain.transcription import TranscriberPort, TranscriptionResult
+
+
+class BlockingTranscriber(TranscriberPort):
+    """Holds every call until ``release`` is set."""
+
+    def __init__(self) -> None:
+        self.release = threading.Event()
+        self.calls = 0
+
+    def transcribe(self, audio: BytesIO) -> TranscriptionResult:
+        self.calls += 1
+        self.release.wait(timeout=5)
+        return TranscriptionResult(text="done", language="en")
@@ -1,42 +1,121 @@
 from dataclasses import replace
 
 from great_dictator.domain.document import (
+    MATCH_END,
+    MATCH_START,
     Document,
+    DocumentCursor,
+    DocumentMetadata,
     DocumentRepositoryPort,
     DocumentSummary,
+    SearchHit,
+    TextPatch,
+    VersionConflict,
 )
 
 
 class FakeDocumentRepository(DocumentRepositoryPort):
     def __init__(self) -> None:
         self._documents: dict[int, Document] = {}
+        self._history: dict[int, list[Document]] = {}
         self._next_id = 1
 
+    def _store(self, document: Document) -> None:
+        self._documents[document.id] = document  # type: ignore[index]
+        self._history.setdefault(document.id, []).append(document)  # type: ignore[arg-type]
+
     def save(self, document: Document) -> Document:
         if document.id is not None:
             # Update existing document
-            self._documents[document.id] = document
+            previous = self._documents.get(document.id)
+            if previous is not None:
+                if previous.version != document.version:
+                    raise VersionConflict(document.id, previous.version)
+                document = replace(document, version=previous.version + 1)
+            self._store(document)
             return document
         else:
             # Create new document
             new_id = self._next_id
             self._next_id += 1
-            saved = replace(document, id=new_id)
-            self._documents[new_id] = saved
+            saved = replace(document, id=new_id, version=0)
+            self._store(saved)
             return saved
 
     def load(self, document_id: int) -> Document | None:
         return self._documents.get(document_id)
 
-    def list_for_user(self, user: str) -> list[DocumentSummary]:
-        return [
-            DocumentSummary(id=doc.id, name=doc.name, created=doc.created)  # type: ignore[arg-type]
-            for doc in self._documents.values()
-            if doc.user == user
-        ]
+    def load_metadata(self, document_id: int) -> DocumentMetadata | None:
+        doc = self._documents.get(document_id)
+        if doc is None:
+            return None
+        return DocumentMetadata(
+            id=document_id,
+            user=doc.user,
+            name=doc.name,
+            created=doc.created,
+            version=doc.version,
+        )
+
+    def list_for_user(
+        self, user: str, limit: int | None = None, after: DocumentCursor | None = None
+    ) -> list[DocumentSummary]:
+        summaries = sorted(
+            (
+                DocumentSummary(id=doc.id, name=doc.name, created=doc.created)  # type: ignore[arg-type]
+                for doc in self._documents.values()
+                if doc.user == user
+            ),
+            key=lambda s: (s.created, s.id),
+            reverse=True,
+        )
+        if after is not None:
+            summaries = [s for s in summaries if (s.created, s.id) < (after.created, after.id)]
+        return summaries if limit is None else summaries[:limit]
+
+    def search(self, user: str, query: str, limit: int = 20) -> list[SearchHit]:
+        words = query.lower().split()
+        hits = []
+        for doc in self._documents.values():
+            text = f"{doc.name} {doc.content}".lower()
+            if doc.user == user and words and all(word in text for word in words):
+                snippet = doc.content
+                for word in set(words):
+                    snippet = snippet.replace(word, f"{MATCH_START}{word}{MATCH_END}")
+                hits.append(
+                    SearchHit(id=doc.id, name=doc.name, created=doc.created, snippet=snippet)  # type: ignore[arg-type]
+                )
+        return hits[:limit]
+
+    def append(self, document_id: int, text: str) -> int | None:
+        doc = self._documents.get(document_id)
+        if doc is None:
+            return None
+        self._store(replace(doc, content=doc.content + text, version=doc.version + 1))
+        return doc.version + 1
+
+    def apply_patch(
+        self, document_id: int, base_version: int, patch: TextPatch
+    ) -> int | None:
+        doc = self._documents.get(document_id)
+        if doc is None:
+            return None
+        if doc.version != base_version:
+            raise VersionConflict(document_id, doc.version)
+        self._store(
+            replace(doc, content=patch.apply(doc.content), version=doc.version + 1)
+        )
+        return doc.version + 1
+
+    def load_version(self, document_id: int, version: int) -> Document | None:
+        for doc in self._history.get(document_id, []):
+            if doc.version == version:
+                return doc
+        return None
 
     def delete(self, document_id: int) -> bool:
         if document_id in self._documents:
             del self._documents[document_id]
+            del self._history[document_id]
             return True
         return False
@@ -0,0 +1,48 @@
+"""Opus-encoded test audio, produced with PyAV."""
+import io
+from typing import List
+
+import av
+import numpy as np
+
+OPUS_RATE = 48000
+FRAME_SAMPLES = 960  # 20ms at 48kHz
+
+
+def _tone(seconds: float) -> np.ndarray:
+    t = np.arange(int(OPUS_RATE * seconds)) / OPUS_RATE
+    return (np.sin(2 * np.pi * 440 * t) * 10000).astype(np.int16)
+
+
+def _frames(seconds: float) -> List[av.AudioFrame]:
+    pcm = _tone(seconds)
+    frames = []
+    for start in range(0, len(pcm), FRAME_SAMPLES):
+        frame = av.AudioFrame.from_ndarray(
+            pcm[None, start:start + FRAME_SAMPLES], format="s16", layout="mono"
+        )
+        frame.sample_rate = OPUS_RATE
+        frames.append(frame)
+    return frames
+
+
+def opus_container(container_format: str, seconds: float) -> bytes:
+    """A 440 Hz tone as a complete WebM or Ogg Opus file."""
+    buffer = io.BytesIO()
+    with av.open(buffer, "w", format=container_format) as container:
+        stream = container.add_stream("libopus", rate=OPUS_RATE)
+        stream.layout = "mono"
+        for frame in _frames(seconds):
+            container.mux(stream.encode(frame))
+        container.mux(stream.encode(None))
+    return buffer.getvalue()
+
+
+def opus_packets(seconds: float) -> List[bytes]:
+    """A 440 Hz tone as bare Opus packets."""
+    encoder = av.CodecContext.create("libopus", "w")
+    encoder.sample_rate = OPUS_RATE
+    encoder.layout = "mono"
+    encoder.format = "s16"
+    packets = [bytes(p) for frame in _frames(seconds) for p in encoder.encode(frame)]
+    return packets + [bytes(p) for p in encoder.encode(None)]
@@ -1,9 +1,12 @@
+import threading
+
 import pytest
 from hamcrest import assert_that, contains_string, equal_to
 from starlette.testclient import TestClient
 
 from great_dictator.adapters.inbound.fastapi_app import create_app
 from great_dictator.domain.transcription import TranscriptionService
+from tests.fakes.blocking_transcriber import BlockingTranscriber
 
 
 @pytest.fixture
@@ -36,46 +39,108 @@ def test_transcribe_returns_text(client, fake_transcriber):
     assert fake_transcriber.last_audio is not None
 
 
-def test_transcribe_htmx_returns_editor_fragment(client, fake_transcriber):
-    """Transcribe with htmx header returns editor fragment with transcription."""
-    audio_content = b"fake audio data"
-    files = {"audio": ("test.webm", audio_content, "audio/webm")}
-    # Add current content to be preserved/appended to
-    data = {"existingContent": "Previous text. "}
+def test_transcribe_without_a_document_returns_only_the_text(client):
+    files = {"audio": ("test.webm", b"fake audio data", "audio/webm")}
+
+    response = client.post("/transcribe", files=files)
+
+    assert_that(response.text, equal_to("fake transcription"))
+    assert_that("X-Document-Version" in response.headers, equal_to(False))
+
+
+def test_transcribe_returns_503_when_queue_is_full():
+    """A saturated transcription queue is reported as 503, not queued forever."""
+    transcriber = BlockingTranscriber()
+    service = TranscriptionService(transcriber, max_workers=1, max_queue=0)
+    client = TestClient(create_app(service))
+    files = {"audio": ("test.webm", b"fake audio data", "audio/webm")}
+    first = threading.Thread(target=lambda: client.post("/transcribe", files=files))
+    first.start()
+    while service.pending_jobs == 0:
+        pass
+
+    response = client.post("/transcribe", files=files)
+
+    transcriber.release.set()
+    first.join()
+    assert_that(response.status_code, equal_to(503))
+
+
+def test_transcribe_refuses_uploads_over_the_limit(fake_transcriber, monkeypatch):
+    monkeypatch.setenv("MAX_UPLOAD_MB", "0.001")
+    client = TestClient(create_app(TranscriptionService(fake_transcriber)))
+    files = {"audio": ("test.webm", b"x" * 2000, "audio/webm")}
+
+    response = client.post("/transcribe", files=files)
+
+    assert_that(response.status_code, equal_to(413))
+
+
+def test_transcribe_stream_transcribes_raw_webm_body(client):
+    from tests.fakes.opus_audio import opus_container
 
     response = client.post(
-        "/transcribe",
-        files=files,
-        data=data,
-        headers={"HX-Request": "true"},
+        "/transcribe/stream",
+        content=opus_container("webm", seconds=1.0),
+        headers={"Content-Type": "audio/webm"},
     )
 
     assert_that(response.status_code, equal_to(200))
-    # Should return editor fragment with combined content
-    assert_that(response.text, contains_string("Previous text."))
     assert_that(response.text, contains_string("fake transcription"))
-    assert_that(response.text, contains_string('id="transcription"'))
 
 
-def test_transcribe_htmx_preserves_document_name(client, fake_transcriber):
-    """Transcribe with htmx preserves document name and id in returned fragment."""
-    audio_content = b"fake audio data"
-    files = {"audio": ("test.webm", audio_content, "audio/webm")}
-    data = {
-        "existingContent": "Some text. ",
-        "documentName": "My Meeting Notes",
-        "documentId": "42",
-    }
+def test_transcribe_stream_accepts_l16(client):
+    response = client.post(
+        "/transcribe/stream",
+        content=b"\x10\x27" * 16000,
+        headers={"Content-Type": "audio/L16; rate=16000; channels=1"},
+    )
+
+    assert_that(response.status_code, equal_to(200))
+    assert_that(response.text, contains_string("fake transcription"))
+
+
+def test_transcribe_stream_rejects_unsupported_audio(client):
+    response = client.post(
+        "/transcribe/stream", content=b"ID3", headers={"Content-Type": "audio/mpeg"}
+    )
+
+    assert_that(response.status_code, equal_to(415))
+
+
+def test_transcribe_stream_refuses_chunked_uploads_over_the_limit(
+    fake_transcriber, monkeypatch
+):
+    monkeypatch.setenv("MAX_UPLOAD_MB", "0.01")
+    client = TestClient(create_app(TranscriptionService(fake_transcriber)))
+
+    def body():
+        for _ in range(10):
+            yield b"\x00\x00" * 1600
+
+    response = client.post(
+        "/transcribe/stream", content=body(), headers={"Content-Type": "audio/L16"}
+    )
+
+    assert_that(response.status_code, equal_to(413))
+
+
+def test_transcribe_streams_segments_as_server_sent_events(client):
+    files = {"audio": ("test.webm", b"fake audio data", "audio/webm")}
 
     response = client.post(
         "/transcribe",
         files=files,
-        data=data,
-        headers={"HX-Request": "true"},
+        headers={"Accept": "text/event-stream"},
     )
 
     assert_that(response.status_code, equal_to(200))
-    # Document name should be preserved in the input field
-    assert_that(response.text, contains_string('value="My Meeting Notes"'))
-    # Document ID should be preserved in the hidden field
-    assert_that(response.text, contains_string('value="42"'))
+    assert_that(response.headers["content-type"], contains_string("text/event-stream"))
+    events = [block for block in response.text.split("\n\n") if block]
+    assert_that(events[0], contains_string("event: segment"))
+    assert_that(events[0], contains_string("fake transcription"))
+    assert_that(events[-1], contains_string("event: done"))
+    assert_that(
+        events[-1],
+        equal_to('event: done\ndata: {"text": "fake transcription", "version": null}'),
+    )
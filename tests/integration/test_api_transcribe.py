@@ -0,0 +1,127 @@
+"""Tests for the stateless JSON transcription endpoint."""
+import threading
+import wave
+from io import BytesIO
+
+import numpy as np
+import pytest
+from hamcrest import assert_that, equal_to, greater_than_or_equal_to, instance_of
+from starlette.testclient import TestClient
+
+from great_dictator.adapters.inbound.fastapi_app import create_app
+from great_dictator.domain.transcription import (
+    TranscriberPort,
+    TranscriptionResult,
+    TranscriptionService,
+)
+from tests.fakes.blocking_transcriber import BlockingTranscriber
+
+
+class RecordingTranscriber(TranscriberPort):
+    def __init__(self) -> None:
+        self.audio: object = None
+
+    def transcribe(self, audio) -> TranscriptionResult:
+        self.audio = audio
+        return TranscriptionResult(text=" hello ", language="en")
+
+    def transcribe_pcm(self, samples, prompt=None) -> TranscriptionResult:
+        self.audio = samples
+        return TranscriptionResult(text=" hello ", language="en")
+
+
+def make_wav(rate: int = 16000, channels: int = 1, seconds: float = 0.5) -> bytes:
+    buffer = BytesIO()
+    with wave.open(buffer, "wb") as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(rate)
+        wav_file.writeframes(b"\x00\x40" * int(rate * channels * seconds))
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def transcriber() -> RecordingTranscriber:
+    return RecordingTranscriber()
+
+
+@pytest.fixture
+def client(transcriber):
+    return TestClient(create_app(TranscriptionService(transcriber)))
+
+
+def test_native_wav_is_transcribed_as_samples(client, transcriber):
+    response = client.post(
+        "/api/transcribe", content=make_wav(), headers={"Content-Type": "audio/wav"}
+    )
+
+    assert_that(response.status_code, equal_to(200))
+    body = response.json()
+    assert_that(body["text"], equal_to("hello"))
+    assert_that(body["language"], equal_to("en"))
+    assert_that(body["duration"], equal_to(0.5))
+    assert_that(body["queue_wait"], greater_than_or_equal_to(0))
+    assert_that(body["inference"], greater_than_or_equal_to(0))
+    assert_that(transcriber.audio, instance_of(np.ndarray))
+    assert_that(float(transcriber.audio[0]), equal_to(0.5))
+
+
+def test_other_wavs_go_through_the_decoder(client, transcriber):
+    response = client.post(
+        "/api/transcribe",
+        content=make_wav(rate=44100, channels=2),
+        headers={"Content-Type": "audio/wav"},
+    )
+
+    assert_that(response.status_code, equal_to(200))
+    assert_that(response.json()["duration"], equal_to(0.5))
+    assert_that(transcriber.audio, instance_of(BytesIO))
+
+
+def test_l16_body_is_transcribed(client, transcriber):
+    response = client.post(
+        "/api/transcribe",
+        content=b"\x40\x00" * 8000,
+        headers={"Content-Type": "audio/L16;rate=16000"},
+    )
+
+    assert_that(response.status_code, equal_to(200))
+    assert_that(response.json()["duration"], equal_to(0.5))
+    assert_that(float(transcriber.audio[0]), equal_to(0.5))
+
+
+@pytest.mark.parametrize(
+    "content, content_type",
+    [
+        (b"not a wav file at all", "audio/wav"),
+        (make_wav(), "audio/webm"),
+        (make_wav(seconds=0), "audio/wav"),
+    ],
+)
+def test_invalid_audio_is_rejected(client, content, content_type):
+    response = client.post(
+        "/api/transcribe", content=content, headers={"Content-Type": content_type}
+    )
+
+    assert_that(response.status_code, equal_to(400))
+
+
+def test_saturated_queue_returns_503():
+    transcriber = BlockingTranscriber()
+    service = TranscriptionService(transcriber, max_workers=1, max_queue=0)
+    client = TestClient(create_app(service))
+    wav = make_wav(rate=8000)  # Not 16 kHz, so it reaches transcribe()
+    headers = {"Content-Type": "audio/wav"}
+    first = threading.Thread(
+        target=lambda: client.post("/api/transcribe", content=wav, headers=headers)
+    )
+    first.start()
+    while service.pending_jobs == 0:
+        pass
+
+    response = client.post("/api/transcribe", content=wav, headers=headers)
+
+    transcriber.release.set()
+    first.join()
+
+    assert_that(response.status_code, equal_to(503))
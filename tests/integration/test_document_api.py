@@ -1,5 +1,10 @@
+import wave
+from datetime import datetime
+from io import BytesIO
+
+import numpy as np
 import pytest
-from hamcrest import assert_that, contains_exactly
+from hamcrest import assert_that, contains_exactly, contains_string, equal_to, is_, is_not
 from starlette.testclient import TestClient
 
 from great_dictator.adapters.inbound.fastapi_app import create_app
@@ -53,6 +58,64 @@ def test_get_documents_returns_users_documents(client, document_repository):
     assert_that(response, is_ok_with(contains_exactly(document_response(name="existing doc"))))
 
 
+def test_get_documents_pages_with_next_cursor_header(client, document_repository):
+    for day in range(1, 4):
+        document_repository.save(
+            a_document().with_name(f"day {day}").with_created(datetime(2024, 1, day)).build()
+        )
+
+    first = client.get("/documents?user=romilly&limit=2")
+    rest = client.get(
+        "/documents",
+        params={"user": "romilly", "limit": 2, "cursor": first.headers["X-Next-Cursor"]},
+    )
+
+    assert_that(
+        first,
+        is_ok_with(contains_exactly(document_response(name="day 3"), document_response(name="day 2"))),
+    )
+    assert_that(rest, is_ok_with(contains_exactly(document_response(name="day 1"))))
+    assert_that(rest.headers.get("X-Next-Cursor"), is_(None))
+
+
+def test_get_documents_rejects_malformed_cursor(client):
+    response = client.get("/documents?user=romilly&cursor=nonsense")
+
+    assert_that(response.status_code, equal_to(400))
+
+
+def test_documents_list_html_ends_page_with_next_page_loader(client, document_repository):
+    for day in range(1, 4):
+        document_repository.save(
+            a_document().with_name(f"day {day}").with_created(datetime(2024, 1, day)).build()
+        )
+
+    response = client.get("/documents/list-html?user=romilly&limit=2")
+
+    assert_that(response.text, contains_string('hx-trigger="revealed"'))
+    assert_that(response.text, is_not(contains_string("day 1")))
+
+
+def test_search_documents_returns_hits_with_snippets(client, document_repository):
+    document_repository.save(a_document().with_name("notes").with_content("the budget").build())
+    document_repository.save(a_document().with_name("other").with_content("nothing").build())
+
+    response = client.get("/documents/search?user=romilly&q=budget")
+
+    assert_that(response.status_code, equal_to(200))
+    assert_that([hit["name"] for hit in response.json()], equal_to(["notes"]))
+    assert_that(response.json()[0]["snippet"], equal_to("the budget"))
+    assert_that(response.json()[0]["snippet_html"], equal_to("the <mark>budget</mark>"))
+
+
+def test_search_documents_html_shows_list_when_query_is_empty(client, document_repository):
+    document_repository.save(a_document().with_name("notes").build())
+
+    response = client.get("/documents/search-html?user=romilly&q=")
+
+    assert_that(response.text, contains_string("notes"))
+
+
 def test_get_document_by_id_returns_document(client, document_repository):
     doc = a_document().with_name("test doc").with_content("hello world").build()
     saved = document_repository.save(doc)
@@ -97,6 +160,134 @@ def test_put_document_returns_404_for_missing(client):
     assert_that(response, is_not_found())
 
 
+def test_append_adds_text_and_returns_new_version(client, document_repository):
+    saved = document_repository.save(a_document().with_content("Hello").build())
+
+    response = client.post(f"/documents/{saved.id}/append", json={"text": " world"})
+
+    assert_that(response.json(), equal_to({"id": saved.id, "version": 1}))
+    assert_that(document_repository.load(saved.id).content, equal_to("Hello world"))
+
+
+def test_append_returns_404_for_missing(client):
+    response = client.post("/documents/999/append", json={"text": "x"})
+
+    assert_that(response, is_not_found())
+
+
+def test_transcribe_appends_to_the_document_and_returns_only_the_new_text(
+    client, document_repository
+):
+    saved = document_repository.save(a_document().with_content("Previous text. ").build())
+    files = {"audio": ("test.webm", b"fake audio data", "audio/webm")}
+
+    response = client.post("/transcribe", files=files, data={"documentId": str(saved.id)})
+
+    assert_that(response.text, equal_to("fake transcription"))
+    assert_that(response.headers["X-Document-Version"], equal_to("1"))
+    assert_that(
+        document_repository.load(saved.id).content,
+        equal_to("Previous text. fake transcription"),
+    )
+
+
+def test_transcribe_events_end_with_the_new_text_and_version(client, document_repository):
+    saved = document_repository.save(a_document().with_content("Previous text. ").build())
+    files = {"audio": ("test.webm", b"fake audio data", "audio/webm")}
+
+    response = client.post(
+        "/transcribe",
+        files=files,
+        data={"documentId": str(saved.id)},
+        headers={"Accept": "text/event-stream"},
+    )
+
+    events = [block for block in response.text.split("\n\n") if block]
+    assert_that(
+        events[-1],
+        equal_to('event: done\ndata: {"text": "fake transcription", "version": 1}'),
+    )
+    assert_that(
+        document_repository.load(saved.id).content,
+        equal_to("Previous text. fake transcription"),
+    )
+
+
+def test_transcribe_returns_404_for_a_missing_document(client):
+    files = {"audio": ("test.webm", b"fake audio data", "audio/webm")}
+
+    response = client.post("/transcribe", files=files, data={"documentId": "999"})
+
+    assert_that(response, is_not_found())
+
+
+def test_patch_replaces_range_at_current_version(client, document_repository):
+    saved = document_repository.save(a_document().with_content("Hello world").build())
+
+    response = client.patch(
+        f"/documents/{saved.id}",
+        json={"base_version": 0, "start": 6, "end": 11, "text": "there"},
+    )
+
+    assert_that(response.json(), equal_to({"id": saved.id, "version": 1}))
+    assert_that(document_repository.load(saved.id).content, equal_to("Hello there"))
+
+
+def test_patch_against_old_version_returns_409(client, document_repository):
+    saved = document_repository.save(a_document().with_content("Hello").build())
+    document_repository.append(saved.id, "!")
+
+    response = client.patch(
+        f"/documents/{saved.id}",
+        json={"base_version": 0, "start": 0, "end": 0, "text": "Oh, "},
+    )
+
+    assert_that(response.status_code, equal_to(409))
+    assert_that(document_repository.load(saved.id).content, equal_to("Hello!"))
+
+
+def test_put_based_on_old_version_returns_409(client, document_repository):
+    saved = document_repository.save(a_document().with_content("Hello").build())
+    document_repository.append(saved.id, "!")
+
+    response = client.put(
+        f"/documents/{saved.id}",
+        json={"user": "romilly", "name": "doc", "content": "Hi", "version": 0},
+    )
+
+    assert_that(response.status_code, equal_to(409))
+    assert_that(document_repository.load(saved.id).content, equal_to("Hello!"))
+
+
+def test_get_document_version_returns_earlier_content(client, document_repository):
+    saved = document_repository.save(a_document().with_content("Hello").build())
+    document_repository.append(saved.id, "!")
+
+    response = client.get(f"/documents/{saved.id}/versions/0")
+
+    assert_that(response, is_ok_with(document_response(content="Hello")))
+
+
+def test_editor_save_keeps_text_on_conflict(client, document_repository):
+    saved = document_repository.save(a_document().with_content("Hello").build())
+    document_repository.append(saved.id, " from the phone")
+
+    response = client.post(
+        "/editor/save",
+        data={
+            "documentId": str(saved.id),
+            "documentVersion": "0",
+            "documentName": "doc",
+            "content": "Hello from the workstation",
+        },
+    )
+
+    assert_that(response.text, contains_string("Hello from the workstation"))
+    assert_that(response.text, contains_string("Changed elsewhere"))
+    assert_that(response.text, contains_string('id="documentVersion" value="1"'))
+    assert_that(document_repository.load(saved.id).content, equal_to("Hello from the phone"))
+
+
 def test_delete_document_removes_document(client, document_repository):
     doc = a_document().with_name("test doc").with_content("hello world").build()
     saved = document_repository.save(doc)
@@ -111,3 +302,97 @@ def test_delete_document_returns_404_for_missing(client):
     response = client.delete("/documents/999")
 
     assert_that(response, is_not_found())
+
+
+@pytest.fixture
+def audio_client(fake_transcriber, document_repository, tmp_path):
+    from great_dictator.adapters.outbound.pack_audio_store import PackAudioStore
+    from great_dictator.adapters.outbound.sqlite_job_queue import SqliteJobQueue
+
+    audio_store = PackAudioStore(str(tmp_path / "audio"))
+    doc = document_repository.save(a_document().with_content("one two").build())
+    audio_store.append(doc.id, np.full(16000, 0.25, dtype=np.float32), "one", 0)
+    audio_store.append(doc.id, np.full(16000, -0.25, dtype=np.float32), "two", 4)
+    app = create_app(
+        TranscriptionService(fake_transcriber),
+        document_repository,
+        audio_store=audio_store,
+        job_queue=SqliteJobQueue(str(tmp_path / "documents.db")),
+    )
+    return TestClient(app), doc.id
+
+
+def test_audio_chunks_list_text_spans(audio_client):
+    client, doc_id = audio_client
+
+    response = client.get(f"/documents/{doc_id}/audio/chunks")
+
+    assert_that(
+        response.json(),
+        equal_to([
+            {"sequence": 0, "start": 0.0, "end": 1.0, "text_start": 0, "text_end": 3},
+            {"sequence": 1, "start": 1.0, "end": 2.0, "text_start": 4, "text_end": 7},
+        ]),
+    )
+
+
+def test_audio_range_plays_as_wav(audio_client):
+    client, doc_id = audio_client
+
+    response = client.get(f"/documents/{doc_id}/audio", params={"start": 0.5, "end": 1.5})
+
+    with wave.open(BytesIO(response.content)) as wav:
+        assert_that(wav.getnframes(), equal_to(16000))
+        pcm = np.frombuffer(wav.readframes(16000), dtype="<i2")
+    assert_that((pcm[0] > 0, pcm[-1] < 0), equal_to((True, True)))
+    assert_that(response.headers["content-type"], equal_to("audio/wav"))
+
+
+def test_audio_range_can_be_transcribed_again(audio_client):
+    client, doc_id = audio_client
+
+    response = client.post(f"/documents/{doc_id}/audio/transcribe", params={"start": 1})
+
+    assert_that(response.json()["text"], equal_to("fake transcription"))
+    assert_that(response.json()["duration"], equal_to(1.0))
+
+
+def test_missing_audio_is_not_found(audio_client):
+    client, _ = audio_client
+
+    assert_that(client.get("/documents/99/audio"), is_not_found())
+
+
+def test_deleting_document_deletes_its_audio(audio_client):
+    client, doc_id = audio_client
+
+    client.delete(f"/documents/{doc_id}")
+
+    assert_that(client.get(f"/documents/{doc_id}/audio/chunks").json(), equal_to([]))
+
+
+def test_retranscription_is_queued_and_reports_progress(audio_client):
+    client, doc_id = audio_client
+
+    queued = client.post(f"/documents/{doc_id}/retranscribe")
+    progress = client.get(f"/retranscriptions/{queued.json()['id']}")
+
+    assert_that(queued.status_code, equal_to(202))
+    assert_that(
+        progress.json(),
+        equal_to({
+            "id": queued.json()["id"],
+            "document_id": doc_id,
+            "status": "queued",
+            "chunks_done": 0,
+            "chunks_total": 0,
+            "error": None,
+        }),
+    )
+
+
+def test_retranscription_needs_audio(audio_client):
+    client, _ = audio_client
+
+    assert_that(client.post("/documents/99/retranscribe"), is_not_found())
+    assert_that(client.get("/retranscriptions/99"), is_not_found())
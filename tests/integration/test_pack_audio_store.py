@@ -0,0 +1,134 @@
+"""Integration tests for the pack-file audio store."""
+import numpy as np
+import pytest
+from hamcrest import assert_that, contains_exactly, equal_to, has_length, has_properties
+
+from great_dictator.adapters.outbound.pack_audio_store import PackAudioStore
+
+
+def a_tone(seconds: float, frequency: float = 440.0) -> np.ndarray:
+    t = np.arange(int(seconds * 16000)) / 16000
+    pcm = np.round(0.5 * np.sin(2 * np.pi * frequency * t) * 32768)
+    return (pcm / 32768).astype(np.float32)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = PackAudioStore(str(tmp_path / "audio"))
+    yield store
+    store.close()
+
+
+def test_chunks_are_laid_end_to_end_with_their_text_spans(store):
+    store.append(1, a_tone(1.0), "Hello", 0)
+    store.append(1, a_tone(0.5), "there.", 6)
+
+    assert_that(
+        store.chunks(1),
+        contains_exactly(
+            has_properties(
+                sequence=0, start=0.0, end=1.0, text="Hello", text_start=0, text_end=5
+            ),
+            has_properties(
+                sequence=1, start=1.0, end=1.5, text="there.", text_start=6, text_end=12
+            ),
+        ),
+    )
+    assert_that(store.duration(1), equal_to(1.5))
+
+
+def test_revised_text_moves_the_spans_after_it(store):
+    store.append(1, a_tone(1.0), "Hello", 0)
+    store.append(1, a_tone(0.5), "there.", 6)
+
+    store.update_text(1, 0, "Hello again", 0)
+
+    assert_that(
+        store.chunks(1),
+        contains_exactly(
+            has_properties(text="Hello again", text_start=0, text_end=11),
+            has_properties(text="there.", text_start=12, text_end=18),
+        ),
+    )
+
+
+def test_audio_reads_back_unchanged(store):
+    first, second = a_tone(1.0), a_tone(0.75, 220.0)
+    store.append(1, first, "x", 0)
+    store.append(1, second, "x", 1)
+
+    assert_that(
+        np.array_equal(store.read(1), np.concatenate([first, second])), equal_to(True)
+    )
+
+
+def test_range_read_spans_chunk_boundaries(store):
+    first, second = a_tone(1.0), a_tone(1.0, 220.0)
+    store.append(1, first, "x", 0)
+    store.append(1, second, "x", 1)
+
+    samples = store.read(1, start=0.5, end=1.25)
+
+    expected = np.concatenate([first[8000:], second[:4000]])
+    assert_that(np.array_equal(samples, expected), equal_to(True))
+
+
+def test_identical_audio_is_stored_once(store, tmp_path):
+    tone = a_tone(1.0)
+    store.append(1, tone, "x", 0)
+    size = (tmp_path / "audio" / "pack-000000.bin").stat().st_size
+
+    store.append(2, tone, "x", 0)
+
+    assert_that((tmp_path / "audio" / "pack-000000.bin").stat().st_size, equal_to(size))
+    assert_that(np.array_equal(store.read(2), tone), equal_to(True))
+
+
+def test_speech_is_stored_compressed(store, tmp_path):
+    store.append(1, a_tone(1.0), "x", 0)
+
+    size = (tmp_path / "audio" / "pack-000000.bin").stat().st_size
+
+    assert size < 16000 * 2 // 2
+
+
+def test_packs_roll_over_at_their_size_limit(tmp_path):
+    store = PackAudioStore(str(tmp_path / "audio"), max_pack_bytes=1)
+    for frequency in (220.0, 330.0, 440.0):
+        store.append(1, a_tone(0.25, frequency), "x", 0)
+
+    assert_that(sorted(p.name for p in (tmp_path / "audio").glob("pack-*")), has_length(3))
+    assert_that(store.read(1), has_length(3 * 4000))
+    store.close()
+
+
+def test_store_reopens_with_its_audio(tmp_path):
+    tone = a_tone(0.5)
+    first = PackAudioStore(str(tmp_path / "audio"))
+    first.append(1, tone, "one", 0)
+    first.close()
+
+    reopened = PackAudioStore(str(tmp_path / "audio"))
+    reopened.append(1, tone, "two", 4)
+
+    assert_that(reopened.chunks(1)[1], has_properties(start=0.5, end=1.0))
+    assert_that(reopened.read(1), has_length(16000))
+    reopened.close()
+
+
+def test_reads_see_chunks_written_after_the_pack_was_mapped(store):
+    store.append(1, a_tone(0.25), "x", 0)
+    store.read(1)
+
+    store.append(1, a_tone(0.25, 220.0), "x", 1)
+
+    assert_that(store.read(1), has_length(8000))
+
+
+def test_deleted_document_has_no_audio(store):
+    store.append(1, a_tone(0.5), "x", 0)
+
+    store.delete(1)
+
+    assert_that(store.chunks(1), equal_to([]))
+    assert_that(store.read(1), has_length(0))
@@ -0,0 +1,172 @@
+"""Integration tests for the background re-transcription worker."""
+from dataclasses import replace
+
+import numpy as np
+import pytest
+from hamcrest import assert_that, contains_exactly, equal_to, has_properties
+
+from great_dictator.adapters.outbound.pack_audio_store import PackAudioStore
+from great_dictator.adapters.outbound.sqlite_job_queue import SqliteJobQueue
+from great_dictator.domain.retranscription import RetranscriptionWorker
+from great_dictator.domain.transcription import TranscriberPort, TranscriptionResult
+from tests.builders import a_document
+from tests.fakes.fake_document_repository import FakeDocumentRepository
+
+
+class LevelTranscriber(TranscriberPort):
+    """Names each chunk after its (constant) sample level."""
+
+    def __init__(self):
+        self.levels: list[float] = []
+
+    def transcribe(self, audio):
+        raise NotImplementedError
+
+    def transcribe_pcm(self, samples, prompt=None):
+        self.levels.append(round(float(samples[0]), 2))
+        return TranscriptionResult(text=f"level {self.levels[-1]}", language="en")
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = SqliteJobQueue(str(tmp_path / "documents.db"))
+    yield queue
+    queue.close()
+
+
+@pytest.fixture
+def audio_store(tmp_path):
+    store = PackAudioStore(str(tmp_path / "audio"))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def documents():
+    return FakeDocumentRepository()
+
+
+def dictated(documents, audio_store, drafts):
+    """A document dictated as one chunk per draft, at levels 0.1, 0.2, ..."""
+    doc = documents.save(a_document().with_content(" ".join(drafts)).build())
+    offset = 0
+    for number, draft in enumerate(drafts, start=1):
+        level = np.full(1600, number / 10, dtype=np.float32)
+        audio_store.append(doc.id, level, draft, offset)
+        offset += len(draft) + 1
+    return doc
+
+
+def test_worker_replaces_drafts_with_new_transcripts(queue, audio_store, documents):
+    doc = dictated(documents, audio_store, ["one", "two"])
+    job = queue.enqueue(doc.id)
+    worker = RetranscriptionWorker(queue, audio_store, documents, LevelTranscriber())
+
+    assert_that(worker.run_once(), equal_to(True))
+
+    assert_that(documents.load(doc.id).content, equal_to("level 0.1 level 0.2"))
+    assert_that(
+        queue.get(job.id), has_properties(status="done", chunks_done=2, chunks_total=2)
+    )
+
+
+def test_chunks_follow_their_new_text_into_the_next_job(queue, audio_store, documents):
+    doc = dictated(documents, audio_store, ["one", "two"])
+    queue.enqueue(doc.id)
+    RetranscriptionWorker(queue, audio_store, documents, LevelTranscriber()).run_once()
+
+    content = documents.load(doc.id).content
+    assert_that(
+        [content[c.text_start:c.text_end] for c in audio_store.chunks(doc.id)],
+        equal_to(["level 0.1", "level 0.2"]),
+    )
+
+    class ShortTranscriber(LevelTranscriber):
+        def transcribe_pcm(self, samples, prompt=None):
+            return replace(super().transcribe_pcm(samples, prompt), text="L")
+
+    queue.enqueue(doc.id)
+    RetranscriptionWorker(queue, audio_store, documents, ShortTranscriber()).run_once()
+
+    assert_that(documents.load(doc.id).content, equal_to("L L"))
+    assert_that(
+        [(c.text, c.text_start, c.text_end) for c in audio_store.chunks(doc.id)],
+        equal_to([("L", 0, 1), ("L", 2, 3)]),
+    )
+
+
+def test_worker_keeps_hand_edits_made_while_it_ran(queue, audio_store, documents):
+    doc = dictated(documents, audio_store, ["one", "two"])
+    queue.enqueue(doc.id)
+
+    class EditingTranscriber(LevelTranscriber):
+        def transcribe_pcm(self, samples, prompt=None):
+            current = documents.load(doc.id)
+            documents.save(replace(current, content="Note: " + current.content))
+            return super().transcribe_pcm(samples, prompt)
+
+    RetranscriptionWorker(queue, audio_store, documents, EditingTranscriber()).run_once()
+
+    assert_that(
+        documents.load(doc.id).content, equal_to("Note: Note: level 0.1 level 0.2")
+    )
+
+
+def test_worker_resumes_a_job_from_its_last_chunk(queue, audio_store, documents):
+    doc = dictated(documents, audio_store, ["one", "two", "three"])
+    job = queue.enqueue(doc.id)
+
+    class StoppingTranscriber(LevelTranscriber):
+        def transcribe_pcm(self, samples, prompt=None):
+            interrupted.stop()  # As on SIGTERM, mid-chunk
+            return super().transcribe_pcm(samples, prompt)
+
+    interrupted = RetranscriptionWorker(
+        queue, audio_store, documents, StoppingTranscriber()
+    )
+    interrupted.run_once()
+    resumed = LevelTranscriber()
+    worker = RetranscriptionWorker(queue, audio_store, documents, resumed)
+    queue.requeue_running()
+    worker.run_once()
+
+    assert_that(resumed.levels, contains_exactly(0.2, 0.3))
+    assert_that(queue.get(job.id).status, equal_to("done"))
+    assert_that(documents.load(doc.id).content, equal_to("level 0.1 level 0.2 level 0.3"))
+
+
+def test_failure_marks_job_failed(queue, audio_store, documents):
+    doc = dictated(documents, audio_store, ["one"])
+    job = queue.enqueue(doc.id)
+    documents.delete(doc.id)
+
+    RetranscriptionWorker(queue, audio_store, documents, LevelTranscriber()).run_once()
+
+    assert_that(
+        queue.get(job.id), has_properties(status="failed", error="Document was deleted")
+    )
+
+
+def test_worker_sleeps_to_stay_within_cpu_budget(
+    queue, audio_store, documents, monkeypatch
+):
+    doc = dictated(documents, audio_store, ["one"])
+    queue.enqueue(doc.id)
+    clock = iter([10.0, 10.5])  # Half a second transcribing
+    monkeypatch.setattr(
+        "great_dictator.domain.retranscription.time.perf_counter", lambda: next(clock)
+    )
+    worker = RetranscriptionWorker(
+        queue, audio_store, documents, LevelTranscriber(), cpu_budget=0.25
+    )
+    waits: list[float] = []
+    monkeypatch.setattr(worker._stop, "wait", waits.append)
+
+    worker.run_once()
+
+    assert_that(waits, contains_exactly(1.5))
+
+
+def test_cpu_budget_must_be_a_share():
+    with pytest.raises(ValueError):
+        RetranscriptionWorker(None, None, None, None, cpu_budget=0)  # type: ignore[arg-type]
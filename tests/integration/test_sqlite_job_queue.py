@@ -0,0 +1,70 @@
+"""Integration tests for the SQLite re-transcription job queue."""
+import pytest
+from hamcrest import assert_that, equal_to, has_properties, is_, none
+
+from great_dictator.adapters.outbound.sqlite_job_queue import SqliteJobQueue
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "documents.db")
+
+
+@pytest.fixture
+def queue(db_path):
+    queue = SqliteJobQueue(db_path)
+    yield queue
+    queue.close()
+
+
+def test_jobs_are_claimed_oldest_first(queue):
+    first = queue.enqueue(1)
+    second = queue.enqueue(2)
+
+    assert_that(queue.claim(), has_properties(id=first.id, status="running"))
+    assert_that(queue.claim(), has_properties(id=second.id, status="running"))
+    assert_that(queue.claim(), is_(none()))
+
+
+def test_document_is_queued_once_until_its_job_finishes(queue):
+    job = queue.enqueue(1)
+    queue.claim()
+
+    assert_that(queue.enqueue(1).id, equal_to(job.id))
+    queue.finish(job.id)
+    assert_that(queue.enqueue(1).id, is_(job.id + 1))
+
+
+def test_recorded_chunks_count_as_progress(queue):
+    job = queue.enqueue(1)
+    queue.record(job.id, 0, "one", 3)
+    queue.record(job.id, 1, "two", 3)
+
+    assert_that(queue.get(job.id), has_properties(chunks_done=2, chunks_total=3))
+    assert_that(queue.results(job.id), equal_to({0: "one", 1: "two"}))
+
+
+def test_failed_job_keeps_its_error_and_drops_results(queue):
+    job = queue.enqueue(1)
+    queue.record(job.id, 0, "one", 1)
+
+    queue.finish(job.id, error="model crashed")
+
+    assert_that(queue.get(job.id), has_properties(status="failed", error="model crashed"))
+    assert_that(queue.results(job.id), equal_to({}))
+
+
+def test_running_jobs_are_requeued_with_their_results_after_restart(db_path):
+    queue = SqliteJobQueue(db_path)
+    job = queue.enqueue(1)
+    queue.claim()
+    queue.record(job.id, 0, "one", 2)
+    queue.close()
+
+    restarted = SqliteJobQueue(db_path)
+    requeued = restarted.requeue_running()
+
+    assert_that(requeued, equal_to(1))
+    assert_that(restarted.claim(), has_properties(id=job.id, chunks_done=1))
+    assert_that(restarted.results(job.id), equal_to({0: "one"}))
+    restarted.close()
@@ -1,10 +1,23 @@
 import sqlite3
+import threading
+from contextlib import closing
+from dataclasses import replace
 from datetime import datetime
 
 import pytest
-from hamcrest import assert_that, equal_to, is_, is_not
+from hamcrest import assert_that, equal_to, has_length, is_, is_not
 
-from great_dictator.domain.document import Document
+from great_dictator.adapters.outbound.sqlite_document_repository import (
+    SqliteDocumentRepository,
+)
+from great_dictator.domain.document import (
+    MATCH_END,
+    MATCH_START,
+    Document,
+    DocumentCursor,
+    TextPatch,
+    VersionConflict,
+)
 
 
 def test_save_assigns_id_to_new_document(db_repository):
@@ -101,6 +114,251 @@ def test_list_for_user_returns_only_users_documents(db_repository):
     assert "doc2" in names
 
 
+def test_list_for_user_pages_newest_first(db_repository):
+    for day in range(1, 6):
+        db_repository.save(
+            Document(
+                user="romilly",
+                name=f"day {day}",
+                content="",
+                created=datetime(2024, 1, day, 9, 0),
+            )
+        )
+
+    first = db_repository.list_for_user("romilly", limit=2)
+    second = db_repository.list_for_user(
+        "romilly", limit=2, after=DocumentCursor.after(first[-1])
+    )
+    rest = db_repository.list_for_user("romilly", after=DocumentCursor.after(second[-1]))
+
+    assert_that([s.name for s in first], equal_to(["day 5", "day 4"]))
+    assert_that([s.name for s in second], equal_to(["day 3", "day 2"]))
+    assert_that([s.name for s in rest], equal_to(["day 1"]))
+
+
+def test_list_for_user_breaks_ties_on_created_by_id(db_repository):
+    for name in ("a", "b", "c"):
+        db_repository.save(
+            Document(user="romilly", name=name, content="", created=datetime(2024, 1, 1))
+        )
+
+    first = db_repository.list_for_user("romilly", limit=2)
+    rest = db_repository.list_for_user("romilly", after=DocumentCursor.after(first[-1]))
+
+    assert_that([s.name for s in first + rest], equal_to(["c", "b", "a"]))
+
+
+def test_search_finds_users_documents_by_prefix(db_repository):
+    db_repository.save(
+        Document(
+            user="romilly",
+            name="notes",
+            content="we discussed the quarterly budget",
+            created=datetime(2024, 1, 1),
+        )
+    )
+    db_repository.save(
+        Document(
+            user="other_user",
+            name="notes",
+            content="the budget again",
+            created=datetime(2024, 1, 1),
+        )
+    )
+
+    hits = db_repository.search("romilly", "quarterly bud")
+
+    assert_that([hit.name for hit in hits], equal_to(["notes"]))
+    assert_that(hits[0].snippet, equal_to("we discussed the \x02quarterly\x03 \x02budget\x03"))
+
+
+def test_search_index_follows_updates_and_deletes(db_repository):
+    saved = db_repository.save(
+        Document(user="romilly", name="doc", content="alpha", created=datetime(2024, 1, 1))
+    )
+    db_repository.save(replace(saved, content="beta"))
+
+    assert_that(db_repository.search("romilly", "alpha"), equal_to([]))
+    assert_that(len(db_repository.search("romilly", "beta")), equal_to(1))
+
+    db_repository.delete(saved.id)  # type: ignore[arg-type]
+
+    assert_that(db_repository.search("romilly", "beta"), equal_to([]))
+
+
+def test_search_treats_query_syntax_as_text(db_repository):
+    db_repository.save(
+        Document(user="romilly", name="doc", content="alpha", created=datetime(2024, 1, 1))
+    )
+
+    assert_that(db_repository.search("romilly", 'NEAR( "AND'), equal_to([]))
+    assert_that(db_repository.search("romilly", "   "), equal_to([]))
+
+
+def index_segments(repository, document_id):
+    with repository._get_connection() as conn:
+        return conn.execute(
+            """
+            SELECT id, start FROM document_segments
+            WHERE document_id=? AND start >= 0 ORDER BY start
+            """,
+            (document_id,),
+        ).fetchall()
+
+
+def test_search_matches_words_across_name_and_segments(db_repository):
+    db_repository.save(
+        Document(
+            user="romilly",
+            name="minutes",
+            content="the quarterly meeting " + "then more talk " * 500 + "on budget",
+            created=datetime(2024, 1, 1),
+        )
+    )
+
+    hits = db_repository.search("romilly", "minutes quarterly budget")
+
+    assert_that(hits, has_length(1))
+    assert_that(hits[0].snippet, is_not(equal_to("")))
+    assert_that(db_repository.search("romilly", "quarterly missing"), equal_to([]))
+    assert_that(
+        db_repository.search("romilly", "minutes")[0].snippet,
+        equal_to("the quarterly meeting then more talk then more talk then more talk…"),
+    )
+
+
+def test_edits_reindex_only_the_segments_they_touch(db_repository):
+    saved = db_repository.save(
+        Document(
+            user="romilly",
+            name="doc",
+            content="opening words " + "dictated text " * 400,
+            created=datetime(2024, 1, 1),
+        )
+    )
+    first, *_ = before = index_segments(db_repository, saved.id)
+
+    version = db_repository.append(saved.id, " closing remark")
+    db_repository.apply_patch(saved.id, version, TextPatch(0, 7, "welcome"))  # type: ignore[arg-type]
+
+    after = index_segments(db_repository, saved.id)
+    assert_that(len(before), equal_to(3))
+    assert_that(after[1:], equal_to(before[1:-1] + after[-1:]))
+    assert_that(after[0], is_not(equal_to(first)))
+    assert_that(db_repository.search("romilly", "closing remark"), has_length(1))
+    assert_that(db_repository.search("romilly", "welcome words"), has_length(1))
+    assert_that(db_repository.search("romilly", "opening"), equal_to([]))
+
+
+def test_append_and_patch_edit_content_in_place(db_repository):
+    saved = db_repository.save(
+        Document(user="romilly", name="doc", content="héllo", created=datetime(2024, 1, 1))
+    )
+
+    appended = db_repository.append(saved.id, " wörld")
+    patched = db_repository.apply_patch(saved.id, appended, TextPatch(6, 11, "there"))
+
+    loaded = db_repository.load(saved.id)
+    assert_that((appended, patched), equal_to((1, 2)))
+    assert_that(loaded.content, equal_to("héllo there"))  # type: ignore[union-attr]
+    assert_that(loaded.version, equal_to(2))  # type: ignore[union-attr]
+    assert_that(len(db_repository.search("romilly", "there")), equal_to(1))
+
+
+def test_patch_against_stale_version_conflicts(db_repository):
+    saved = db_repository.save(
+        Document(user="romilly", name="doc", content="hello", created=datetime(2024, 1, 1))
+    )
+    db_repository.append(saved.id, "!")
+
+    with pytest.raises(VersionConflict) as conflict:
+        db_repository.apply_patch(saved.id, 0, TextPatch(0, 0, "oh "))
+
+    assert_that(conflict.value.current_version, equal_to(1))
+
+
+def test_patch_outside_content_is_rejected(db_repository):
+    saved = db_repository.save(
+        Document(user="romilly", name="doc", content="hello", created=datetime(2024, 1, 1))
+    )
+
+    with pytest.raises(ValueError):
+        db_repository.apply_patch(saved.id, 0, TextPatch(3, 9, "x"))
+
+
+def test_save_based_on_stale_version_conflicts(db_repository):
+    saved = db_repository.save(
+        Document(user="romilly", name="doc", content="hello", created=datetime(2024, 1, 1))
+    )
+    db_repository.save(replace(saved, content="hello from the phone"))
+
+    with pytest.raises(VersionConflict):
+        db_repository.save(replace(saved, content="hello from the workstation"))
+
+    assert_that(
+        db_repository.load(saved.id).content,  # type: ignore[union-attr]
+        equal_to("hello from the phone"),
+    )
+
+
+def test_every_version_can_be_loaded_back(db_repository):
+    saved = db_repository.save(
+        Document(user="romilly", name="doc", content="one", created=datetime(2024, 1, 1))
+    )
+    db_repository.append(saved.id, " two")
+    db_repository.apply_patch(saved.id, 1, TextPatch(0, 3, "ONE"))
+    db_repository.save(replace(db_repository.load(saved.id), content="ONE two three"))
+
+    contents = [
+        db_repository.load_version(saved.id, version).content  # type: ignore[union-attr]
+        for version in range(4)
+    ]
+
+    assert_that(contents, equal_to(["one", "one two", "ONE two", "ONE two three"]))
+    assert_that(db_repository.load_version(saved.id, 4), is_(None))
+
+
+def test_version_is_read_from_one_snapshot(db_repository, monkeypatch):
+    saved = db_repository.save(
+        Document(user="romilly", name="doc", content="one", created=datetime(2024, 1, 1))
+    )
+    db_repository.append(saved.id, " two")
+    writer = SqliteDocumentRepository(db_repository._db_path)
+    load = db_repository._load
+
+    def load_then_write(conn, document_id):
+        document = load(conn, document_id)
+        writer.append(document_id, " three")  # Lands between the two reads
+        return document
+
+    monkeypatch.setattr(db_repository, "_load", load_then_write)
+    loaded = db_repository.load_version(saved.id, 0)
+    writer.close()
+
+    assert_that(loaded.content, equal_to("one"))  # type: ignore[union-attr]
+
+
+def test_revisions_store_only_the_edit(db_repository):
+    saved = db_repository.save(
+        Document(
+            user="romilly", name="doc", content="word " * 10000, created=datetime(2024, 1, 1)
+        )
+    )
+    db_repository.append(saved.id, "more")
+
+    with db_repository._get_connection() as conn:
+        stored = conn.execute(
+            "SELECT sum(length(undo_text)) FROM document_revisions WHERE document_id=?",
+            (saved.id,),
+        ).fetchone()[0]
+
+    assert_that(stored, equal_to(0))
+
+
+def test_append_to_missing_document_returns_none(db_repository):
+    assert_that(db_repository.append(999, "x"), is_(None))
+
+
 def test_delete_removes_document(db_repository):
     doc = Document(
         user="romilly",
@@ -140,3 +398,175 @@ def test_unique_constraint_on_user_and_name(db_repository):
 
     with pytest.raises(sqlite3.IntegrityError):
         db_repository.save(doc2)
+
+
+def test_database_uses_write_ahead_log(db_repository):
+    with db_repository._get_connection() as conn:
+        mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+
+    assert_that(mode, equal_to("wal"))
+
+
+def test_each_thread_reuses_its_own_connection(db_repository):
+    connections = []
+
+    def use_repository() -> None:
+        db_repository.list_for_user("romilly")
+        connections.append(db_repository._get_connection())
+        connections.append(db_repository._get_connection())
+
+    threads = [threading.Thread(target=use_repository) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert_that(connections[0], is_(connections[1]))
+    assert_that(connections[2], is_(connections[3]))
+    assert_that(connections[0], is_not(connections[2]))
+
+
+def test_concurrent_saves_are_all_stored(db_repository):
+    def save_documents(writer: int) -> None:
+        for i in range(20):
+            db_repository.save(
+                Document(
+                    user="romilly",
+                    name=f"doc {writer}-{i}",
+                    content="hello",
+                    created=datetime(2024, 1, 15, 10, 30),
+                )
+            )
+
+    threads = [threading.Thread(target=save_documents, args=(w,)) for w in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert_that(len(db_repository.list_for_user("romilly")), equal_to(80))
+
+
+@pytest.fixture
+def compressing_repository(tmp_path):
+    return SqliteDocumentRepository(
+        str(tmp_path / "compressed.db"), compression="zlib", compress_min_bytes=64
+    )
+
+
+def stored_codec(repository, document_id):
+    with repository._get_connection() as conn:
+        return conn.execute(
+            "SELECT codec, length(CAST(content AS BLOB)) FROM documents WHERE id=?",
+            (document_id,),
+        ).fetchone()
+
+
+def test_large_content_is_stored_compressed(compressing_repository):
+    content = "the quarterly budget meeting " * 100
+    saved = compressing_repository.save(
+        Document(user="romilly", name="doc", content=content, created=datetime(2024, 1, 1))
+    )
+
+    codec, size = stored_codec(compressing_repository, saved.id)
+
+    assert_that(codec, equal_to("zlib"))
+    assert_that(size < len(content) // 10, is_(True))
+    assert_that(compressing_repository.load(saved.id).content, equal_to(content))  # type: ignore[union-attr]
+    hits = compressing_repository.search("romilly", "quarterly")
+    assert_that(MATCH_START + "quarterly" + MATCH_END in hits[0].snippet, is_(True))
+
+
+def test_content_is_stored_plain_unless_compression_is_on(db_repository):
+    saved = db_repository.save(
+        Document(
+            user="romilly",
+            name="doc",
+            content="the quarterly budget meeting " * 1000,
+            created=datetime(2024, 1, 1),
+        )
+    )
+
+    assert_that(stored_codec(db_repository, saved.id)[0], equal_to("text"))
+
+
+def test_edits_that_cross_the_threshold_compress(compressing_repository):
+    saved = compressing_repository.save(
+        Document(user="romilly", name="doc", content="short", created=datetime(2024, 1, 1))
+    )
+    assert_that(stored_codec(compressing_repository, saved.id)[0], equal_to("text"))
+
+    compressing_repository.append(saved.id, " and then a much longer dictated sentence" * 3)
+    compressing_repository.apply_patch(saved.id, 1, TextPatch(0, 5, "SHORT"))
+
+    loaded = compressing_repository.load(saved.id)
+    assert_that(stored_codec(compressing_repository, saved.id)[0], equal_to("zlib"))
+    assert_that(loaded.content.startswith("SHORT and then"), is_(True))  # type: ignore[union-attr]
+    assert_that(
+        compressing_repository.load_version(saved.id, 0).content,  # type: ignore[union-attr]
+        equal_to("short"),
+    )
+    assert_that(compressing_repository.search("romilly", "dictated"), has_length(1))
+    assert_that(compressing_repository.search("romilly", "short"), has_length(1))
+
+
+def test_turning_compression_on_compresses_existing_rows(tmp_path):
+    path = str(tmp_path / "documents.db")
+    plain = SqliteDocumentRepository(path)
+    ids = [
+        plain.save(
+            Document(
+                user="romilly",
+                name=f"doc {n}",
+                content="the quarterly budget meeting " * 10,
+                created=datetime(2024, 1, 1),
+            )
+        ).id
+        for n in range(150)
+    ]
+    plain.close()
+
+    repository = SqliteDocumentRepository(path, compression="zlib", compress_min_bytes=64)
+
+    assert_that(
+        {stored_codec(repository, document_id)[0] for document_id in ids},
+        equal_to({"zlib"}),
+    )
+    assert_that(repository.search("romilly", "quarterly"), has_length(20))
+
+
+def test_load_metadata_skips_content(compressing_repository):
+    saved = compressing_repository.save(
+        Document(user="romilly", name="doc", content="x" * 1000, created=datetime(2024, 1, 1))
+    )
+
+    metadata = compressing_repository.load_metadata(saved.id)
+
+    assert_that(metadata.name, equal_to("doc"))  # type: ignore[union-attr]
+    assert_that(metadata.version, equal_to(0))  # type: ignore[union-attr]
+    assert_that(compressing_repository.load_metadata(999), is_(None))
+
+
+def test_existing_rows_are_compressed_and_reindexed_on_upgrade(tmp_path):
+    path = str(tmp_path / "old.db")
+    with closing(sqlite3.connect(path)) as conn:
+        conn.execute("""
+            CREATE TABLE documents (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user TEXT NOT NULL DEFAULT 'romilly',
+                name TEXT NOT NULL,
+                content TEXT NOT NULL,
+                created TEXT NOT NULL,
+                UNIQUE(user, name)
+            )
+        """)
+        conn.execute(
+            "INSERT INTO documents (user, name, content, created) VALUES (?, ?, ?, ?)",
+            ("romilly", "old", "archived transcript " * 50, "2024-01-01T00:00:00"),
+        )
+        conn.commit()
+
+    repository = SqliteDocumentRepository(path, compression="zlib", compress_min_bytes=64)
+
+    assert_that(stored_codec(repository, 1)[0], equal_to("zlib"))
+    assert_that(repository.search("romilly", "archived"), has_length(1))
@@ -1,10 +1,16 @@
 """Tests for WebSocket streaming transcription endpoint."""
 import pytest
-from hamcrest import assert_that, equal_to
+from hamcrest import assert_that, equal_to, greater_than
 from starlette.testclient import TestClient
 
 from great_dictator.adapters.inbound.fastapi_app import create_app
-from great_dictator.domain.transcription import TranscriptionService
+from great_dictator.domain.transcription import (
+    TranscriberPort,
+    TranscriptionResult,
+    TranscriptionService,
+)
+from tests.builders import a_document
+from tests.fakes.fake_document_repository import FakeDocumentRepository
 
 
 @pytest.fixture
@@ -49,21 +55,27 @@ def test_websocket_stream_transcribes_on_end_of_speech_signal(client, fake_trans
     assert_that(result["text"], equal_to("fake transcription"))
 
 
-def test_websocket_stream_auto_transcribes_after_silence(client, fake_transcriber):
-    """WebSocket auto-transcribes when VAD detects silence after speech."""
+def make_speech_chunk() -> bytes:
+    """100ms of "speech" - non-zero audio that VAD will detect as speech."""
     import struct
 
-    # Create "speech" chunk - non-zero audio that VAD will detect as speech
     # Using a simple sine-wave-like pattern at ~440Hz
     speech_samples = []
     for i in range(1600):  # 100ms at 16kHz
         # Generate a simple tone pattern
         value = int(10000 * ((i % 36) / 18 - 1))  # ~444Hz square-ish wave
         speech_samples.append(value)
-    speech_chunk = struct.pack(f"<{len(speech_samples)}h", *speech_samples)
+    return struct.pack(f"<{len(speech_samples)}h", *speech_samples)
+
 
-    # Create silence chunk - zeros that VAD will detect as silence
-    silence_chunk = b"\x00\x00" * 1600  # 100ms of silence
+# Silence chunk - zeros that VAD will detect as silence
+SILENCE_CHUNK = b"\x00\x00" * 1600  # 100ms of silence
+
+
+def test_websocket_stream_auto_transcribes_after_silence(client, fake_transcriber):
+    """WebSocket auto-transcribes when VAD detects silence after speech."""
+    speech_chunk = make_speech_chunk()
+    silence_chunk = SILENCE_CHUNK
 
     with client.websocket_connect("/api/stream") as websocket:
         ready = websocket.receive_json()
@@ -82,3 +94,284 @@ def test_websocket_stream_auto_transcribes_after_silence(client, fake_transcribe
 
     assert_that(result["type"], equal_to("final"))
     assert_that(result["text"], equal_to("fake transcription"))
+
+
+def test_websocket_stream_sends_partials_while_speech_continues(client, monkeypatch):
+    """With interim results enabled, partials arrive before the final."""
+    monkeypatch.setenv("STREAM_PARTIAL_INTERVAL_MS", "400")
+    speech_chunk = make_speech_chunk()
+
+    with client.websocket_connect("/api/stream") as websocket:
+        websocket.receive_json()  # ready
+
+        for _ in range(5):  # 500ms of "speech"
+            websocket.send_bytes(speech_chunk)
+        partial = websocket.receive_json()
+
+        for _ in range(10):  # 1000ms of silence
+            websocket.send_bytes(SILENCE_CHUNK)
+        final = websocket.receive_json()
+
+    assert_that(partial["type"], equal_to("partial"))
+    assert_that(partial["text"], equal_to("fake transcription"))
+    assert_that(final["type"], equal_to("final"))
+
+
+class PromptRecordingTranscriber(TranscriberPort):
+    """A new text for every decode; records the prompt each one was given."""
+
+    def __init__(self):
+        self.prompts = []
+
+    def transcribe(self, audio):
+        raise AssertionError("streams pass samples")
+
+    def transcribe_pcm(self, samples, prompt=None):
+        self.prompts.append(prompt)
+        return TranscriptionResult(text=f"take {len(self.prompts)}", language="en")
+
+
+def test_partials_are_prompted_with_the_text_before_the_utterance(monkeypatch):
+    monkeypatch.setenv("STREAM_PARTIAL_INTERVAL_MS", "400")
+    transcriber = PromptRecordingTranscriber()
+    client = TestClient(create_app(TranscriptionService(transcriber)))
+    speech_chunk = make_speech_chunk()
+
+    with client.websocket_connect("/api/stream") as websocket:
+        websocket.receive_json()  # ready
+        for _ in range(2):
+            for _ in range(5):
+                websocket.send_bytes(speech_chunk)
+            websocket.receive_json()  # partial
+        for _ in range(10):
+            websocket.send_bytes(SILENCE_CHUNK)
+        final = websocket.receive_json()
+        for _ in range(5):
+            websocket.send_bytes(speech_chunk)
+        websocket.receive_json()  # partial of the next utterance
+
+    assert_that(final["text"], equal_to("take 3"))
+    assert_that(transcriber.prompts, equal_to([None, None, None, "take 3"]))
+
+
+def test_websocket_stream_closes_when_over_memory_cap(client, monkeypatch):
+    """A connection whose buffered audio exceeds the cap is told and closed."""
+    monkeypatch.setenv("STREAM_MAX_CONNECTION_MB", "0.01")
+
+    with client.websocket_connect("/api/stream") as websocket:
+        websocket.receive_json()  # ready
+        websocket.send_bytes(make_speech_chunk())
+        error = websocket.receive_json()
+        closed = websocket.receive()
+
+    assert_that(error["type"], equal_to("error"))
+    assert_that(closed["code"], equal_to(1013))
+    assert_that(client.get("/api/stream/metrics").json()["overflows"], equal_to(1))
+
+
+def test_stream_metrics_count_connections_and_segments(client):
+    with client.websocket_connect("/api/stream") as websocket:
+        websocket.receive_json()  # ready
+        for _ in range(5):  # 500ms of "speech"
+            websocket.send_bytes(make_speech_chunk())
+        for _ in range(10):  # 1000ms of silence
+            websocket.send_bytes(SILENCE_CHUNK)
+        websocket.receive_json()  # final
+
+    metrics = client.get("/api/stream/metrics").json()
+
+    assert_that(metrics["connections"], equal_to(1))
+    assert_that(metrics["active_connections"], equal_to(0))
+    assert_that(metrics["segments"], equal_to(1))
+
+
+def test_websocket_stream_decodes_negotiated_webm_opus(client):
+    """After a start message naming webm, binary messages are WebM/Opus."""
+    from tests.fakes.opus_audio import opus_container
+
+    data = opus_container("webm", seconds=1.0)
+
+    with client.websocket_connect("/api/stream") as websocket:
+        websocket.receive_json()  # ready
+        websocket.send_json({"type": "start", "format": "webm"})
+        for start in range(0, len(data), 1000):
+            websocket.send_bytes(data[start:start + 1000])
+        websocket.send_json({"type": "end_of_speech"})
+        result = websocket.receive_json()
+
+    assert_that(result["type"], equal_to("final"))
+
+
+def test_websocket_stream_rejects_unknown_format(client):
+    with client.websocket_connect("/api/stream") as websocket:
+        websocket.receive_json()  # ready
+        websocket.send_json({"type": "start", "format": "mp3"})
+        error = websocket.receive_json()
+        closed = websocket.receive()
+
+    assert_that(error["type"], equal_to("error"))
+    assert_that(closed["code"], equal_to(1003))
+
+
+def test_websocket_stream_appends_finals_to_bound_document(fake_transcriber):
+    repository = FakeDocumentRepository()
+    doc = repository.save(a_document().with_content("Dear Sir,").build())
+    client = TestClient(create_app(TranscriptionService(fake_transcriber), repository))
+
+    with client.websocket_connect("/api/stream") as websocket:
+        websocket.receive_json()  # ready
+        websocket.send_json({"type": "start", "document_id": doc.id})
+        for _ in range(2):
+            websocket.send_bytes(b"\x00\x01" * 1600)
+            websocket.send_json({"type": "end_of_speech"})
+        finals = [websocket.receive_json(), websocket.receive_json()]
+
+    assert_that([final["version"] for final in finals], equal_to([1, 2]))
+    assert_that(
+        repository.load(doc.id).content,  # type: ignore[arg-type, union-attr]
+        equal_to("Dear Sir, fake transcription fake transcription"),
+    )
+
+
+def test_websocket_stream_rejects_unknown_document(fake_transcriber):
+    client = TestClient(
+        create_app(TranscriptionService(fake_transcriber), FakeDocumentRepository())
+    )
+
+    with client.websocket_connect("/api/stream") as websocket:
+        websocket.receive_json()  # ready
+        websocket.send_json({"type": "start", "document_id": 99})
+        error = websocket.receive_json()
+        closed = websocket.receive()
+
+    assert_that(error["message"], equal_to("Document not found"))
+    assert_that(closed["code"], equal_to(1008))
+
+
+def test_websocket_stream_stores_audio_of_bound_document(fake_transcriber, tmp_path):
+    from great_dictator.adapters.outbound.pack_audio_store import PackAudioStore
+
+    repository = FakeDocumentRepository()
+    doc = repository.save(a_document().with_content("Dear Sir,").build())
+    audio_store = PackAudioStore(str(tmp_path / "audio"))
+    client = TestClient(
+        create_app(
+            TranscriptionService(fake_transcriber), repository, audio_store=audio_store
+        )
+    )
+
+    with client.websocket_connect("/api/stream") as websocket:
+        websocket.receive_json()  # ready
+        websocket.send_json({"type": "start", "document_id": doc.id})
+        for _ in range(2):
+            websocket.send_bytes(b"\x00\x01" * 1600)
+            websocket.send_json({"type": "end_of_speech"})
+        websocket.receive_json()
+        websocket.receive_json()
+
+    content = repository.load(doc.id).content  # type: ignore[arg-type, union-attr]
+    spans = [(c.text_start, c.text_end) for c in audio_store.chunks(doc.id)]  # type: ignore[arg-type]
+    assert_that(
+        [content[start:end] for start, end in spans],
+        equal_to(["fake transcription", "fake transcription"]),
+    )
+    assert_that(audio_store.duration(doc.id), greater_than(0))  # type: ignore[arg-type]
+
+
+class FixedTranscriber(TranscriberPort):
+    def __init__(self, text: str):
+        self._text = text
+
+    def transcribe(self, audio):
+        return TranscriptionResult(text=self._text, language="en")
+
+
+def two_pass_app(repository=None, audio_store=None):
+    return create_app(
+        TranscriptionService(FixedTranscriber("I write")),
+        repository,
+        audio_store=audio_store,
+        draft_service=TranscriptionService(FixedTranscriber("I right")),
+    )
+
+
+def test_websocket_stream_revises_drafts_with_the_main_model():
+    client = TestClient(two_pass_app())
+
+    with client.websocket_connect("/api/stream") as websocket:
+        websocket.receive_json()  # ready
+        websocket.send_bytes(b"\x00\x01" * 1600)
+        websocket.send_json({"type": "end_of_speech"})
+        messages = [websocket.receive_json(), websocket.receive_json()]
+
+    assert_that(
+        messages,
+        equal_to([
+            {"type": "final", "text": "I right", "segment": 0, "draft": True},
+            {"type": "revised", "text": "I write", "segment": 0},
+        ]),
+    )
+
+
+def test_websocket_stream_revises_bound_document():
+    repository = FakeDocumentRepository()
+    doc = repository.save(a_document().with_content("Dear Sir,").build())
+    client = TestClient(two_pass_app(repository))
+
+    with client.websocket_connect("/api/stream") as websocket:
+        websocket.receive_json()  # ready
+        websocket.send_json({"type": "start", "document_id": doc.id})
+        for _ in range(2):
+            websocket.send_bytes(b"\x00\x01" * 1600)
+            websocket.send_json({"type": "end_of_speech"})
+        messages = [websocket.receive_json() for _ in range(4)]
+
+    revised = [m for m in messages if m["type"] == "revised"]
+    assert_that([m["segment"] for m in revised], equal_to([0, 1]))
+    assert_that(
+        repository.load(doc.id).content,  # type: ignore[arg-type, union-attr]
+        equal_to("Dear Sir, I write I write"),
+    )
+
+
+def test_revised_drafts_are_retranscribed_where_they_now_are(tmp_path):
+    from great_dictator.adapters.outbound.pack_audio_store import PackAudioStore
+    from great_dictator.adapters.outbound.sqlite_job_queue import SqliteJobQueue
+    from great_dictator.domain.retranscription import RetranscriptionWorker
+
+    repository = FakeDocumentRepository()
+    doc = repository.save(a_document().with_content("Dear Sir,").build())
+    audio_store = PackAudioStore(str(tmp_path / "audio"))
+    queue = SqliteJobQueue(str(tmp_path / "documents.db"))
+    client = TestClient(two_pass_app(repository, audio_store))
+
+    with client.websocket_connect("/api/stream") as websocket:
+        websocket.receive_json()  # ready
+        websocket.send_json({"type": "start", "document_id": doc.id})
+        for _ in range(2):
+            websocket.send_bytes(b"\x00\x01" * 1600)
+            websocket.send_json({"type": "end_of_speech"})
+        [websocket.receive_json() for _ in range(4)]
+
+    def retranscribe(text):
+        queue.enqueue(doc.id)  # type: ignore[arg-type]
+        RetranscriptionWorker(
+            queue, audio_store, repository, FixedTranscriber(text)
+        ).run_once()
+        content = repository.load(doc.id).content  # type: ignore[arg-type, union-attr]
+        chunks = audio_store.chunks(doc.id)  # type: ignore[arg-type]
+        return content, [content[c.text_start:c.text_end] for c in chunks]
+
+    assert_that(
+        retranscribe("I definitely wrote"),
+        equal_to((
+            "Dear Sir, I definitely wrote I definitely wrote",
+            ["I definitely wrote", "I definitely wrote"],
+        )),
+    )
+    assert_that(
+        retranscribe("I wrote"),
+        equal_to(("Dear Sir, I wrote I wrote", ["I wrote", "I wrote"])),
+    )
+    queue.close()
+    audio_store.close()
@@ -2,7 +2,7 @@ from io import BytesIO
 from pathlib import Path
 
 import pytest
-from hamcrest import assert_that, contains_string
+from hamcrest import assert_that, contains_string, equal_to
 
 from great_dictator.adapters.outbound.whisper_transcriber import WhisperTranscriber
 
@@ -58,3 +58,66 @@ def test_transcriber_serializes_concurrent_calls(whisper_transcriber, test_audio
         f"Calls may have run in parallel: concurrent={concurrent_time:.3f}s, "
         f"single={single_call_time:.3f}s, ratio={concurrent_time/single_call_time:.2f}"
     )
+
+
+def test_pooled_transcriber_returns_text_from_audio(test_audio_bytes):
+    from great_dictator.adapters.outbound.whisper_transcriber import (
+        PooledWhisperTranscriber,
+    )
+
+    transcriber = PooledWhisperTranscriber(replicas=2, model_size="tiny")
+
+    result = transcriber.transcribe(test_audio_bytes)
+
+    assert_that(result.text.lower(), contains_string("hello"))
+    assert transcriber.stats().completed == 1
+    transcriber.close()
+
+
+def test_process_pool_transcriber_returns_text_from_audio(test_audio_bytes):
+    from great_dictator.adapters.outbound.process_whisper_transcriber import (
+        ProcessPoolWhisperTranscriber,
+    )
+
+    transcriber = ProcessPoolWhisperTranscriber(processes=1, model_size="tiny")
+    try:
+        result = transcriber.transcribe(test_audio_bytes)
+    finally:
+        transcriber.close()
+
+    assert_that(result.text.lower(), contains_string("hello"))
+
+
+def test_process_pool_transcriber_recycles_workers(test_audio_bytes):
+    from great_dictator.adapters.outbound.process_whisper_transcriber import (
+        ProcessPoolWhisperTranscriber,
+    )
+
+    transcriber = ProcessPoolWhisperTranscriber(
+        processes=1, model_size="tiny", max_jobs_per_worker=1
+    )
+    try:
+        first = transcriber.transcribe(BytesIO(test_audio_bytes.getvalue()))
+        second = transcriber.transcribe(BytesIO(test_audio_bytes.getvalue()))
+    finally:
+        transcriber.close()
+
+    assert_that(second.text, equal_to(first.text))
+
+
+def test_batched_clips_match_their_single_transcriptions(
+    whisper_transcriber, test_audio_bytes
+):
+    import numpy as np
+    from faster_whisper import decode_audio
+
+    samples = decode_audio(BytesIO(test_audio_bytes.getvalue()))
+    silence = np.zeros(16000, dtype=np.float32)
+    padded = np.concatenate([silence, samples, silence])
+
+    batched = whisper_transcriber.transcribe_batch([samples, padded])
+
+    single = whisper_transcriber.transcribe_pcm(padded)
+    assert_that(batched[1].text, equal_to(batched[0].text))
+    assert_that(batched[1].language, equal_to(single.language))
+    assert_that(batched[0].text.lower(), contains_string("hello"))
@@ -0,0 +1,78 @@
+"""Unit tests for cross-request batching of transcriptions."""
+import threading
+from io import BytesIO
+
+from hamcrest import assert_that, contains_exactly, equal_to
+
+from great_dictator.adapters.outbound.batching_transcriber import BatchingTranscriber
+from great_dictator.domain.transcription import TranscriberPort, TranscriptionResult
+
+
+class EchoTranscriber(TranscriberPort):
+    """Returns each clip's bytes as its text and records batch sizes."""
+
+    def __init__(self, fail_on: bytes | None = None) -> None:
+        self.batch_sizes: list[int] = []
+        self._fail_on = fail_on
+
+    def transcribe(self, audio: BytesIO) -> TranscriptionResult:
+        data = audio.read()
+        if data == self._fail_on:
+            raise ValueError("bad audio")
+        return TranscriptionResult(text=data.decode(), language="en")
+
+    def transcribe_batch(self, audios: list[BytesIO]) -> list[TranscriptionResult]:
+        self.batch_sizes.append(len(audios))
+        return [self.transcribe(audio) for audio in audios]
+
+
+def transcribe_concurrently(transcriber: TranscriberPort, clips: list[bytes]) -> list[object]:
+    results: list[object] = [None] * len(clips)
+
+    def call(i: int) -> None:
+        try:
+            results[i] = transcriber.transcribe(BytesIO(clips[i])).text
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(len(clips))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_calls_are_batched_and_results_routed_back():
+    inner = EchoTranscriber()
+    batcher = BatchingTranscriber(inner, max_batch_size=4, max_wait_ms=200)
+
+    results = transcribe_concurrently(batcher, [b"a", b"b", b"c", b"d"])
+    batcher.close()
+
+    assert_that(results, contains_exactly("a", "b", "c", "d"))
+    assert_that(inner.batch_sizes, equal_to([4]))
+    assert_that(batcher.stats().largest_batch, equal_to(4))
+
+
+def test_batch_size_is_capped():
+    inner = EchoTranscriber()
+    batcher = BatchingTranscriber(inner, max_batch_size=2, max_wait_ms=200)
+
+    transcribe_concurrently(batcher, [b"a", b"b", b"c", b"d"])
+    batcher.close()
+
+    assert_that(max(inner.batch_sizes), equal_to(2))
+    assert_that(batcher.stats().clips, equal_to(4))
+
+
+def test_bad_clip_does_not_fail_its_batch_mates():
+    inner = EchoTranscriber(fail_on=b"bad")
+    batcher = BatchingTranscriber(inner, max_batch_size=3, max_wait_ms=200)
+
+    results = transcribe_concurrently(batcher, [b"a", b"bad", b"c"])
+    batcher.close()
+
+    assert_that(results[0], equal_to("a"))
+    assert isinstance(results[1], ValueError)
+    assert_that(results[2], equal_to("c"))
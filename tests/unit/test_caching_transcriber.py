@@ -0,0 +1,189 @@
+"""Unit tests for the transcription result cache."""
+import sqlite3
+import threading
+from io import BytesIO
+
+import numpy as np
+from hamcrest import assert_that, contains_exactly, equal_to, has_properties
+
+from great_dictator.adapters.outbound.caching_transcriber import CachingTranscriber
+from great_dictator.domain.transcription import TranscriberPort, TranscriptionResult
+
+
+class CountingTranscriber(TranscriberPort):
+    """Names each transcript after the audio; counts model runs."""
+
+    def __init__(self, gate: threading.Event | None = None) -> None:
+        self.calls = 0
+        self.batches: list[int] = []
+        self._gate = gate
+
+    def transcribe(self, audio: BytesIO) -> TranscriptionResult:
+        self.calls += 1
+        if self._gate is not None:
+            self._gate.wait(timeout=5)
+        return TranscriptionResult(text=audio.read().decode(), language="en")
+
+    def transcribe_pcm(self, samples, prompt=None) -> TranscriptionResult:
+        self.calls += 1
+        return TranscriptionResult(text=f"{len(samples)} samples {prompt}", language="en")
+
+    def transcribe_batch(self, audios):
+        self.batches.append(len(audios))
+        return [self.transcribe(audio) for audio in audios]
+
+
+def test_repeated_audio_is_transcribed_once():
+    inner = CountingTranscriber()
+    cache = CachingTranscriber(inner)
+
+    first = cache.transcribe(BytesIO(b"hello"))
+    second = cache.transcribe(BytesIO(b"hello"))
+
+    assert_that(second, equal_to(first))
+    assert_that(inner.calls, equal_to(1))
+    assert_that(cache.stats(), has_properties(hits=1, misses=1, entries=1))
+
+
+def test_file_is_rewound_after_hashing():
+    inner = CountingTranscriber()
+    cache = CachingTranscriber(inner)
+    audio = BytesIO(b"hello")
+    audio.seek(3)
+
+    result = cache.transcribe(audio)
+
+    assert_that(result.text, equal_to("hello"))
+
+
+def test_prompt_and_namespace_are_part_of_the_key():
+    inner = CountingTranscriber()
+    samples = np.zeros(160, dtype=np.float32)
+    cache = CachingTranscriber(inner, namespace="large-v3")
+
+    cache.transcribe_pcm(samples, "one")
+    cache.transcribe_pcm(samples, "two")
+    cache.transcribe_pcm(samples, "one")
+    CachingTranscriber(inner, namespace="small").transcribe_pcm(samples, "one")
+
+    assert_that(inner.calls, equal_to(3))
+
+
+def test_least_recently_used_results_are_evicted_by_size():
+    inner = CountingTranscriber()
+    cache = CachingTranscriber(inner, max_bytes=700)
+
+    cache.transcribe(BytesIO(b"a"))
+    cache.transcribe(BytesIO(b"b"))
+    cache.transcribe(BytesIO(b"a"))  # "a" is now the most recent
+    cache.transcribe(BytesIO(b"c"))  # evicts "b"
+    cache.transcribe(BytesIO(b"a"))
+    cache.transcribe(BytesIO(b"b"))
+
+    assert_that(inner.calls, equal_to(4))
+    assert_that(cache.stats().entries, equal_to(2))
+
+
+def test_disk_tier_survives_a_new_cache(tmp_path):
+    path = str(tmp_path / "cache.db")
+    inner = CountingTranscriber()
+    CachingTranscriber(inner, disk_path=path).transcribe(BytesIO(b"hello"))
+
+    restarted = CachingTranscriber(inner, disk_path=path)
+    result = restarted.transcribe(BytesIO(b"hello"))
+
+    assert_that(result.text, equal_to("hello"))
+    assert_that(inner.calls, equal_to(1))
+    assert_that(restarted.stats(), has_properties(disk_hits=1, misses=0))
+
+
+def test_disk_tier_evicts_the_least_recently_read_once_over_its_size(tmp_path):
+    inner = CountingTranscriber()
+    # Nothing fits in memory, so every lookup reads the disk tier
+    cache = CachingTranscriber(
+        inner, max_bytes=1, disk_path=str(tmp_path / "cache.db"), disk_max_bytes=700
+    )
+    cache.transcribe(BytesIO(b"first"))
+    cache.transcribe(BytesIO(b"second"))
+    cache.transcribe(BytesIO(b"first"))
+
+    cache.transcribe(BytesIO(b"third"))
+    cache.transcribe(BytesIO(b"first"))
+    cache.transcribe(BytesIO(b"third"))
+    cache.transcribe(BytesIO(b"second"))
+
+    assert_that(inner.calls, equal_to(4))
+    assert_that(cache.stats(), has_properties(disk_hits=3, misses=4))
+    cache.close()
+
+
+def test_disk_tier_keeps_one_connection_per_thread(tmp_path, monkeypatch):
+    opened = []
+    connect = sqlite3.connect
+
+    def counting_connect(*args, **kwargs):
+        opened.append(args)
+        return connect(*args, **kwargs)
+
+    monkeypatch.setattr(sqlite3, "connect", counting_connect)
+    cache = CachingTranscriber(
+        CountingTranscriber(), max_bytes=1, disk_path=str(tmp_path / "cache.db")
+    )
+
+    for _ in range(3):
+        cache.transcribe(BytesIO(b"hello"))
+
+    assert_that(len(opened), equal_to(1))
+    cache.close()
+
+
+def test_concurrent_identical_requests_share_one_transcription():
+    gate = threading.Event()
+    inner = CountingTranscriber(gate)
+    cache = CachingTranscriber(inner)
+    results: list[TranscriptionResult] = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.transcribe(BytesIO(b"hi"))))
+        for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    while cache.stats().coalesced < 2:
+        threading.Event().wait(0.01)
+    gate.set()
+    for thread in threads:
+        thread.join()
+
+    assert_that(inner.calls, equal_to(1))
+    assert_that([r.text for r in results], contains_exactly("hi", "hi", "hi"))
+
+
+def test_batch_sends_only_misses_to_the_model():
+    inner = CountingTranscriber()
+    cache = CachingTranscriber(inner)
+    cache.transcribe(BytesIO(b"a"))
+
+    results = cache.transcribe_batch([BytesIO(b"a"), BytesIO(b"b"), BytesIO(b"c")])
+
+    assert_that([r.text for r in results], contains_exactly("a", "b", "c"))
+    assert_that(inner.batches, contains_exactly(2))
+
+
+def test_failures_are_not_cached():
+    class FlakyTranscriber(CountingTranscriber):
+        def transcribe(self, audio):
+            self.calls += 1
+            if self.calls == 1:
+                raise RuntimeError("model crashed")
+            return super().transcribe(audio)
+
+    inner = FlakyTranscriber()
+    cache = CachingTranscriber(inner)
+    try:
+        cache.transcribe(BytesIO(b"hello"))
+    except RuntimeError:
+        pass
+
+    result = cache.transcribe(BytesIO(b"hello"))
+
+    assert_that(result.text, equal_to("hello"))
@@ -1,9 +1,17 @@
+import threading
 from datetime import datetime
 
 import pytest
 from hamcrest import assert_that, equal_to, is_
 
-from great_dictator.domain.document import Document, DocumentSummary
+from great_dictator.domain.document import (
+    Document,
+    DocumentCursor,
+    DocumentSummary,
+    OffloadedDocumentRepository,
+    TextPatch,
+)
+from tests.fakes.fake_document_repository import FakeDocumentRepository
 
 
 def test_document_is_frozen():
@@ -50,3 +58,67 @@ def test_document_summary_has_required_fields():
 
     assert_that(summary.id, equal_to(1))
     assert_that(summary.name, equal_to("test doc"))
+
+
+def test_document_cursor_round_trips_through_its_token():
+    cursor = DocumentCursor(created=datetime(2024, 1, 15, 10, 30, 5, 123), id=42)
+
+    assert_that(DocumentCursor.decode(cursor.encode()), equal_to(cursor))
+
+
+def test_document_cursor_rejects_malformed_token():
+    with pytest.raises(ValueError):
+        DocumentCursor.decode("not a cursor")
+
+
+@pytest.mark.parametrize(
+    "old, new, patch",
+    [
+        ("hello", "hello world", TextPatch(5, 5, " world")),
+        ("hello world", "hello", TextPatch(5, 11, "")),
+        ("the cat sat", "the dog sat", TextPatch(4, 7, "dog")),
+        ("aaa", "aaaa", TextPatch(3, 3, "a")),
+        ("same", "same", TextPatch(4, 4, "")),
+    ],
+)
+def test_text_patch_between_covers_only_the_changed_range(old, new, patch):
+    assert_that(TextPatch.between(old, new), equal_to(patch))
+    assert_that(patch.apply(old), equal_to(new))
+
+
+def test_text_patch_outside_content_is_rejected():
+    with pytest.raises(ValueError):
+        TextPatch(2, 9, "x").apply("abc")
+
+
+class ThreadRecordingRepository(FakeDocumentRepository):
+    def __init__(self) -> None:
+        super().__init__()
+        self.threads: list[tuple[str, str]] = []
+
+    def save(self, document: Document) -> Document:
+        self.threads.append(("save", threading.current_thread().name))
+        return super().save(document)
+
+    def load(self, document_id: int) -> Document | None:
+        self.threads.append(("load", threading.current_thread().name))
+        return super().load(document_id)
+
+
+async def test_offloaded_repository_runs_reads_and_writes_off_the_event_loop():
+    inner = ThreadRecordingRepository()
+    repository = OffloadedDocumentRepository(inner)
+    doc = Document(
+        user="romilly",
+        name="test doc",
+        content="hello world",
+        created=datetime(2024, 1, 15, 10, 30),
+    )
+
+    saved = await repository.save(doc)
+    loaded = await repository.load(saved.id)  # type: ignore[arg-type]
+    repository.close()
+
+    assert_that(loaded, equal_to(saved))
+    assert_that(inner.threads[0][1].startswith("document-writer"), is_(True))
+    assert_that(inner.threads[1][1].startswith("document-reader"), is_(True))
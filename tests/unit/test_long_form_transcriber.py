@@ -0,0 +1,151 @@
+"""Unit tests for chunked long-form transcription."""
+import threading
+import wave
+from io import BytesIO
+
+import numpy as np
+from hamcrest import assert_that, contains_exactly, equal_to
+
+from great_dictator.adapters.outbound import long_form_transcriber
+from great_dictator.adapters.outbound.long_form_transcriber import (
+    LongFormTranscriber,
+    plan_chunks,
+    probe_duration,
+)
+from great_dictator.domain.transcription import TranscriberPort, TranscriptionResult
+
+SECOND = 16000
+
+
+class ChunkRecordingTranscriber(TranscriberPort):
+    """Names each chunk by its first sample, which the tests set to its offset."""
+
+    def __init__(self) -> None:
+        self.chunks: list[tuple[int, int]] = []
+        self._lock = threading.Lock()
+
+    def transcribe(self, audio: BytesIO) -> TranscriptionResult:
+        raise AssertionError("long-form transcription passes samples")
+
+    def transcribe_pcm(self, samples, prompt=None) -> TranscriptionResult:
+        with self._lock:
+            self.chunks.append((int(samples[0]), len(samples)))
+        return TranscriptionResult(text=f"chunk {int(samples[0])}", language="en")
+
+
+def a_wav(seconds: float) -> BytesIO:
+    audio = BytesIO()
+    with wave.open(audio, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SECOND)
+        wav.writeframes(bytes(2 * int(seconds * SECOND)))
+    audio.seek(0)
+    return audio
+
+
+def test_plan_chunks_packs_speech_and_does_not_overlap_at_silences():
+    speech = [
+        {"start": 0, "end": 10},
+        {"start": 12, "end": 20},
+        {"start": 25, "end": 40},
+        {"start": 41, "end": 45},
+    ]
+
+    chunks = plan_chunks(speech, max_chunk=20, overlap=3)
+
+    assert_that(chunks, contains_exactly((0, 20), (25, 45)))
+
+
+def test_plan_chunks_overlaps_where_the_vad_cut_speech():
+    speech = [{"start": 0, "end": 15}, {"start": 15, "end": 30}]
+
+    chunks = plan_chunks(speech, max_chunk=20, overlap=3)
+
+    assert_that(chunks, contains_exactly((0, 15), (12, 30)))
+
+
+def test_plan_chunks_keeps_the_overlap_within_the_chunk_limit():
+    speech = [
+        {"start": 0, "end": 18},
+        {"start": 18, "end": 36},
+        {"start": 36, "end": 38},
+    ]
+
+    chunks = plan_chunks(speech, max_chunk=20, overlap=3)
+
+    assert_that(chunks, contains_exactly((0, 18), (16, 36), (33, 38)))
+    assert_that(max(end - start for start, end in chunks), equal_to(20))
+
+
+def test_short_audio_is_transcribed_in_one_piece():
+    inner = ChunkRecordingTranscriber()
+    transcriber = LongFormTranscriber(inner, min_duration_s=10)
+
+    transcriber.transcribe_pcm(np.arange(5 * SECOND, dtype=np.float32))
+
+    assert_that(inner.chunks, contains_exactly((0, 5 * SECOND)))
+    transcriber.close()
+
+
+def test_long_audio_is_split_at_speech_and_stitched_in_order(monkeypatch):
+    vad_options = []
+
+    def speech_timestamps(samples, options):
+        vad_options.append(options)
+        return [
+            {"start": 0, "end": 20 * SECOND},
+            {"start": 25 * SECOND, "end": 50 * SECOND},
+            {"start": 50 * SECOND, "end": 70 * SECOND},
+        ]
+
+    monkeypatch.setattr(long_form_transcriber, "get_speech_timestamps", speech_timestamps)
+    inner = ChunkRecordingTranscriber()
+    transcriber = LongFormTranscriber(
+        inner, min_duration_s=60, chunk_s=30, overlap_s=1, parallelism=3
+    )
+
+    result = transcriber.transcribe_pcm(np.arange(80 * SECOND, dtype=np.float32))
+
+    assert_that(
+        result.text, equal_to(f"chunk 0 chunk {25 * SECOND} chunk {49 * SECOND}")
+    )
+    assert_that(sorted(inner.chunks), contains_exactly(
+        (0, 20 * SECOND), (25 * SECOND, 25 * SECOND), (49 * SECOND, 21 * SECOND)
+    ))
+    assert_that(vad_options[0].max_speech_duration_s, equal_to(29))
+    transcriber.close()
+
+
+def test_probe_reads_the_length_from_the_container():
+    audio = a_wav(2.5)
+
+    assert_that(probe_duration(audio), equal_to(2.5))
+    assert_that(audio.tell(), equal_to(0))
+    assert_that(probe_duration(BytesIO(b"not audio" * 10)), equal_to(None))
+
+
+def test_short_files_are_passed_on_without_decoding(monkeypatch):
+    def no_decoding(*args, **kwargs):
+        raise AssertionError("short files are not decoded")
+
+    monkeypatch.setattr(long_form_transcriber, "decode_audio", no_decoding)
+
+    class FileTranscriber(ChunkRecordingTranscriber):
+        def transcribe(self, audio):
+            return TranscriptionResult(text="whole file", language="en")
+
+    transcriber = LongFormTranscriber(FileTranscriber(), min_duration_s=10)
+
+    assert_that(transcriber.transcribe(a_wav(5)).text, equal_to("whole file"))
+    transcriber.close()
+
+
+def test_long_files_are_decoded_and_split():
+    inner = ChunkRecordingTranscriber()
+    transcriber = LongFormTranscriber(inner, min_duration_s=1)
+
+    transcriber.transcribe(a_wav(2))
+
+    assert_that(inner.chunks, contains_exactly((0, 2 * SECOND)))
+    transcriber.close()
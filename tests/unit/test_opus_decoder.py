@@ -0,0 +1,56 @@
+"""Unit tests for incremental Opus stream decoding."""
+import pytest
+from hamcrest import assert_that, equal_to, greater_than, is_, none
+
+from great_dictator.adapters.inbound.opus_decoder import (
+    StreamDecodeError,
+    create_stream_decoder,
+)
+from tests.fakes.opus_audio import opus_container, opus_packets
+
+ONE_SECOND_PCM = 16000 * 2
+
+
+@pytest.mark.parametrize("container_format", ["webm", "ogg"])
+def test_container_decoder_yields_pcm_before_the_stream_ends(container_format):
+    data = opus_container(container_format, seconds=2.0)
+    decoder = create_stream_decoder(container_format)
+
+    early = b"".join(decoder.feed(data[i:i + 1000]) for i in range(0, len(data), 1000))
+    total = len(early) + len(decoder.close())
+
+    assert_that(len(early), greater_than(ONE_SECOND_PCM))
+    assert_that(total, equal_to(2 * ONE_SECOND_PCM))
+
+
+def test_packet_decoder_decodes_each_packet():
+    decoder = create_stream_decoder("opus")
+
+    pcm = b"".join(decoder.feed(packet) for packet in opus_packets(seconds=1.0))
+
+    assert_that(len(pcm), greater_than(ONE_SECOND_PCM - 1000))
+
+
+def test_pcm_needs_no_decoder():
+    assert_that(create_stream_decoder("pcm"), is_(none()))
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(StreamDecodeError):
+        create_stream_decoder("mp3")
+
+
+def test_corrupt_container_raises_on_feed_or_close():
+    decoder = create_stream_decoder("webm")
+
+    with pytest.raises(StreamDecodeError):
+        decoder.feed(b"not a webm file" * 100)
+        decoder.close()
+
+
+def test_l16_decoder_swaps_byte_order_across_chunks():
+    decoder = create_stream_decoder("l16")
+
+    pcm = decoder.feed(b"\x01\x02\x03") + decoder.feed(b"\x04")
+
+    assert_that(pcm, equal_to(b"\x02\x01\x04\x03"))
@@ -0,0 +1,145 @@
+"""Unit tests for PCM buffering and VAD segmentation."""
+import struct
+import wave
+from io import BytesIO
+
+import pytest
+from hamcrest import assert_that, contains_exactly, equal_to, has_length, is_
+
+from great_dictator.adapters.inbound.pcm_segmenter import (
+    FrameSplitter,
+    PcmBuffer,
+    PcmSegmenter,
+    parse_wav_header,
+)
+
+FRAME_BYTES = 960  # 30ms at 16kHz, 16-bit
+
+
+class LoudnessVad:
+    """Treats any frame with a non-zero byte as speech."""
+
+    def is_speech(self, buf: bytes, sample_rate: int) -> bool:
+        return any(bytes(buf))
+
+
+def speech(ms: int) -> bytes:
+    return b"\x10\x27" * (16 * ms)
+
+
+def silence(ms: int) -> bytes:
+    return b"\x00\x00" * (16 * ms)
+
+
+def test_frame_splitter_joins_frames_across_chunks():
+    splitter = FrameSplitter(4)
+
+    first = [bytes(f) for f in splitter.frames(memoryview(b"abcdef"))]
+    second = [bytes(f) for f in splitter.frames(memoryview(b"ghij"))]
+
+    assert_that(first, contains_exactly(b"abcd"))
+    assert_that(second, contains_exactly(b"efgh"))
+
+
+def test_buffer_grows_and_detaches_a_valid_wav():
+    buffer = PcmBuffer(capacity=4)
+    buffer.extend(memoryview(b"\x01\x00\x02\x00"))
+    buffer.extend(memoryview(b"\x03\x00"))
+
+    segment = buffer.detach()
+
+    with wave.open(BytesIO(segment.wav()), "rb") as wav_file:
+        assert_that(wav_file.getframerate(), equal_to(16000))
+        assert_that(wav_file.readframes(10), equal_to(b"\x01\x00\x02\x00\x03\x00"))
+    assert_that(len(buffer), equal_to(0))
+
+
+def test_segment_samples_are_normalised_floats():
+    buffer = PcmBuffer()
+    buffer.extend(memoryview(b"\x00\x40\x00\xc0"))  # 16384, -16384
+
+    samples = buffer.detach().samples()
+
+    assert_that(list(samples), equal_to([0.5, -0.5]))
+    assert_that(samples.dtype.name, equal_to("float32"))
+
+
+def test_segmenter_cuts_after_silence_following_speech():
+    segmenter = PcmSegmenter(LoudnessVad(), silence_threshold_ms=300, min_speech_ms=100)
+
+    assert_that(segmenter.feed(speech(600)), has_length(0))
+    finished = segmenter.feed(silence(300))
+
+    assert_that(finished, has_length(1))
+    assert_that(segmenter.has_audio, is_(False))
+
+
+def test_segmenter_drops_segments_with_too_little_speech():
+    segmenter = PcmSegmenter(LoudnessVad(), silence_threshold_ms=300, min_speech_ms=300)
+
+    finished = segmenter.feed(speech(60) + silence(600))
+
+    assert_that(finished, has_length(0))
+
+
+def test_forced_flush_keeps_short_segments():
+    segmenter = PcmSegmenter(LoudnessVad(), min_speech_ms=300)
+    segmenter.feed(speech(60))
+
+    segment = segmenter.flush(force=True)
+
+    assert segment is not None
+    assert_that(segment.duration_ms, equal_to(60))
+
+
+def test_segmenter_keeps_only_pre_roll_before_speech():
+    segmenter = PcmSegmenter(LoudnessVad(), min_speech_ms=0, pre_roll_ms=90)
+
+    segmenter.feed(silence(3000) + speech(60))
+    segment = segmenter.flush(force=True)
+
+    assert segment is not None
+    assert_that(segment.duration_ms, equal_to(150))
+    assert_that(segmenter.stats().trimmed_ms, equal_to(2910))
+
+
+def test_segmenter_splits_long_speech_at_the_quietest_frame():
+    segmenter = PcmSegmenter(
+        LoudnessVad(), max_segment_ms=900, split_window_ms=300, pre_roll_ms=0
+    )
+    quiet = b"\x01\x00" * (16 * 30)  # Still speech to the VAD, but low energy
+
+    finished = segmenter.feed(speech(720) + quiet + speech(150))
+
+    assert_that(finished, has_length(1))
+    assert_that(finished[0].duration_ms, equal_to(720))
+    assert_that(segmenter.buffered_ms, equal_to(180))
+    assert_that(segmenter.stats().forced_splits, equal_to(1))
+
+
+def test_detached_segments_release_spare_capacity():
+    segmenter = PcmSegmenter(LoudnessVad(), silence_threshold_ms=300, min_speech_ms=0)
+
+    (segment,) = segmenter.feed(speech(1200) + silence(300))
+
+    assert_that(segment.nbytes, equal_to(44 + 1500 * 32))
+
+
+def test_wav_header_locates_samples_past_extra_chunks():
+    header = struct.pack(
+        "<4sI4s4sIHHIIHH", b"RIFF", 0, b"WAVE", b"fmt ", 16, 1, 1, 16000, 32000, 2, 16
+    )
+    data = header + b"LIST" + struct.pack("<I", 3) + b"abc\x00" + b"data" + struct.pack(
+        "<I", 4
+    ) + b"\x01\x00\x02\x00"
+
+    info = parse_wav_header(data)
+
+    assert_that(info.is_native, is_(True))
+    samples = data[info.data_offset:info.data_offset + info.data_size]
+    assert_that(samples, equal_to(b"\x01\x00\x02\x00"))
+
+
+def test_wav_header_rejects_other_files():
+    with pytest.raises(ValueError):
+        parse_wav_header(b"OggS" + b"\x00" * 40)
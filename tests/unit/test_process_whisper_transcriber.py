@@ -0,0 +1,104 @@
+"""Unit tests for worker process supervision, with a stub in place of the model."""
+import os
+import time
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pytest
+from hamcrest import assert_that, calling, equal_to, is_not, raises
+
+from great_dictator.adapters.outbound import process_whisper_transcriber
+from great_dictator.adapters.outbound.process_whisper_transcriber import (
+    ProcessPoolWhisperTranscriber,
+)
+from great_dictator.domain.transcription import TranscriptionResult
+
+SAMPLES = np.zeros(1600, dtype=np.float32)
+
+
+def stub_worker(conn, *model_args):
+    """Serves jobs like the model worker; the prompt says how to misbehave.
+
+    Module level, so the spawned worker process can import it.
+    """
+    while True:
+        job = conn.recv()
+        if job is None:
+            break
+        name, size, kind, prompt = job
+        if prompt == "crash":
+            os._exit(1)
+        if prompt == "hang":
+            time.sleep(60)
+        shm = SharedMemory(name=name)
+        shm.close()
+        conn.send(("ok", TranscriptionResult(text=str(os.getpid()), language="en")))
+
+
+@pytest.fixture
+def shared(monkeypatch):
+    """Names of the shared memory blocks handed to workers."""
+    names = []
+    share = process_whisper_transcriber._share
+
+    def recording_share(data):
+        shm = share(data)
+        names.append(shm.name)
+        return shm
+
+    monkeypatch.setattr(process_whisper_transcriber, "_worker_main", stub_worker)
+    monkeypatch.setattr(process_whisper_transcriber, "_share", recording_share)
+    return names
+
+
+def is_freed(name: str) -> bool:
+    try:
+        SharedMemory(name=name).close()
+    except FileNotFoundError:
+        return True
+    return False
+
+
+def worker_pid(transcriber: ProcessPoolWhisperTranscriber) -> str:
+    return transcriber.transcribe_pcm(SAMPLES).text
+
+
+def test_crashed_worker_is_replaced(shared):
+    transcriber = ProcessPoolWhisperTranscriber(processes=1, job_timeout=30)
+    first = worker_pid(transcriber)
+
+    assert_that(
+        calling(transcriber.transcribe_pcm).with_args(SAMPLES, "crash"),
+        raises(RuntimeError, "crashed"),
+    )
+
+    assert_that(worker_pid(transcriber), is_not(equal_to(first)))
+    assert_that(all(is_freed(name) for name in shared), equal_to(True))
+    transcriber.close()
+
+
+def test_worker_past_the_timeout_is_killed_and_replaced(shared):
+    transcriber = ProcessPoolWhisperTranscriber(processes=1, job_timeout=3)
+    first = worker_pid(transcriber)
+
+    assert_that(
+        calling(transcriber.transcribe_pcm).with_args(SAMPLES, "hang"),
+        raises(TimeoutError),
+    )
+
+    assert_that(worker_pid(transcriber), is_not(equal_to(first)))
+    assert_that(all(is_freed(name) for name in shared), equal_to(True))
+    transcriber.close()
+
+
+def test_worker_is_recycled_after_its_job_limit(shared):
+    transcriber = ProcessPoolWhisperTranscriber(
+        processes=1, max_jobs_per_worker=2, job_timeout=30
+    )
+
+    pids = [worker_pid(transcriber) for _ in range(3)]
+
+    assert_that(pids[1], equal_to(pids[0]))
+    assert_that(pids[2], is_not(equal_to(pids[0])))
+    assert_that(all(is_freed(name) for name in shared), equal_to(True))
+    transcriber.close()
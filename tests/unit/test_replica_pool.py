@@ -0,0 +1,50 @@
+"""Unit tests for the replica pool used by pooled transcribers."""
+import threading
+import time
+
+from hamcrest import assert_that, contains_exactly, equal_to, greater_than
+
+from great_dictator.adapters.outbound.replica_pool import ReplicaPool
+
+
+def test_checkout_hands_out_distinct_replicas():
+    pool = ReplicaPool(["a", "b"])
+
+    with pool.checkout() as first, pool.checkout() as second:
+        assert_that({first, second}, equal_to({"a", "b"}))
+        assert_that(pool.stats().busy, equal_to(2))
+
+    assert_that(pool.stats().busy, equal_to(0))
+
+
+def test_waiting_callers_are_served_in_arrival_order():
+    pool = ReplicaPool(["only"])
+    served: list[int] = []
+
+    def worker(n: int) -> None:
+        with pool.checkout():
+            served.append(n)
+
+    with pool.checkout():
+        threads = []
+        for n in range(3):
+            thread = threading.Thread(target=worker, args=(n,))
+            thread.start()
+            threads.append(thread)
+            while pool.stats().waiting < n + 1:
+                time.sleep(0.001)
+    for thread in threads:
+        thread.join()
+
+    assert_that(served, contains_exactly(0, 1, 2))
+
+
+def test_stats_report_completed_jobs_and_utilization():
+    pool = ReplicaPool(["a"])
+
+    with pool.checkout():
+        time.sleep(0.02)
+
+    stats = pool.stats()
+    assert_that(stats.completed, equal_to(1))
+    assert_that(stats.utilization, greater_than(0.0))
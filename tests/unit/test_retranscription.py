@@ -0,0 +1,77 @@
+"""Unit tests for merging re-transcribed chunks into a document."""
+from hamcrest import assert_that, equal_to
+
+from great_dictator.domain.audio import AudioChunk
+from great_dictator.domain.retranscription import merge_transcripts
+
+
+def chunk(sequence: int, text: str, text_start: int) -> AudioChunk:
+    return AudioChunk(
+        document_id=1,
+        sequence=sequence,
+        start=float(sequence),
+        end=float(sequence + 1),
+        text_start=text_start,
+        text_end=text_start + len(text),
+        text=text,
+    )
+
+
+def test_drafts_are_replaced_in_place():
+    content = "Dear Sir, I right to complain. Yours"
+    chunks = [chunk(0, "I right to complain.", 10), chunk(1, "Yours", 31)]
+
+    merged, _ = merge_transcripts(
+        content, chunks, {0: "I write to complain.", 1: "Yours faithfully"}
+    )
+
+    assert_that(merged, equal_to("Dear Sir, I write to complain. Yours faithfully"))
+
+
+def test_drafts_moved_by_later_edits_are_found():
+    content = "PS. Dear Sir, I right to complain."
+    chunks = [chunk(0, "I right to complain.", 10)]
+
+    merged, _ = merge_transcripts(content, chunks, {0: "I write to complain."})
+
+    assert_that(merged, equal_to("PS. Dear Sir, I write to complain."))
+
+
+def test_drafts_edited_by_hand_are_kept():
+    content = "Dear Sir, I wish to complain."
+    chunks = [chunk(0, "I right to complain.", 10)]
+
+    merged, _ = merge_transcripts(content, chunks, {0: "I write to complain."})
+
+    assert_that(merged, equal_to(content))
+
+
+def test_chunks_without_a_new_transcript_are_kept():
+    content = "one two"
+    chunks = [chunk(0, "one", 0), chunk(1, "two", 4)]
+
+    merged, _ = merge_transcripts(content, chunks, {1: "  "})
+
+    assert_that(merged, equal_to(content))
+
+
+def test_repeated_drafts_each_replace_their_own_copy():
+    content = "yes yes"
+    chunks = [chunk(0, "yes", 0), chunk(1, "yes", 4)]
+
+    merged, _ = merge_transcripts(content, chunks, {0: "Yes.", 1: "Yes!"})
+
+    assert_that(merged, equal_to("Yes. Yes!"))
+
+
+def test_replaced_chunks_are_placed_where_their_text_now_is():
+    content = "one two three"
+    chunks = [chunk(0, "one", 0), chunk(1, "two", 4), chunk(2, "three", 8)]
+
+    merged, placed = merge_transcripts(content, chunks, {0: "the one", 2: "the three"})
+
+    assert_that(merged, equal_to("the one two the three"))
+    assert_that(
+        [(c.sequence, merged[c.text_start:c.text_end]) for c in placed],
+        equal_to([(0, "the one"), (2, "the three")]),
+    )
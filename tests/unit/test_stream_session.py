@@ -0,0 +1,107 @@
+"""Unit tests for one streaming connection, without a socket."""
+from hamcrest import assert_that, contains_exactly, equal_to, has_entries
+
+from great_dictator.adapters.inbound.pcm_segmenter import PcmSegmenter
+from great_dictator.adapters.inbound.stream_session import (
+    WS_CLOSE_POLICY_VIOLATION,
+    WS_CLOSE_TRY_AGAIN_LATER,
+    StreamSession,
+)
+from great_dictator.domain.document import OffloadedDocumentRepository
+from great_dictator.domain.transcription import (
+    TranscriberPort,
+    TranscriptionResult,
+    TranscriptionService,
+)
+from tests.builders import a_document
+from tests.fakes.fake_document_repository import FakeDocumentRepository
+
+
+class LoudnessVad:
+    """Treats any frame with a non-zero byte as speech."""
+
+    def is_speech(self, buf: bytes, sample_rate: int) -> bool:
+        return any(bytes(buf))
+
+
+class FixedTranscriber(TranscriberPort):
+    def __init__(self, text: str):
+        self._text = text
+
+    def transcribe(self, audio):
+        return TranscriptionResult(text=self._text, language="en")
+
+
+def speech(ms: int) -> bytes:
+    return b"\x10\x27" * (16 * ms)
+
+
+def a_session(sent, repository=None, draft=None, **options) -> StreamSession:
+    async def send(message):
+        sent.append(message)
+
+    return StreamSession(
+        send,
+        PcmSegmenter(LoudnessVad()),
+        TranscriptionService(FixedTranscriber("I write")),
+        draft_service=TranscriptionService(FixedTranscriber(draft)) if draft else None,
+        documents=OffloadedDocumentRepository(repository) if repository else None,
+        **options,
+    )
+
+
+async def test_end_of_speech_sends_a_final():
+    sent = []
+    session = a_session(sent)
+    session.open()
+
+    await session.receive_audio(speech(500))
+    await session.receive_control({"type": "end_of_speech"})
+    await session.finished()
+    session.close()
+
+    assert_that(sent, contains_exactly({"type": "final", "text": "I write"}))
+
+
+async def test_finals_are_appended_to_the_bound_document_and_revised():
+    repository = FakeDocumentRepository()
+    doc = repository.save(a_document().with_content("Dear Sir,").build())
+    sent = []
+    session = a_session(sent, repository, draft="I right")
+    session.open()
+
+    await session.receive_control({"type": "start", "document_id": doc.id})
+    await session.receive_audio(speech(500))
+    await session.receive_control({"type": "end_of_speech"})
+    await session.finished()
+    session.close()
+
+    assert_that(sent, contains_exactly(
+        has_entries(type="final", text="I right", draft=True, version=1),
+        has_entries(type="revised", text="I write", version=2),
+    ))
+    assert_that(repository.load(doc.id).content, equal_to("Dear Sir, I write"))
+
+
+async def test_unknown_document_ends_the_stream():
+    sent = []
+    session = a_session(sent, FakeDocumentRepository())
+    session.open()
+
+    code = await session.receive_control({"type": "start", "document_id": 999})
+    session.close()
+
+    assert_that(code, equal_to(WS_CLOSE_POLICY_VIOLATION))
+    assert_that(sent, contains_exactly({"type": "error", "message": "Document not found"}))
+
+
+async def test_audio_past_the_memory_cap_ends_the_stream():
+    sent = []
+    session = a_session(sent, max_connection_bytes=1000)
+    session.open()
+
+    code = await session.receive_audio(speech(100))
+    session.close()
+
+    assert_that(code, equal_to(WS_CLOSE_TRY_AGAIN_LATER))
+    assert_that(sent, contains_exactly(has_entries(type="error")))
@@ -3,7 +3,12 @@ from datetime import datetime
 
 from hamcrest import assert_that, contains_string, equal_to
 
-from great_dictator.adapters.inbound.templates import render_editor, render_document_list
+from great_dictator.adapters.inbound.templates import (
+    render_document_list,
+    render_editor,
+    render_search_results,
+)
+from great_dictator.domain.document import MATCH_END, MATCH_START, SearchHit
 
 
 def test_render_editor_empty_document() -> None:
@@ -84,3 +89,34 @@ def test_render_document_list_escapes_html() -> None:
 
     # Should escape HTML to prevent XSS
     assert_that(html, contains_string("&lt;script&gt;"))
+
+
+def test_render_document_list_loads_next_page_when_revealed() -> None:
+    documents = [(1, "First Doc", datetime(2024, 1, 15, 10, 30))]
+
+    html = render_document_list(documents, next_page_url="/documents/list-html?cursor=abc")
+
+    assert_that(html, contains_string('hx-get="/documents/list-html?cursor=abc"'))
+    assert_that(html, contains_string('hx-trigger="revealed"'))
+
+
+def test_render_later_empty_page_shows_nothing() -> None:
+    html = render_document_list([], show_empty=False)
+
+    assert_that(html.strip(), equal_to(""))
+
+
+def test_render_search_results_marks_matches_and_escapes_text() -> None:
+    hits = [
+        SearchHit(
+            id=7,
+            name="Notes",
+            created=datetime(2024, 1, 15, 10, 30),
+            snippet=f"<b>the {MATCH_START}budget{MATCH_END}</b>",
+        )
+    ]
+
+    html = render_search_results(hits)
+
+    assert_that(html, contains_string("&lt;b&gt;the <mark>budget</mark>&lt;/b&gt;"))
+    assert_that(html, contains_string('hx-get="/editor/load/7"'))
@@ -0,0 +1,71 @@
+from hamcrest import assert_that, equal_to
+
+from great_dictator.domain.transcript import LocalAgreement, locate_draft, stitch
+
+
+def test_first_hypothesis_is_entirely_tentative():
+    agreement = LocalAgreement()
+
+    partial = agreement.update("hello there")
+
+    assert_that(partial.committed, equal_to(""))
+    assert_that(partial.tentative, equal_to("hello there"))
+
+
+def test_words_agreed_by_consecutive_hypotheses_are_committed():
+    agreement = LocalAgreement()
+    agreement.update("hello there wor")
+
+    partial = agreement.update("hello there world how")
+
+    assert_that(partial.committed, equal_to("hello there"))
+    assert_that(partial.tentative, equal_to("world how"))
+    assert_that(partial.text, equal_to("hello there world how"))
+
+
+def test_committed_words_are_never_retracted():
+    agreement = LocalAgreement()
+    agreement.update("hello there")
+    agreement.update("hello there world")
+
+    partial = agreement.update("yellow")
+
+    assert_that(partial.committed, equal_to("hello there"))
+
+
+def test_reset_starts_a_new_segment():
+    agreement = LocalAgreement()
+    agreement.update("hello there")
+    agreement.update("hello there")
+
+    agreement.reset()
+
+    assert_that(agreement.update("next").committed, equal_to(""))
+    assert_that(agreement.update("next").committed, equal_to("next"))
+
+
+def test_stitch_drops_words_repeated_across_a_chunk_boundary():
+    text = stitch(["we went to the", "To the market, and", "and then home."])
+
+    assert_that(text, equal_to("we went to the market, and then home."))
+
+
+def test_stitch_keeps_chunks_without_overlap():
+    text = stitch(["hello there.", "", "general kenobi"])
+
+    assert_that(text, equal_to("hello there. general kenobi"))
+
+
+def test_draft_is_found_where_it_was_put():
+    assert_that(locate_draft("yes and yes", "yes", 8), equal_to(8))
+
+
+def test_draft_moved_by_an_edit_is_found_before_the_limit():
+    content = "PS. yes and yes"
+
+    assert_that(locate_draft(content, "yes", 0), equal_to(12))
+    assert_that(locate_draft(content, "yes", 0, limit=12), equal_to(4))
+
+
+def test_draft_edited_by_hand_is_gone():
+    assert_that(locate_draft("no and no", "yes", 0), equal_to(-1))
@@ -1,12 +1,20 @@
+import asyncio
+import wave
 from io import BytesIO
 
+import numpy as np
+import pytest
 from hamcrest import assert_that, equal_to
 
 from great_dictator.domain.transcription import (
     TranscriberPort,
     TranscriptionResult,
+    TranscriptionSegment,
     TranscriptionService,
+    TranscriptionTimeout,
+    TranscriptionUnavailable,
 )
+from tests.fakes.blocking_transcriber import BlockingTranscriber
 
 
 class FakeTranscriber(TranscriberPort):
@@ -17,6 +25,42 @@ class FakeTranscriber(TranscriberPort):
         return self._result
 
 
+class WavRecordingTranscriber(TranscriberPort):
+    def __init__(self) -> None:
+        self.prompts: list[str | None] = []
+        self.frames: list[bytes] = []
+
+    def transcribe(self, audio: BytesIO) -> TranscriptionResult:
+        return self.transcribe_with_prompt(audio, None)  # type: ignore[arg-type]
+
+    def transcribe_with_prompt(self, audio: BytesIO, prompt: str) -> TranscriptionResult:
+        with wave.open(audio, "rb") as wav_file:
+            assert_that(wav_file.getframerate(), equal_to(16000))
+            self.frames.append(wav_file.readframes(wav_file.getnframes()))
+        self.prompts.append(prompt)
+        return TranscriptionResult(text="ok", language="en")
+
+
+def test_default_transcribe_pcm_encodes_samples_as_wav():
+    transcriber = WavRecordingTranscriber()
+
+    transcriber.transcribe_pcm(np.array([0.0, 0.5, -1.0, 2.0], dtype=np.float32), "prompt")
+
+    pcm = np.frombuffer(transcriber.frames[0], dtype="<i2")
+    assert_that(pcm.tolist(), equal_to([0, 16383, -32767, 32767]))
+    assert_that(transcriber.prompts, equal_to(["prompt"]))
+
+
+async def test_transcribe_pcm_async_delegates_to_transcriber():
+    transcriber = WavRecordingTranscriber()
+    service = TranscriptionService(transcriber)
+
+    result = await service.transcribe_pcm_async(np.zeros(160, dtype=np.float32))
+
+    assert_that(result.text, equal_to("ok"))
+    assert_that(transcriber.prompts, equal_to([None]))
+
+
 def test_service_delegates_to_transcriber():
     expected_result = TranscriptionResult(text="hello world", language="en")
     fake_transcriber = FakeTranscriber(expected_result)
@@ -26,3 +70,90 @@ def test_service_delegates_to_transcriber():
     result = service.transcribe(audio)
 
     assert_that(result, equal_to(expected_result))
+
+
+async def test_transcribe_async_delegates_to_transcriber():
+    expected_result = TranscriptionResult(text="hello world", language="en")
+    service = TranscriptionService(FakeTranscriber(expected_result))
+
+    result = await service.transcribe_async(BytesIO(b"fake audio data"))
+
+    assert_that(result, equal_to(expected_result))
+
+
+async def test_transcribe_async_refuses_jobs_when_queue_is_full():
+    transcriber = BlockingTranscriber()
+    service = TranscriptionService(transcriber, max_workers=1, max_queue=1)
+    running = asyncio.ensure_future(service.transcribe_async(BytesIO(b"1")))
+    queued = asyncio.ensure_future(service.transcribe_async(BytesIO(b"2")))
+    await asyncio.sleep(0.05)
+
+    with pytest.raises(TranscriptionUnavailable):
+        await service.transcribe_async(BytesIO(b"3"))
+
+    transcriber.release.set()
+    await asyncio.gather(running, queued)
+    assert_that(service.pending_jobs, equal_to(0))
+
+
+async def test_transcribe_async_times_out():
+    transcriber = BlockingTranscriber()
+    service = TranscriptionService(transcriber, timeout=0.05)
+
+    with pytest.raises(TranscriptionTimeout):
+        await service.transcribe_async(BytesIO(b"fake audio data"))
+
+    transcriber.release.set()
+
+
+async def test_cancelled_job_that_has_not_started_is_dropped():
+    transcriber = BlockingTranscriber()
+    service = TranscriptionService(transcriber, max_workers=1)
+    running = asyncio.ensure_future(service.transcribe_async(BytesIO(b"1")))
+    queued = asyncio.ensure_future(service.transcribe_async(BytesIO(b"2")))
+    await asyncio.sleep(0.05)
+
+    queued.cancel()
+    await asyncio.sleep(0.05)
+    transcriber.release.set()
+    await running
+
+    assert_that(transcriber.calls, equal_to(1))
+
+
+class SegmentingTranscriber(TranscriberPort):
+    def transcribe(self, audio: BytesIO) -> TranscriptionResult:
+        raise AssertionError("segments are streamed")
+
+    def transcribe_segments(self, audio, prompt=None):
+        for i, word in enumerate(["one", "two", "three"]):
+            yield TranscriptionSegment(text=word, start=float(i), end=i + 1.0)
+
+
+async def test_transcribe_stream_yields_segments_in_order():
+    service = TranscriptionService(SegmentingTranscriber())
+
+    texts = [segment.text async for segment in service.transcribe_stream(BytesIO(b""))]
+
+    assert_that(texts, equal_to(["one", "two", "three"]))
+
+
+async def test_transcribe_stream_refuses_when_queue_is_full():
+    transcriber = BlockingTranscriber()
+    service = TranscriptionService(transcriber, max_workers=1, max_queue=0)
+    running = asyncio.ensure_future(service.transcribe_async(BytesIO(b"")))
+    await asyncio.sleep(0.05)
+
+    with pytest.raises(TranscriptionUnavailable):
+        service.transcribe_stream(BytesIO(b""))
+
+    transcriber.release.set()
+    await running
+
+
+def test_default_transcribe_segments_yields_the_whole_text():
+    transcriber = FakeTranscriber(TranscriptionResult(text=" all of it ", language="en"))
+
+    segments = list(transcriber.transcribe_segments(BytesIO(b"")))
+
+    assert_that([segment.text for segment in segments], equal_to(["all of it"]))